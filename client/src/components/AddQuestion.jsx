@@ -89,6 +89,7 @@ export default function AddQuestion() {
     equationFile: null,
   });
   const [wordFile, setWordFile] = useState(null);
+  const [uploadStatus, setUploadStatus] = useState("");
 
   // Check authentication and role on component mount
   useEffect(() => {
@@ -125,14 +126,22 @@ export default function AddQuestion() {
     const formData = new FormData();
     formData.append('file', wordFile);
     formData.append('course_id', courseId);
+    // Queue the upload as a background job and poll it instead of waiting on one long request
+    formData.append('async', 'true');
 
     api.post('/upload-question/', formData)
       .then(response => {
         console.log('Success:', response);
-        alert('File uploaded successfully!');
         setWordFile(null);
         const fileInput = document.querySelector('input[type="file"]');
         if (fileInput) fileInput.value = '';
+        const job = response.data?.job;
+        if (job) {
+          setUploadStatus(`Processing ${job.file_name}...`);
+          pollUploadJob(job.job_id);
+        } else {
+          alert('File uploaded successfully!');
+        }
       })
       .catch(error => {
         console.error('Upload Error:', error.response?.data);
@@ -154,6 +163,32 @@ export default function AddQuestion() {
       });
   }
 
+  function pollUploadJob(jobId) {
+    api.get(`/upload-jobs/${jobId}/`)
+      .then(response => {
+        const job = response.data.job;
+        if (job.status === 'succeeded') {
+          setUploadStatus('');
+          let message = `File uploaded successfully! ${job.rows_processed} rows processed, ${job.rows_failed} failed.`;
+          if (job.rows_collapsed) {
+            message += ` ${job.rows_collapsed} repeated questions had different details; only their last row was kept.`;
+          }
+          alert(message);
+        } else if (job.status === 'failed') {
+          setUploadStatus('');
+          alert('Upload failed: ' + (job.error || 'Unknown error'));
+        } else {
+          setUploadStatus(`Processing ${job.file_name}: ${job.rows_processed} of ${job.rows_total || '?'} rows...`);
+          setTimeout(() => pollUploadJob(jobId), 1500);
+        }
+      })
+      .catch(error => {
+        console.error('Upload Job Error:', error.response?.data);
+        setUploadStatus('');
+        alert(error.response?.data?.error || 'Could not check the upload status');
+      });
+  }
+
   const handleFileChange = (e) => {
     const { name } = e.target;
     setManualData({ ...manualData, [name]: e.target.files[0] });
@@ -232,7 +267,8 @@ export default function AddQuestion() {
               onChange={handleWordFileChange}
               required
             />
-            <button type="submit">Upload</button>
+            <button type="submit" disabled={!!uploadStatus}>Upload</button>
+            {uploadStatus && <p className="upload-status">{uploadStatus}</p>}
           </form>
         ) : (
           <form className="add-question-form" onSubmit={handleSubmit}>
@@ -2,7 +2,7 @@ import React, { useState, useEffect } from 'react';
 import { useNavigate, useParams } from 'react-router-dom';
 import Logo from "../images/profile.png";
 import Header from "./Header";
-import { api } from '../utils/api';
+import { api, fetchAllQuestions } from '../utils/api';
 
 export default function ModifyQB() {
   const navigate = useNavigate();
@@ -25,8 +25,8 @@ export default function ModifyQB() {
   const fetchQuestions = async () => {
     try {
       setLoading(true);
-      const response = await api.get(`/course/${courseId}/questions/`);
-      setQuestions(response.data.questions || []);
+      const data = await fetchAllQuestions(`/course/${courseId}/questions/`);
+      setQuestions(data.questions);
       setError(null);
     } catch (err) {
       console.error('Error fetching questions:', err);
@@ -1,6 +1,6 @@
 import React, { useState, useEffect } from 'react';
 import { useParams } from 'react-router-dom';
-import { api } from '../utils/api';
+import { api, fetchAllQuestions } from '../utils/api';
 import QuestionFilter from './QuestionFilter';
 import '../styles/paper_generator.css';
 
@@ -39,12 +39,10 @@ export default function PaperGenerator() {
     const fetchQuestions = async () => {
         setLoading(true);
         try {
-            const response = await api.get(`/course/${courseId}/questions/`);
-            if (response.data && response.data.questions) {
-                setQuestions(response.data.questions);
-                setFilteredQuestions(response.data.questions);
-                setCourseInfo(response.data.course);
-            }
+            const data = await fetchAllQuestions(`/course/${courseId}/questions/`);
+            setQuestions(data.questions);
+            setFilteredQuestions(data.questions);
+            setCourseInfo(data.course);
         } catch (err) {
             console.error('Error fetching questions:', err);
             setError('Failed to fetch questions');
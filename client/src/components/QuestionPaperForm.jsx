@@ -2,7 +2,7 @@ import React, { useState, useEffect } from 'react';
 import { useParams, useNavigate } from 'react-router-dom';
 import Logo from "../images/profile.png";
 import Header from "./Header";
-import { api } from '../utils/api';
+import { api, fetchAllQuestions } from '../utils/api';
 import '../styles/question-paper.css';
 
 export default function QuestionPaperForm() {
@@ -98,16 +98,12 @@ export default function QuestionPaperForm() {
   const fetchQuestions = async () => {
     setLoading(true);
     try {
-      const response = await api.get(`/course/${courseId}/questions/`);
-      console.log('Questions response:', response.data);
-      
-      if (response.data && Array.isArray(response.data.questions)) {
-        setQuestions(response.data.questions);
-        setFilteredQuestions(response.data.questions);
-        setCourseInfo(response.data.course);
-      } else {
-        throw new Error('Invalid questions data format');
-      }
+      const data = await fetchAllQuestions(`/course/${courseId}/questions/`);
+      console.log('Questions response:', data);
+
+      setQuestions(data.questions);
+      setFilteredQuestions(data.questions);
+      setCourseInfo(data.course);
     } catch (err) {
       console.error('Error fetching questions:', err);
       setError('Failed to fetch questions');
@@ -77,4 +77,18 @@ api.interceptors.response.use(
         }
         return Promise.reject(error);
     }
-); 
\ No newline at end of file
+); 
+// Question listings are cursor-paginated: follow next_cursor until the last page
+// and return the first response's data with every page's questions
+export const fetchAllQuestions = async (url, params = {}) => {
+    let cursor = null;
+    let data = null;
+    const questions = [];
+    do {
+        const response = await api.get(url, { params: cursor ? { ...params, cursor } : params });
+        data = data || response.data;
+        questions.push(...(response.data.questions || []));
+        cursor = response.data.next_cursor;
+    } while (cursor);
+    return { ...data, questions };
+};
@@ -53,3 +53,15 @@ class CustomUserAdmin(admin.ModelAdmin):
 class QuestionMediaAdmin(admin.ModelAdmin):
     list_display = ('qm_id', 'question_id')
     list_filter = ('question_id',)
+
+@admin.register(IngestionJob)
+class IngestionJobAdmin(admin.ModelAdmin):
+    list_display = ['id', 'course_id', 'faculty', 'original_name', 'status', 'rows_processed', 'rows_failed', 'created_at']
+    list_filter = ['status', 'course_id']
+    ordering = ['-created_at']
+
+@admin.register(UploadSession)
+class UploadSessionAdmin(admin.ModelAdmin):
+    list_display = ['upload_id', 'course_id', 'faculty', 'original_name', 'status', 'received', 'size', 'updated_at']
+    list_filter = ['status']
+    ordering = ['-created_at']
@@ -0,0 +1,216 @@
+import os
+import sys
+import json
+import time
+import platform
+import resource
+import tempfile
+import threading
+from contextlib import contextmanager
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from api.models import Course
+from api.parser import BatchQuestionIngestor, IngestionStats, QuestionPaperParser
+from api.utils import media_store
+from api.utils.equations import get_equation_converter
+from api.utils.synthetic_bank import build_synthetic_bank
+
+STAGES = ['parse', 'images', 'write']
+
+
+class RssSampler:
+    """Tracks the peak resident set size of this process while a stage runs.
+
+    Samples /proc/self/statm on a background thread; where that is missing
+    the process-lifetime high-water mark from getrusage is reported instead.
+    """
+
+    def __init__(self, interval=0.01):
+        self.interval = interval
+        self.peak = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    @staticmethod
+    def current():
+        try:
+            with open('/proc/self/statm') as f:
+                return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+        except (OSError, ValueError):
+            maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+            return maxrss if sys.platform == 'darwin' else maxrss * 1024
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.peak = max(self.peak, self.current())
+
+    def __enter__(self):
+        self.peak = self.current()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self.peak = max(self.peak, self.current())
+
+
+@contextmanager
+def isolated_media_store(root):
+    """Send extracted images to a scratch directory instead of the real store."""
+    previous = media_store._default_store
+    media_store._default_store = media_store.MediaStore(root)
+    try:
+        yield
+    finally:
+        media_store._default_store = previous
+
+
+def measure(rows, fn):
+    with CaptureQueriesContext(connection) as queries, RssSampler() as rss:
+        started = time.perf_counter()
+        result = fn()
+        seconds = time.perf_counter() - started
+    return result, {
+        'seconds': round(seconds, 4),
+        'rows_per_second': round(rows / seconds, 1) if seconds else 0.0,
+        'queries': len(queries.captured_queries),
+        'peak_rss_mb': round(rss.peak / (1024 * 1024), 1),
+    }
+
+
+class Command(BaseCommand):
+    help = "Benchmark question-bank ingestion per stage on synthetic banks"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, nargs='+', default=[100, 1000, 10000],
+                            help="Bank sizes to benchmark (100 to 50000 rows)")
+        parser.add_argument('--image-ratio', type=float, default=0.1,
+                            help="Fraction of rows carrying an image")
+        parser.add_argument('--equation-ratio', type=float, default=0.1,
+                            help="Fraction of rows carrying an equation")
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--legacy', action='store_true',
+                            help="Also time the row-by-row QuestionPaperParser.parse_docx")
+        parser.add_argument('--save-baseline', metavar='PATH',
+                            help="Write the results as a JSON baseline")
+        parser.add_argument('--compare', metavar='PATH',
+                            help="Fail if throughput or query counts regress against a baseline")
+        parser.add_argument('--tolerance', type=float, default=0.25,
+                            help="Allowed fractional drop in rows/sec before flagging a regression")
+
+    def handle(self, *args, **options):
+        for rows in options['rows']:
+            if not 100 <= rows <= 50000:
+                raise CommandError(f"--rows must be between 100 and 50000, got {rows}")
+
+        results = {
+            'created_at': timezone.now().isoformat(),
+            'python': platform.python_version(),
+            'database': connection.vendor,
+            'image_ratio': options['image_ratio'],
+            'equation_ratio': options['equation_ratio'],
+            'seed': options['seed'],
+            'sizes': {},
+        }
+        for rows in options['rows']:
+            results['sizes'][str(rows)] = self.run_size(rows, options)
+
+        if options['save_baseline']:
+            with open(options['save_baseline'], 'w') as f:
+                json.dump(results, f, indent=2)
+            self.stdout.write(self.style.SUCCESS(f"Baseline saved to {options['save_baseline']}"))
+
+        if options['compare']:
+            self.compare(results, options['compare'], options['tolerance'])
+
+    def run_size(self, rows, options):
+        with tempfile.TemporaryDirectory() as workdir:
+            path = os.path.join(workdir, f"bank_{rows}.docx")
+            started = time.perf_counter()
+            build_synthetic_bank(
+                path, rows, options['image_ratio'], options['equation_ratio'], options['seed']
+            )
+            build_seconds = time.perf_counter() - started
+            self.stdout.write(
+                f"\n{rows} rows ({os.path.getsize(path) / 1024:.0f} KiB, built in {build_seconds:.2f}s)"
+            )
+
+            get_equation_converter().clear()
+            stages = {}
+            with isolated_media_store(os.path.join(workdir, 'media')), transaction.atomic():
+                course = Course.objects.create(course_id=f"BENCH-{rows}", course_name="Benchmark")
+                stats = IngestionStats()
+                records, stages['parse'] = measure(
+                    rows, lambda: BatchQuestionIngestor.read_rows(path, stats)
+                )
+                _, stages['images'] = measure(
+                    rows, lambda: BatchQuestionIngestor.store_images(records)
+                )
+                _, stages['write'] = measure(
+                    rows, lambda: BatchQuestionIngestor.write_records(records, course, stats=stats)
+                )
+                if options['legacy']:
+                    legacy_course = Course.objects.create(
+                        course_id=f"BENCH-{rows}-legacy", course_name="Benchmark"
+                    )
+                    _, stages['legacy'] = measure(
+                        rows, lambda: QuestionPaperParser.parse_docx(path, legacy_course.course_id)
+                    )
+                # Nothing the benchmark wrote is kept
+                transaction.set_rollback(True)
+
+        stats.finish()
+        self.stdout.write(f"  {'stage':<8} {'seconds':>9} {'rows/s':>10} {'queries':>8} {'peak RSS MB':>12}")
+        for name, stage in stages.items():
+            self.stdout.write(
+                f"  {name:<8} {stage['seconds']:>9.3f} {stage['rows_per_second']:>10.1f} "
+                f"{stage['queries']:>8} {stage['peak_rss_mb']:>12.1f}"
+            )
+        self.stdout.write(
+            f"  {stats.rows_inserted} inserted, {stats.rows_failed} failed, "
+            f"equation cache {stats.equations_cached} hits / {stats.equations_converted} misses"
+        )
+        return {
+            'stages': stages,
+            'rows_inserted': stats.rows_inserted,
+            'rows_failed': stats.rows_failed,
+        }
+
+    def compare(self, results, baseline_path, tolerance):
+        try:
+            with open(baseline_path) as f:
+                baseline = json.load(f)
+        except (OSError, ValueError) as e:
+            raise CommandError(f"Could not read baseline {baseline_path}: {e}")
+
+        regressions = []
+        for size, result in results['sizes'].items():
+            expected = baseline.get('sizes', {}).get(size)
+            if expected is None:
+                continue
+            for name, stage in result['stages'].items():
+                before = expected['stages'].get(name)
+                if before is None:
+                    continue
+                if stage['rows_per_second'] < before['rows_per_second'] * (1 - tolerance):
+                    regressions.append(
+                        f"{size} rows / {name}: {stage['rows_per_second']:.1f} rows/s "
+                        f"(baseline {before['rows_per_second']:.1f})"
+                    )
+                if stage['queries'] > before['queries']:
+                    regressions.append(
+                        f"{size} rows / {name}: {stage['queries']} queries "
+                        f"(baseline {before['queries']})"
+                    )
+
+        if regressions:
+            for line in regressions:
+                self.stderr.write(f"REGRESSION {line}")
+            raise CommandError(f"{len(regressions)} regressions against {baseline_path}")
+        self.stdout.write(self.style.SUCCESS(f"No regressions against {baseline_path}"))
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from api.utils.ingestion_jobs import IngestionWorkerPool
+
+
+class Command(BaseCommand):
+    help = "Run question-bank ingestion workers against the database job queue"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true',
+                            help="Process the jobs that are queued now and exit")
+
+    def handle(self, *args, **options):
+        if options['once']:
+            count = IngestionWorkerPool.run_pending()
+            self.stdout.write(self.style.SUCCESS(f"Processed {count} ingestion jobs"))
+            return
+
+        self.stdout.write("Waiting for ingestion jobs (Ctrl+C to stop)...")
+        IngestionWorkerPool.requeue_stale_jobs()
+        IngestionWorkerPool.worker_loop()
@@ -0,0 +1,48 @@
+from django.db import migrations, models
+
+from api.utils.fingerprints import text_hash, question_fingerprint
+
+
+def backfill_fingerprints(apps, schema_editor):
+    Question = apps.get_model('api', 'Question')
+    batch = []
+    for question in Question.objects.select_related('unit_id').iterator(chunk_size=2000):
+        question.text_hash = text_hash(question.text)
+        question.fingerprint = question_fingerprint(
+            question.text, question.marks, question.unit_id.unit_id, question.co, question.bt
+        )
+        batch.append(question)
+        if len(batch) >= 2000:
+            Question.objects.bulk_update(batch, ['text_hash', 'fingerprint'])
+            batch = []
+    if batch:
+        Question.objects.bulk_update(batch, ['text_hash', 'fingerprint'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0002_ingestionjob'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='question',
+            name='text_hash',
+            field=models.CharField(blank=True, default='', max_length=64),
+        ),
+        migrations.AddField(
+            model_name='question',
+            name='fingerprint',
+            field=models.CharField(blank=True, default='', max_length=64),
+        ),
+        migrations.AddIndex(
+            model_name='question',
+            index=models.Index(fields=['course_id', 'text_hash'], name='question_course_text_hash_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='question',
+            index=models.Index(fields=['course_id', 'fingerprint'], name='question_course_fprint_idx'),
+        ),
+        migrations.RunPython(backfill_fingerprints, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,16 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0003_question_fingerprint'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='questionmedia',
+            name='thumbnails',
+            field=models.JSONField(blank=True, default=list),
+        ),
+    ]
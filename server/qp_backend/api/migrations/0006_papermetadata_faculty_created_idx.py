@@ -0,0 +1,15 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0005_uploadsession'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='papermetadata',
+            index=models.Index(fields=['faculty', '-created_at'], name='paper_faculty_created_idx'),
+        ),
+    ]
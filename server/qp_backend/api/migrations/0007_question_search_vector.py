@@ -0,0 +1,63 @@
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.db import migrations
+
+# The trigger fills search_vector for every write path, including bulk_create
+# and queryset.update() from ingestion, which never call Question.save()
+CREATE_SEARCH = [
+    """
+    UPDATE api_question SET search_vector = to_tsvector('pg_catalog.english', coalesce(text, ''))
+    """,
+    """
+    CREATE INDEX question_search_gin_idx ON api_question USING gin (search_vector)
+    """,
+    """
+    CREATE TRIGGER question_search_vector_update
+    BEFORE INSERT OR UPDATE OF text ON api_question
+    FOR EACH ROW EXECUTE FUNCTION tsvector_update_trigger(search_vector, 'pg_catalog.english', text)
+    """,
+]
+
+DROP_SEARCH = [
+    "DROP TRIGGER IF EXISTS question_search_vector_update ON api_question",
+    "DROP INDEX IF EXISTS question_search_gin_idx",
+]
+
+
+def create_search(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for statement in CREATE_SEARCH:
+        schema_editor.execute(statement)
+
+
+def drop_search(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for statement in DROP_SEARCH:
+        schema_editor.execute(statement)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0006_papermetadata_faculty_created_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='question',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        # The index itself is created by create_search, so only record it in the state
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.AddIndex(
+                    model_name='question',
+                    index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='question_search_gin_idx'),
+                ),
+            ],
+        ),
+        migrations.RunPython(create_search, drop_search),
+    ]
@@ -0,0 +1,37 @@
+from django.db import migrations, models
+
+from api.utils.fingerprints import minhash_signature
+
+
+def backfill_minhash(apps, schema_editor):
+    Question = apps.get_model('api', 'Question')
+    batch = []
+    for question in Question.objects.only('q_id', 'text').iterator(chunk_size=2000):
+        question.minhash = minhash_signature(question.text)
+        batch.append(question)
+        if len(batch) >= 2000:
+            Question.objects.bulk_update(batch, ['minhash'])
+            batch = []
+    if batch:
+        Question.objects.bulk_update(batch, ['minhash'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0007_question_search_vector'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='question',
+            name='minhash',
+            field=models.BinaryField(blank=True, default=b''),
+        ),
+        migrations.AddField(
+            model_name='course',
+            name='question_version',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_minhash, migrations.RunPython.noop),
+    ]
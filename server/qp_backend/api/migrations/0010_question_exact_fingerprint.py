@@ -0,0 +1,45 @@
+from django.db import migrations
+
+from api.utils.fingerprints import media_hash, question_fingerprint
+
+
+def recompute_chunk(Question, QuestionMedia, questions):
+    media = {}
+    rows = QuestionMedia.objects.filter(question_id__in=[q.q_id for q in questions]).order_by('pk')
+    for row in rows.values('question_id', 'equations', 'image_paths'):
+        media.setdefault(row['question_id'], row)
+    for question in questions:
+        found = media.get(question.q_id, {})
+        question.fingerprint = question_fingerprint(
+            question.text, question.marks, question.unit_id.unit_id, question.co, question.bt,
+            media_hash(found.get('equations'), found.get('image_paths')),
+        )
+    Question.objects.bulk_update(questions, ['fingerprint'])
+
+
+def recompute_fingerprints(apps, schema_editor):
+    """Fingerprints now hash the exact stored values plus equations and images."""
+    Question = apps.get_model('api', 'Question')
+    QuestionMedia = apps.get_model('api', 'QuestionMedia')
+    questions = Question.objects.select_related('unit_id').only(
+        'q_id', 'text', 'marks', 'co', 'bt', 'unit_id__unit_id'
+    )
+    batch = []
+    for question in questions.iterator(chunk_size=2000):
+        batch.append(question)
+        if len(batch) >= 2000:
+            recompute_chunk(Question, QuestionMedia, batch)
+            batch = []
+    if batch:
+        recompute_chunk(Question, QuestionMedia, batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0009_question_course_qid_idx'),
+    ]
+
+    operations = [
+        migrations.RunPython(recompute_fingerprints, migrations.RunPython.noop),
+    ]
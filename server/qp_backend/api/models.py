@@ -1,7 +1,12 @@
+import uuid
 from django.contrib.auth.models import AbstractUser
-from django.db import models
+from django.db import models, transaction
 from django.core.exceptions import ValidationError
 from django.contrib.postgres.fields import ArrayField
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
+from django.utils import timezone
+from .utils.fingerprints import text_hash, question_fingerprint, media_hash, minhash_signature
 
 class CustomUser(AbstractUser):
     ROLE_CHOICES = [
@@ -62,6 +67,8 @@ class Course(models.Model):
         null=True,
         blank=True
     )
+    # Bumped on every change to the course's questions; per-course caches compare against it
+    question_version = models.PositiveIntegerField(default=0, editable=False)
 
     def __str__(self):
         return f"{self.course_id} - {self.course_name}"
@@ -75,6 +82,10 @@ class Course(models.Model):
         if not self.course_name:
             raise ValidationError('Course name is required')
 
+    @staticmethod
+    def touch_questions(*course_ids):
+        Course.objects.filter(pk__in=course_ids).update(question_version=models.F('question_version') + 1)
+
     def get_question_count(self):
         return self.questions.count()
 
@@ -89,6 +100,35 @@ class Course(models.Model):
             models.Index(fields=['course_name'], name='course_name_idx'),
         ]
 
+class CourseVersionQuerySet(models.QuerySet):
+    """Bulk delete() and update() that bump the question_version of every course
+    they reach, as save() and delete() do for single units and questions."""
+
+    def _course_ids(self):
+        return set(self.order_by().values_list('course_id', flat=True).distinct())
+
+    def delete(self):
+        with transaction.atomic():
+            course_ids = self._course_ids()
+            result = super().delete()
+            Course.touch_questions(*course_ids)
+        return result
+
+    # Kept off the manager like QuerySet.delete(), so a whole table is never deleted by accident
+    delete.queryset_only = True
+
+    def update(self, **kwargs):
+        with transaction.atomic():
+            course_ids = self._course_ids()
+            rows = super().update(**kwargs)
+            for name in ('course_id', 'course_id_id'):
+                if name in kwargs:
+                    # Moved to another course: that bank changed too
+                    course_ids.add(getattr(kwargs[name], 'pk', kwargs[name]))
+            Course.touch_questions(*course_ids)
+        return rows
+
+
 class Unit(models.Model):
     unit_id = models.IntegerField()
     unit_name = models.CharField(max_length=255)
@@ -96,6 +136,19 @@ class Unit(models.Model):
         'Course', on_delete=models.CASCADE, related_name='units'
     )
 
+    objects = CourseVersionQuerySet.as_manager()
+
+    def save(self, *args, **kwargs):
+        # Unit numbers and names are part of the course's cached filter index
+        super().save(*args, **kwargs)
+        Course.touch_questions(self.course_id_id)
+
+    def delete(self, *args, **kwargs):
+        # Deleting a unit cascades to its questions
+        result = super().delete(*args, **kwargs)
+        Course.touch_questions(self.course_id_id)
+        return result
+
     class Meta:
         unique_together = ('unit_id', 'course_id')
         indexes = [
@@ -126,13 +179,81 @@ class Question(models.Model):
     )
     tags = models.JSONField(default=dict)
     image = models.ImageField(upload_to='question_images/', null=True, blank=True)
+    # Set on save and by bulk ingestion; see api/utils/fingerprints.py
+    text_hash = models.CharField(max_length=64, blank=True, default='')
+    fingerprint = models.CharField(max_length=64, blank=True, default='')
+    # MinHash of the text for near-duplicate detection; see api/utils/near_duplicates.py
+    minhash = models.BinaryField(blank=True, default=b'')
+    # Kept up to date by a database trigger on PostgreSQL (migration 0007)
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    objects = CourseVersionQuerySet.as_manager()
+
+    # Inputs of text_hash, fingerprint and minhash; saves that leave them alone skip the recompute
+    SIGNATURE_FIELDS = ('text', 'marks', 'unit_id_id', 'co', 'bt')
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded = instance._signature_inputs()
+        return instance
+
+    def _signature_inputs(self):
+        # Deferred fields are absent from __dict__ and compare as None
+        return tuple(self.__dict__.get(name) for name in self.SIGNATURE_FIELDS), self.__dict__.get('course_id_id')
+
+    def stored_media_hash(self):
+        media = self.media.order_by('pk').values('equations', 'image_paths').first() if self.pk else None
+        return media_hash(media['equations'], media['image_paths']) if media else media_hash([], [])
+
+    def media_fingerprint(self):
+        return question_fingerprint(
+            self.text, self.marks, self.unit_id.unit_id, self.co, self.bt, self.stored_media_hash()
+        )
+
+    def refresh_fingerprint(self):
+        self.text_hash = text_hash(self.text)
+        self.fingerprint = self.media_fingerprint()
+        self.minhash = minhash_signature(self.text)
+
+    def refresh_media_fingerprint(self):
+        # Media rows are written after their question, so the fingerprint saved with it missed them
+        fingerprint = self.media_fingerprint()
+        if fingerprint != self.fingerprint:
+            self.fingerprint = fingerprint
+            Question.objects.filter(pk=self.pk).update(fingerprint=fingerprint)
+
+    def save(self, *args, **kwargs):
+        loaded = getattr(self, '_loaded', None)
+        current = self._signature_inputs()
+        if loaded is None or loaded[0] != current[0]:
+            self.refresh_fingerprint()
+            if kwargs.get('update_fields') is not None:
+                kwargs['update_fields'] = set(kwargs['update_fields']) | {'text_hash', 'fingerprint', 'minhash'}
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            Course.touch_questions(self.course_id_id)
+            if loaded is not None and loaded[1] not in (None, self.course_id_id):
+                # Moved to another course: the old course's bank changed too
+                Course.touch_questions(loaded[1])
+        self._loaded = self._signature_inputs()
+
+    def delete(self, *args, **kwargs):
+        with transaction.atomic():
+            result = super().delete(*args, **kwargs)
+            Course.touch_questions(self.course_id_id)
+        return result
 
     class Meta:
         indexes = [
             models.Index(fields=['course_id', 'unit_id'], name='api_questio_course_unit_idx'),
+            models.Index(fields=['course_id', 'q_id'], name='question_course_qid_idx'),
             models.Index(fields=['co', 'bt'], name='api_questio_co_bt_idx'),
             models.Index(fields=['difficulty_level'], name='question_difficulty_idx'),
             models.Index(fields=['tags'], name='tags_idx'),
+            models.Index(fields=['course_id', 'text_hash'], name='question_course_text_hash_idx'),
+            models.Index(fields=['course_id', 'fingerprint'], name='question_course_fprint_idx'),
+            GinIndex(fields=['search_vector'], name='question_search_gin_idx'),
         ]
 
 class QuestionMedia(models.Model):
@@ -143,6 +264,8 @@ class QuestionMedia(models.Model):
         related_name='media'
     )
     image_paths = models.JSONField(default=list, blank=True, null=True)
+    # WebP previews for list views, parallel to image_paths (None where no preview could be made)
+    thumbnails = models.JSONField(default=list, blank=True)
     equations = models.JSONField(default=list, blank=True, null=True)
 
     def __str__(self):
@@ -155,6 +278,13 @@ class QuestionMedia(models.Model):
         if self.image_paths is None:
             self.image_paths = []
         super().save(*args, **kwargs)
+        # The question's fingerprint covers its media (bulk ingestion computes it up front)
+        self.question_id.refresh_media_fingerprint()
+
+    def delete(self, *args, **kwargs):
+        result = super().delete(*args, **kwargs)
+        self.question_id.refresh_media_fingerprint()
+        return result
 
 class Faculty(models.Model):
     f_id = models.CharField(max_length=50, primary_key=True)
@@ -221,6 +351,9 @@ class PaperMetadata(models.Model):
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['faculty', '-created_at'], name='paper_faculty_created_idx'),
+        ]
 
 class QuestionSelection(models.Model):
     PART_CHOICES = [
@@ -236,3 +369,78 @@ class QuestionSelection(models.Model):
 
     class Meta:
         ordering = ['part', 'order']
+
+class IngestionJob(models.Model):
+    STATUS_CHOICES = [
+        ('queued', 'Queued'),
+        ('running', 'Running'),
+        ('succeeded', 'Succeeded'),
+        ('failed', 'Failed'),
+    ]
+
+    course_id = models.ForeignKey(
+        Course, on_delete=models.CASCADE, related_name='ingestion_jobs'
+    )
+    faculty = models.ForeignKey(Faculty, on_delete=models.SET_NULL, null=True, blank=True)
+    file_path = models.CharField(max_length=500)
+    original_name = models.CharField(max_length=255)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='queued')
+    rows_total = models.IntegerField(default=0)
+    rows_processed = models.IntegerField(default=0)
+    rows_failed = models.IntegerField(default=0)
+    # Same-text rows superseded by a later row with other marks/unit/CO/BT
+    rows_collapsed = models.IntegerField(default=0)
+    error = models.TextField(blank=True, default='')
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    # Renewed by the worker while the job runs; a running job whose lease lapses is requeued
+    heartbeat_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"Ingestion job {self.pk} ({self.status})"
+
+    def get_elapsed_seconds(self):
+        if not self.started_at:
+            return 0.0
+        end = self.finished_at or timezone.now()
+        return round((end - self.started_at).total_seconds(), 3)
+
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'created_at'], name='ingestion_job_status_idx'),
+        ]
+
+
+class UploadSession(models.Model):
+    """A resumable upload: parts are appended at ``received`` until ``size`` is reached."""
+    STATUS_CHOICES = [
+        ('receiving', 'Receiving'),
+        ('completed', 'Completed'),
+        ('aborted', 'Aborted'),
+    ]
+
+    upload_id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    course_id = models.ForeignKey(
+        Course, on_delete=models.CASCADE, related_name='upload_sessions'
+    )
+    faculty = models.ForeignKey(Faculty, on_delete=models.CASCADE, related_name='upload_sessions')
+    original_name = models.CharField(max_length=255)
+    file_path = models.CharField(max_length=500)
+    size = models.BigIntegerField()
+    received = models.BigIntegerField(default=0)
+    sha256 = models.CharField(max_length=64, blank=True, default='')
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='receiving')
+    job = models.ForeignKey(IngestionJob, on_delete=models.SET_NULL, null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Upload {self.upload_id} ({self.received}/{self.size} bytes)"
+
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'updated_at'], name='upload_session_status_idx'),
+        ]
@@ -1,31 +1,34 @@
 import os
 import json
+import time
+import functools
 import docx
 from lxml import etree
 import logging
 from .models import Question, QuestionMedia, Course, Unit
 from django.conf import settings
 from django.db import transaction
+from .utils.image_pipeline import get_image_pipeline
+from .utils.ooxml_scanner import OOXMLRowScanner, UnsupportedLayout
+from .utils.fingerprints import text_hash, question_fingerprint, media_hash, minhash_signature
+from .utils.equations import get_equation_converter
+from .utils.near_duplicates import get_lsh_index, similarity_threshold
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 
 class EquationHandler:
     @staticmethod
-    def extract_equations(cell) -> list:
+    def extract_equations(cell, stats=None) -> list:
+        """Accepts a python-docx cell or a raw ``w:tc`` element; cache hits are counted on ``stats``."""
         equations = []
         try:
-            math_elements = cell._element.findall('.//m:oMath', 
+            element = getattr(cell, '_element', cell)
+            math_elements = element.findall('.//m:oMath', 
                 namespaces={'m': 'http://schemas.openxmlformats.org/officeDocument/2006/math'})
+            converter = get_equation_converter()
             for math_elem in math_elements:
-                mathml_str = etree.tostring(math_elem, pretty_print=True).decode('utf-8')
-                text_repr = ' '.join(math_elem.xpath('.//m:t/text()', 
-                    namespaces={'m': 'http://schemas.openxmlformats.org/officeDocument/2006/math'}))
-                equations.append({
-                    'mathml': mathml_str,
-                    'text': text_repr,
-                    'latex': "Latex conversion not implemented for MathML"
-                })
+                equations.append(converter.convert(math_elem, stats))
         except Exception as e:
             logging.error(f"Error extracting equations: {e}")
         return equations
@@ -93,21 +96,15 @@ class QuestionPaperParser:
                                 tags={},  
                             )
 
-                            # Now use question ID for image filenames
-                            image_paths = []
-                            for idx, image_bytes in enumerate(images_in_cell, 1):
-                                os.makedirs("images", exist_ok=True)
-                                temp_filename = f"question_{question.q_id}_{idx}.png"
-                                temp_path = os.path.join("images", temp_filename)
-                                
-                                with open(temp_path, "wb") as img_file:
-                                    img_file.write(image_bytes)
-                                
-                                image_paths.append(temp_path)
+                            # Images are normalized and content-addressed, so repeats are stored once
+                            pipeline = get_image_pipeline()
+                            stored = [pipeline.process(image_bytes) for image_bytes in images_in_cell]
+                            image_paths = [path for path, _ in stored]
                             
                             question_media = QuestionMedia.objects.create(
                                 question_id=question,
                                 image_paths=image_paths if image_paths else None,
+                                thumbnails=[thumb for _, thumb in stored],
                                 equations=equations if equations else None
                             )
 
@@ -120,5 +117,351 @@ class QuestionPaperParser:
             logging.error(f"Error parsing DOCX file: {e}")
             return []
 
-def upload_questions(file_path, course_id):
+class IngestionStats:
+    """Row counters and throughput for one ingestion run."""
+    MAX_REPORTED_DUPLICATES = 50
+
+    def __init__(self):
+        self.rows_total = 0
+        self.rows_inserted = 0
+        self.rows_updated = 0
+        self.rows_skipped = 0
+        self.rows_failed = 0
+        # Rows dropped because a later row had the same text but other marks/unit/CO/BT
+        self.rows_collapsed = 0
+        self.collapsed = []
+        self.equations_cached = 0
+        self.equations_converted = 0
+        self.near_duplicates = []
+        self.started_at = time.perf_counter()
+        self.elapsed = 0.0
+
+    def finish(self):
+        self.elapsed = time.perf_counter() - self.started_at
+        return self
+
+    @property
+    def rows_per_second(self):
+        if not self.elapsed:
+            return 0.0
+        return self.rows_total / self.elapsed
+
+    def as_dict(self):
+        return {
+            'rows_total': self.rows_total,
+            'rows_inserted': self.rows_inserted,
+            'rows_updated': self.rows_updated,
+            'rows_skipped': self.rows_skipped,
+            'rows_failed': self.rows_failed,
+            'rows_collapsed': self.rows_collapsed,
+            'collapsed_questions': self.collapsed[:IngestionStats.MAX_REPORTED_DUPLICATES],
+            'rows_similar': len(self.near_duplicates),
+            'similar_questions': self.near_duplicates[:IngestionStats.MAX_REPORTED_DUPLICATES],
+            'elapsed_seconds': round(self.elapsed, 3),
+            'rows_per_second': round(self.rows_per_second, 1),
+            'equation_cache': {
+                'hits': self.equations_cached,
+                'misses': self.equations_converted,
+            },
+        }
+
+
+class BatchQuestionIngestor:
+    """Set-based alternative to QuestionPaperParser.parse_docx.
+
+    Every row is parsed into a plain dict first, then units are resolved with
+    one query (plus one bulk insert for missing units) and questions/media are
+    written with chunked bulk_create instead of one INSERT per row.
+    """
+    CHUNK_SIZE = 500
+    PROGRESS_EVERY = 200
+
+    @staticmethod
+    def build_record(texts, equations, images):
+        record = {
+            'text': texts[1].strip(),
+            'equations': equations,
+            'images': images,
+            'marks': int(texts[3].strip()),
+            'unit_number': int(texts[4].strip()),
+            'co': texts[5].strip(),
+            'bt': texts[6].strip(),
+        }
+        record['text_hash'] = text_hash(record['text'])
+        record['minhash'] = minhash_signature(record['text'])
+        return record
+
+    @staticmethod
+    def parse_row(cells, doc, stats=None):
+        return BatchQuestionIngestor.build_record(
+            [cell.text for cell in cells],
+            EquationHandler.extract_equations(cells[1], stats),
+            QuestionPaperParser.get_images_from_cell(cells[2], doc),
+        )
+
+    @staticmethod
+    def read_rows(file_path, stats, progress=None):
+        """Parse every question row, streaming the XML when the layout allows."""
+        try:
+            return BatchQuestionIngestor.scan_rows(file_path, stats, progress)
+        except UnsupportedLayout as e:
+            logging.info(f"Falling back to python-docx for {os.path.basename(file_path)}: {e}")
+            stats.rows_total = stats.rows_failed = 0
+            stats.equations_cached = stats.equations_converted = 0
+        return BatchQuestionIngestor.read_rows_docx(file_path, stats, progress)
+
+    @staticmethod
+    def scan_rows(file_path, stats, progress=None):
+        records = []
+        extract = functools.partial(EquationHandler.extract_equations, stats=stats)
+        with OOXMLRowScanner(file_path, extract) as scanner:
+            for row in scanner.iter_rows():
+                i = row['index']
+                stats.rows_total += 1
+                if progress and stats.rows_total % BatchQuestionIngestor.PROGRESS_EVERY == 0:
+                    progress(stats)
+                try:
+                    texts = row['texts']
+                    if len(texts) < 7:
+                        logging.warning(f"Skipping row {i} due to insufficient cells")
+                        stats.rows_failed += 1
+                        continue
+                    images = [scanner.read_image(rid) for rid in row['image_rids']]
+                    records.append(BatchQuestionIngestor.build_record(texts, row['equations'], images))
+                except Exception as row_error:
+                    logging.error(f"Error processing row {i}: {row_error}")
+                    stats.rows_failed += 1
+        return records
+
+    @staticmethod
+    def read_rows_docx(file_path, stats, progress=None):
+        records = []
+        doc = docx.Document(file_path)
+        for table in doc.tables:
+            for i, row in enumerate(table.rows[1:], 1):
+                stats.rows_total += 1
+                if progress and stats.rows_total % BatchQuestionIngestor.PROGRESS_EVERY == 0:
+                    progress(stats)
+                try:
+                    cells = row.cells
+                    if len(cells) < 7:
+                        logging.warning(f"Skipping row {i} due to insufficient cells")
+                        stats.rows_failed += 1
+                        continue
+                    records.append(BatchQuestionIngestor.parse_row(cells, doc, stats))
+                except Exception as row_error:
+                    logging.error(f"Error processing row {i}: {row_error}")
+                    stats.rows_failed += 1
+        return records
+
+    @staticmethod
+    def resolve_units(course, unit_numbers):
+        units = {
+            unit.unit_id: unit
+            for unit in Unit.objects.filter(course_id=course, unit_id__in=unit_numbers)
+        }
+        missing = [
+            Unit(unit_id=number, course_id=course, unit_name=f'Unit {number}')
+            for number in sorted(set(unit_numbers) - set(units))
+        ]
+        if missing:
+            for unit in Unit.objects.bulk_create(missing):
+                units[unit.unit_id] = unit
+        return units
+
+    @staticmethod
+    def store_images(records):
+        """Normalize image blobs and move them out of the records into the media store."""
+        pipeline = get_image_pipeline()
+        for record in records:
+            stored = [pipeline.process(blob) for blob in record.pop('images', [])]
+            record['image_paths'] = [path for path, _ in stored]
+            record['thumbnails'] = [thumb for _, thumb in stored]
+        return records
+
+    @staticmethod
+    def partition_records(records, course, chunk_size, stats=None):
+        """Split records into (new, changed, unchanged) against the course's bank.
+
+        Rows are matched on their normalized-text hash; a match whose full
+        fingerprint differs is an update, an identical fingerprint is skipped.
+        Within one upload the last occurrence of a repeated question wins:
+        exact repeats count as skipped, repeats with other marks, unit, CO,
+        BT or media are counted and listed in ``stats`` as collapsed.
+        Records must have been through store_images(): the fingerprint covers
+        the stored image paths and equations.
+        """
+        stats = stats or IngestionStats()
+        latest = {}
+        for record in records:
+            record['fingerprint'] = question_fingerprint(
+                record['text'], record['marks'], record['unit_number'], record['co'], record['bt'],
+                media_hash(record['equations'], record['image_paths']),
+            )
+            previous = latest.get(record['text_hash'])
+            if previous is not None:
+                if previous['fingerprint'] == record['fingerprint']:
+                    stats.rows_skipped += 1
+                else:
+                    stats.rows_collapsed += 1
+                    stats.collapsed.append({
+                        'text': previous['text'],
+                        'marks': previous['marks'],
+                        'unit': previous['unit_number'],
+                        'co': previous['co'],
+                        'bt': previous['bt'],
+                    })
+            latest[record['text_hash']] = record
+        hashes = list(latest)
+
+        existing = {}
+        for start in range(0, len(hashes), chunk_size):
+            rows = Question.objects.filter(
+                course_id=course, text_hash__in=hashes[start:start + chunk_size]
+            ).order_by('q_id').values_list('text_hash', 'q_id', 'fingerprint')
+            for hash_value, q_id, fingerprint in rows:
+                existing.setdefault(hash_value, (q_id, fingerprint))
+
+        new, changed, unchanged = [], [], []
+        for hash_value, record in latest.items():
+            if hash_value not in existing:
+                new.append(record)
+            elif existing[hash_value][1] != record['fingerprint']:
+                record['q_id'] = existing[hash_value][0]
+                changed.append(record)
+            else:
+                unchanged.append(record)
+        return new, changed, unchanged
+
+    @staticmethod
+    def build_question(record, course, units):
+        return Question(
+            q_id=record.get('q_id'),
+            unit_id=units[record['unit_number']],
+            course_id=course,
+            text=record['text'],
+            co=record['co'],
+            bt=record['bt'],
+            marks=record['marks'],
+            difficulty_level='Easy',
+            tags={},
+            text_hash=record['text_hash'],
+            fingerprint=record['fingerprint'],
+            minhash=record['minhash'],
+        )
+
+    @staticmethod
+    def write_records(records, course, chunk_size=None, stats=None, index=None):
+        """Insert new rows, update changed ones and skip identical ones.
+
+        Returns the created and updated questions; counts go into ``stats``.
+        New rows are checked for near-duplicates against ``index``, by default
+        an LSH index of the bank as it was before this call; callers writing
+        several documents pass one snapshot so it is built only once.
+        """
+        chunk_size = chunk_size or BatchQuestionIngestor.CHUNK_SIZE
+        stats = stats or IngestionStats()
+        if not records:
+            return []
+
+        # Snapshot of the bank before this upload, to flag reworded copies of existing questions
+        if index is None:
+            index = get_lsh_index(course.course_id)
+        threshold = similarity_threshold()
+
+        with transaction.atomic():
+            new, changed, unchanged = BatchQuestionIngestor.partition_records(
+                records, course, chunk_size, stats
+            )
+            units = BatchQuestionIngestor.resolve_units(
+                course, {record['unit_number'] for record in new + changed}
+            )
+            created = Question.objects.bulk_create([
+                BatchQuestionIngestor.build_question(record, course, units) for record in new
+            ], batch_size=chunk_size)
+
+            updated = [BatchQuestionIngestor.build_question(record, course, units) for record in changed]
+            if updated:
+                Question.objects.bulk_update(
+                    updated,
+                    ['unit_id', 'text', 'co', 'bt', 'marks', 'text_hash', 'fingerprint', 'minhash'],
+                    batch_size=chunk_size,
+                )
+                QuestionMedia.objects.filter(question_id__in=[q.q_id for q in updated]).delete()
+
+            QuestionMedia.objects.bulk_create([
+                QuestionMedia(
+                    question_id=question,
+                    image_paths=record['image_paths'],
+                    thumbnails=record['thumbnails'],
+                    equations=record['equations'],
+                )
+                for question, record in zip(created + updated, new + changed)
+            ], batch_size=chunk_size)
+            Course.touch_questions(course.course_id)
+
+        for question, record in zip(created, new):
+            matches = index.query(record['minhash'], threshold)
+            if matches:
+                stats.near_duplicates.append({
+                    'question_id': question.q_id,
+                    'similar_to': [{'id': q_id, 'similarity': round(score, 3)} for q_id, score in matches[:5]],
+                })
+
+        stats.rows_inserted += len(created)
+        stats.rows_updated += len(updated)
+        stats.rows_skipped += len(unchanged)
+        return created + updated
+
+    @staticmethod
+    def ingest(file_path, course_id, chunk_size=None, progress=None):
+        """Parse and store a DOCX question bank, returning (questions, stats).
+
+        ``progress`` is called with the running IngestionStats while rows are
+        being parsed, so callers such as the upload job worker can report it.
+        """
+        stats = IngestionStats()
+        course = Course.objects.get(course_id=course_id)
+        try:
+            records = BatchQuestionIngestor.read_rows(file_path, stats, progress)
+            BatchQuestionIngestor.store_images(records)
+        except Exception as e:
+            logging.error(f"Error parsing DOCX file: {e}")
+            return [], stats.finish()
+
+        if progress:
+            progress(stats)
+        questions = BatchQuestionIngestor.write_records(records, course, chunk_size, stats)
+        stats.finish()
+        logging.info(
+            f"Ingested {stats.rows_total} rows for {course_id} "
+            f"({stats.rows_inserted} new, {stats.rows_updated} updated, {stats.rows_skipped} unchanged) "
+            f"in {stats.elapsed:.2f}s ({stats.rows_per_second:.0f} rows/s)"
+        )
+        return questions, stats
+
+
+def parse_document(file_path):
+    """Parse one DOCX into row records without touching the database.
+
+    Safe to run in a worker process; images are written to the media store
+    there too, so only their paths travel back to the parent. Returns
+    (records, stats, error).
+    """
+    stats = IngestionStats()
+    try:
+        records = BatchQuestionIngestor.read_rows(file_path, stats)
+        BatchQuestionIngestor.store_images(records)
+        return records, stats.finish(), None
+    except Exception as e:
+        logging.error(f"Error parsing DOCX file {file_path}: {e}")
+        return [], stats.finish(), str(e)
+
+def ingest_questions(file_path, course_id, progress=None):
+    return BatchQuestionIngestor.ingest(file_path, course_id, progress=progress)
+
+def upload_questions(file_path, course_id, batched=True):
+    if batched:
+        questions, _ = ingest_questions(file_path, course_id)
+        return questions
     return QuestionPaperParser.parse_docx(file_path, course_id)
\ No newline at end of file
@@ -0,0 +1,81 @@
+import io
+import os
+import shutil
+import tempfile
+import zipfile
+from unittest import mock
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from api.models import CustomUser, Department, Course, Faculty, FacultyCourse, Question
+from api.tests.test_parser import build_question_bank
+from api.utils import near_duplicates
+from api.utils.near_duplicates import LSHIndex
+
+
+class TestBatchUpload(TestCase):
+    def setUp(self):
+        self.department = Department.objects.create(dept_name="Information Science")
+        self.course = Course.objects.create(
+            course_id="IS101", course_name="Introduction to Programming", department_id=self.department
+        )
+        self.user = CustomUser.objects.create_user(
+            username="faculty1", email="faculty1@example.com", password="testpassword", role="faculty"
+        )
+        faculty = Faculty.objects.create(f_id="1", name="Jane Doe", email="faculty1@example.com", user=self.user)
+        FacultyCourse.objects.create(faculty_id=faculty, course_id=self.course)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.tmpdir = tempfile.mkdtemp()
+        near_duplicates._indexes.clear()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+    def bank_bytes(self, unit, count):
+        path = build_question_bank(os.path.join(self.tmpdir, f"unit{unit}.docx"), [
+            (f"Unit {unit} question {i}", 2, unit, "CO1", "BT1") for i in range(count)
+        ])
+        with open(path, 'rb') as f:
+            return f.read()
+
+    def test_zip_of_unit_files_is_ingested(self):
+        buffer = io.BytesIO()
+        with zipfile.ZipFile(buffer, 'w') as archive:
+            for unit in (1, 2, 3):
+                archive.writestr(f"bank/unit{unit}.docx", self.bank_bytes(unit, 4))
+            archive.writestr("bank/readme.txt", "ignored")
+        upload = SimpleUploadedFile("bank.zip", buffer.getvalue())
+
+        response = self.client.post('/api/upload-question/batch/', {
+            'course_id': 'IS101', 'files': [upload]
+        }, format='multipart')
+
+        self.assertEqual(response.status_code, 201)
+        summary = response.data['summary']
+        self.assertEqual(summary['documents'], 3)
+        self.assertEqual(summary['rows_inserted'], 12)
+        self.assertEqual(Question.objects.filter(course_id=self.course).count(), 12)
+        self.assertEqual(
+            set(Question.objects.values_list('unit_id__unit_id', flat=True)), {1, 2, 3}
+        )
+
+    def test_near_duplicate_index_is_built_once_per_batch(self):
+        uploads = [SimpleUploadedFile(f"unit{unit}.docx", self.bank_bytes(unit, 3)) for unit in (1, 2, 3)]
+        with mock.patch.object(near_duplicates._indexes, 'build', wraps=LSHIndex.for_course) as build:
+            response = self.client.post('/api/upload-question/batch/', {
+                'course_id': 'IS101', 'files': uploads
+            }, format='multipart')
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['summary']['rows_inserted'], 9)
+        self.assertEqual(build.call_count, 1)
+
+    def test_rejects_unsupported_files(self):
+        upload = SimpleUploadedFile("notes.pdf", b"%PDF-1.4")
+        response = self.client.post('/api/upload-question/batch/', {
+            'course_id': 'IS101', 'files': [upload]
+        }, format='multipart')
+        self.assertEqual(response.status_code, 400)
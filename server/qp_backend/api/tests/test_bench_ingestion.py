@@ -0,0 +1,52 @@
+import io
+import os
+import json
+import tempfile
+
+import docx
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+
+from api.models import Course, Question
+from api.utils.synthetic_bank import build_synthetic_bank
+
+
+class TestSyntheticBank(TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_bank_matches_upload_layout(self):
+        path = build_synthetic_bank(
+            os.path.join(self.tmpdir.name, "bank.docx"), 120, image_ratio=1.0, equation_ratio=0.5
+        )
+        table = docx.Document(path).tables[0]
+        self.assertEqual(len(table.rows), 121)
+        self.assertEqual(len(table.rows[1].cells), 7)
+        self.assertEqual(len(table.rows[1].cells[2]._element.xpath('.//w:drawing')), 1)
+
+    def test_benchmark_reports_stages_and_rolls_back(self):
+        baseline = os.path.join(self.tmpdir.name, "baseline.json")
+        out = io.StringIO()
+        call_command('bench_ingestion', rows=[100], save_baseline=baseline, stdout=out)
+
+        with open(baseline) as f:
+            result = json.load(f)['sizes']['100']
+        self.assertEqual(set(result['stages']), {'parse', 'images', 'write'})
+        self.assertEqual(result['rows_inserted'], 100)
+        self.assertEqual(result['stages']['parse']['queries'], 0)
+        self.assertFalse(Course.objects.exists())
+        self.assertFalse(Question.objects.exists())
+
+        # A baseline that needed fewer queries flags a regression
+        with open(baseline) as f:
+            data = json.load(f)
+        data['sizes']['100']['stages']['write']['queries'] = 0
+        with open(baseline, 'w') as f:
+            json.dump(data, f)
+        with self.assertRaises(CommandError):
+            call_command('bench_ingestion', rows=[100], compare=baseline,
+                         stdout=io.StringIO(), stderr=io.StringIO())
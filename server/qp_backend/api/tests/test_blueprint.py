@@ -0,0 +1,136 @@
+import numpy as np
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from api.models import CustomUser, Department, Course, Unit, Question
+from api.utils.blueprint import (
+    Blueprint, BlueprintError, BlueprintInfeasible, BlueprintSolver, QuestionBank, reachable_sums,
+)
+
+BLUEPRINT = {
+    'parts': {'A': {'marks': 10, 'count': 5, 'question_marks': [2]}, 'B': {'marks': 40, 'count': 4, 'question_marks': [10]}},
+    'units': {1: 10, 2: 10, 3: 10, 4: 10, 5: 10},
+    'co': {'CO1': 10, 'CO2': 10},
+    'bt': ['BT3', 'BT4'],
+    'difficulty': {'Easy': 30, 'Medium': 50, 'Hard': 20},
+    'seed': 7,
+}
+
+
+def synthetic_bank(n, seed=1):
+    rng = np.random.default_rng(seed)
+    return QuestionBank(
+        range(1, n + 1),
+        rng.choice([2, 5, 10], n),
+        [f"CO{i}" for i in rng.integers(1, 6, n)],
+        [f"BT{i}" for i in rng.integers(1, 7, n)],
+        rng.integers(1, 6, n).tolist(),
+        [('Easy', 'Medium', 'Hard')[i] for i in rng.integers(0, 3, n)],
+    )
+
+
+class TestBlueprintSolver(TestCase):
+    def test_reachable_sums(self):
+        reach = reachable_sums([2, 5], [3, 1], 12)
+        self.assertEqual(list(np.flatnonzero(reach)), [0, 2, 4, 5, 6, 7, 9, 11])
+        by_count = reachable_sums([2, 5], [3, 1], 12, max_items=2)
+        self.assertTrue(by_count[2, 7])
+        self.assertTrue(by_count[2, 4])
+        self.assertFalse(by_count[1, 4])
+
+    def test_large_bank_meets_every_hard_constraint(self):
+        bank = synthetic_bank(100_000)
+        blueprint = Blueprint(BLUEPRINT)
+        result = BlueprintSolver(bank, blueprint).solve()
+
+        selected = result['selected_questions']
+        self.assertEqual(len(selected['part_a']), 5)
+        self.assertEqual(len(selected['part_b']), 4)
+        self.assertEqual(len(set(selected['part_a'] + selected['part_b'])), 9)
+        index = {int(q_id): i for i, q_id in enumerate(bank.q_ids)}
+        self.assertTrue(all(bank.marks[index[q]] == 2 for q in selected['part_a']))
+        self.assertTrue(all(bank.marks[index[q]] == 10 for q in selected['part_b']))
+
+        summary = result['summary']
+        self.assertEqual(summary['units'], {1: 10, 2: 10, 3: 10, 4: 10, 5: 10})
+        self.assertGreaterEqual(summary['co']['CO1'], 10)
+        self.assertGreaterEqual(summary['co']['CO2'], 10)
+        self.assertIn('BT3', summary['bt'])
+        self.assertIn('BT4', summary['bt'])
+        # Only even marks exist, so Easy cannot be exactly 15
+        self.assertLessEqual(summary['difficulty_deviation'], 4)
+        self.assertLess(result['solve_ms'], 1000)
+
+    def test_unreachable_constraints_are_reported(self):
+        bank = synthetic_bank(500)
+        blueprint = Blueprint({
+            'parts': {'A': {'marks': 7, 'question_marks': [2]}, 'B': 13},
+            'units': {1: 10, 9: 10},
+            'co': {'CO7': 5},
+        })
+        with self.assertRaises(BlueprintInfeasible) as raised:
+            BlueprintSolver(bank, blueprint).solve()
+        unmet = {(u['constraint'], u['key']) for u in raised.exception.unmet}
+        self.assertEqual(unmet, {('part', 'A'), ('unit', 9), ('co', 'CO7')})
+
+    def test_malformed_blueprints(self):
+        with self.assertRaises(BlueprintError):
+            Blueprint({'parts': {}})
+        with self.assertRaises(BlueprintError):
+            Blueprint({'parts': {'A': 10}, 'max_marks': 20})
+        with self.assertRaises(BlueprintError):
+            Blueprint({'parts': {'A': 10}, 'units': {1: 5}})
+        with self.assertRaises(BlueprintError):
+            Blueprint({'parts': {'A': 10}, 'difficulty': {'Trivial': 1}})
+        for extra in ({'max_marks': 'ten'}, {'difficulty': {'Easy': 'most'}}, {'exclude': ['q7']},
+                      {'exclude': 5}, {'seed': 'abc'}, {'parts': ['A']}):
+            with self.assertRaises(BlueprintError, msg=extra):
+                Blueprint({'parts': {'A': 10}, **extra})
+
+    def test_labels_missing_from_the_bank_are_skipped(self):
+        bank = synthetic_bank(500)
+        blueprint = Blueprint({'parts': {'A': 10}, 'co': {'CO1': 2, 'CO9': 0}, 'bt': {'BT9': 0}, 'seed': 3})
+        result = BlueprintSolver(bank, blueprint).solve()
+        self.assertEqual(sum(bank.marks[np.isin(bank.q_ids, result['selected_questions']['part_a'])]), 10)
+
+
+class TestAssemblePaperView(TestCase):
+    def setUp(self):
+        department = Department.objects.create(dept_name="Computer Science")
+        self.course = Course.objects.create(course_id="CS234", course_name="Data Structures", department_id=department)
+        units = [Unit.objects.create(unit_id=i, unit_name=f"Unit {i}", course_id=self.course) for i in (1, 2)]
+        for i in range(8):
+            Question.objects.create(
+                unit_id=units[i % 2], course_id=self.course, text=f"Question {i}",
+                marks=2 if i < 4 else 10, co=f"CO{i % 3 + 1}", bt="BT2",
+            )
+        self.client = APIClient()
+        self.client.force_authenticate(CustomUser.objects.create_user(
+            username="faculty1", email="jane@example.com", password="pw", role="faculty"
+        ))
+
+    def test_returns_selection_ready_for_generate_paper(self):
+        response = self.client.post('/api/course/CS234/assemble-paper/', {
+            'parts': {'A': {'marks': 4, 'count': 2}, 'B': {'marks': 20, 'count': 2}},
+            'units': {'1': 12, '2': 12},
+        }, format='json')
+
+        self.assertEqual(response.status_code, 200)
+        selected = response.data['selected_questions']
+        questions = Question.objects.in_bulk(selected['part_a'] + selected['part_b'])
+        self.assertEqual(sum(questions[q].marks for q in selected['part_a']), 4)
+        self.assertEqual(sum(questions[q].marks for q in selected['part_b']), 20)
+        self.assertEqual(response.data['bank_size'], 8)
+
+    def test_infeasible_blueprint_returns_422(self):
+        response = self.client.post('/api/course/CS234/assemble-paper/', {
+            'parts': {'A': 50},
+        }, format='json')
+        self.assertEqual(response.status_code, 422)
+        self.assertEqual(response.data['unmet'][0]['constraint'], 'part')
+
+    def test_malformed_values_return_400(self):
+        response = self.client.post('/api/course/CS234/assemble-paper/', {
+            'parts': {'A': 4}, 'max_marks': 'four', 'exclude': ['x'],
+        }, format='json')
+        self.assertEqual(response.status_code, 400)
@@ -0,0 +1,103 @@
+import os
+import hashlib
+import tempfile
+from unittest import mock
+
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from api.models import CustomUser, Department, Course, Faculty, FacultyCourse, UploadSession, IngestionJob
+from api.tests.test_parser import build_question_bank
+from api.utils import chunked_upload
+from api.utils.ingestion_jobs import IngestionWorkerPool
+
+
+@mock.patch.object(IngestionWorkerPool, 'ensure_started')
+class TestChunkedUpload(TestCase):
+    def setUp(self):
+        department = Department.objects.create(dept_name="Information Science")
+        self.course = Course.objects.create(
+            course_id="IS101", course_name="Introduction to Programming", department_id=department
+        )
+        self.user = CustomUser.objects.create_user(
+            username="faculty1", email="faculty1@example.com", password="testpassword", role="faculty"
+        )
+        faculty = Faculty.objects.create(f_id="1", name="Jane Doe", email="faculty1@example.com", user=self.user)
+        FacultyCourse.objects.create(faculty_id=faculty, course_id=self.course)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = build_question_bank(os.path.join(tmpdir, "bank.docx"), [
+                ("What is Python?", 2, 1, "CO1", "BT1"),
+                ("Explain recursion.", 10, 2, "CO2", "BT3"),
+            ])
+            with open(path, 'rb') as f:
+                self.data = f.read()
+
+    def tearDown(self):
+        for session in UploadSession.objects.all():
+            if os.path.exists(session.file_path):
+                os.remove(session.file_path)
+        for job in IngestionJob.objects.all():
+            if os.path.exists(job.file_path):
+                os.remove(job.file_path)
+
+    def start(self, **extra):
+        response = self.client.post('/api/upload-sessions/', {
+            'course_id': 'IS101', 'file_name': 'unit1.docx', 'size': len(self.data), **extra
+        }, format='json')
+        self.assertEqual(response.status_code, 201)
+        return response.data['upload_url']
+
+    def put(self, url, offset, body):
+        return self.client.put(
+            url, body, content_type='application/octet-stream', HTTP_UPLOAD_OFFSET=str(offset)
+        )
+
+    def test_parts_resume_and_complete_into_job(self, _):
+        url = self.start(sha256=hashlib.sha256(self.data).hexdigest())
+        half = len(self.data) // 2
+
+        self.assertEqual(self.put(url, 0, self.data[:half]).data['offset'], half)
+        # A resent or skipped part is rejected with the offset to resume from
+        response = self.put(url, 0, self.data[:half])
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.data['offset'], half)
+        self.assertEqual(self.client.get(url).data['upload']['offset'], half)
+
+        self.assertEqual(self.put(url, half, self.data[half:]).data['offset'], len(self.data))
+        response = self.client.post(url + 'complete/')
+        self.assertEqual(response.status_code, 202)
+        job = IngestionJob.objects.get(pk=response.data['job']['job_id'])
+        with open(job.file_path, 'rb') as f:
+            self.assertEqual(f.read(), self.data)
+
+        self.assertEqual(IngestionWorkerPool.run_pending(), 1)
+        job.refresh_from_db()
+        self.assertEqual(job.status, 'succeeded')
+
+    def test_same_file_name_spools_to_distinct_paths(self, _):
+        self.start()
+        self.start()
+        paths = set(UploadSession.objects.values_list('file_path', flat=True))
+        self.assertEqual(len(paths), 2)
+
+    def test_checksum_mismatch_discards_upload(self, _):
+        url = self.start(sha256='0' * 64)
+        self.put(url, 0, self.data)
+        # Another worker received the parts, so the digest comes from disk
+        chunked_upload._hashers.clear()
+
+        response = self.client.post(url + 'complete/')
+        self.assertEqual(response.status_code, 400)
+        session = UploadSession.objects.get()
+        self.assertEqual(session.status, 'aborted')
+        self.assertFalse(os.path.exists(session.file_path))
+        self.assertFalse(IngestionJob.objects.exists())
+
+    def test_incomplete_upload_cannot_complete(self, _):
+        url = self.start()
+        self.put(url, 0, self.data[:10])
+        response = self.client.post(url + 'complete/')
+        self.assertEqual(response.status_code, 400)
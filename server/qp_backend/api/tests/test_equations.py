@@ -0,0 +1,72 @@
+from types import SimpleNamespace
+
+from lxml import etree
+from django.test import SimpleTestCase
+
+from api.utils.equations import EquationConverter
+
+M = 'http://schemas.openxmlformats.org/officeDocument/2006/math'
+
+
+def omath(body, extra_ns=''):
+    return etree.fromstring(f'<m:oMath xmlns:m="{M}"{extra_ns}>{body}</m:oMath>')
+
+
+def run(text):
+    return f'<m:r><m:t>{text}</m:t></m:r>'
+
+
+class TestEquationConverter(SimpleTestCase):
+    def setUp(self):
+        self.converter = EquationConverter(maxsize=2)
+
+    def test_fraction_and_superscript(self):
+        eq = self.converter.convert(omath(
+            f'<m:f><m:num>{run("a")}</m:num><m:den>{run("b+1")}</m:den></m:f>'
+            f'<m:sSup><m:e>{run("x")}</m:e><m:sup>{run("2")}</m:sup></m:sSup>'
+        ))
+        self.assertIn('<mfrac>', eq['mathml'])
+        self.assertIn('<mn>2</mn>', eq['mathml'])
+        self.assertEqual(eq['latex'], r'\frac{a}{b+1}x^{2}')
+        self.assertIn('oMath', eq['omml'])
+
+    def test_nary_radical_and_delimiters(self):
+        eq = self.converter.convert(omath(
+            '<m:nary><m:naryPr><m:chr m:val="∑"/><m:limLoc m:val="undOvr"/></m:naryPr>'
+            f'<m:sub>{run("i=1")}</m:sub><m:sup>{run("n")}</m:sup><m:e>{run("i")}</m:e></m:nary>'
+            f'<m:rad><m:radPr><m:degHide m:val="1"/></m:radPr><m:deg/><m:e>{run("π")}</m:e></m:rad>'
+            f'<m:d><m:e>{run("α")}</m:e><m:e>{run("β")}</m:e></m:d>'
+        ))
+        self.assertEqual(eq['latex'], r'\sum_{i=1}^{n}i\sqrt{\pi}\left( \alpha|\beta \right)')
+
+    def test_function_names(self):
+        eq = self.converter.convert(omath(
+            f'<m:func><m:fName>{run("sin")}</m:fName><m:e>{run("θ")}</m:e></m:func>'
+        ))
+        self.assertEqual(eq['latex'], r'\sin\theta')
+
+    def test_identical_equations_hit_the_cache(self):
+        body = f'<m:sSub><m:e>{run("x")}</m:e><m:sub>{run("10")}</m:sub></m:sSub>'
+        first = self.converter.convert(omath(body))
+        # Extra namespace declarations do not change the canonical form
+        second = self.converter.convert(omath(body, ' xmlns:w="urn:unused"'))
+        self.assertEqual(first, second)
+        self.assertEqual(first['latex'], 'x_{10}')
+        self.assertEqual(self.converter.cache_info()['hits'], 1)
+        self.assertEqual(self.converter.cache_info()['misses'], 1)
+
+    def test_hits_are_counted_per_ingestion(self):
+        body = run("y")
+        first = SimpleNamespace(equations_cached=0, equations_converted=0)
+        second = SimpleNamespace(equations_cached=0, equations_converted=0)
+        self.converter.convert(omath(body), first)
+        self.converter.convert(omath(body), first)
+        # A concurrent upload hitting the same cache does not show up in the first one's numbers
+        self.converter.convert(omath(body), second)
+        self.assertEqual((first.equations_cached, first.equations_converted), (1, 1))
+        self.assertEqual((second.equations_cached, second.equations_converted), (1, 0))
+
+    def test_cache_is_bounded(self):
+        for text in ('a', 'b', 'c'):
+            self.converter.convert(omath(run(text)))
+        self.assertEqual(self.converter.cache_info()['size'], 2)
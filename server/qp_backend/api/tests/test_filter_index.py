@@ -0,0 +1,91 @@
+from django.contrib import admin
+from django.test import RequestFactory, TestCase
+from rest_framework.test import APIClient
+
+from api.admin import QuestionAdmin
+from api.models import CustomUser, Department, Course, Unit, Question
+from api.utils import filter_index
+from api.utils.filter_index import CourseFilterIndex, FilterIndexError, filter_values, get_filter_index
+
+
+def counts(facets, facet):
+    return {entry['value']: entry['count'] for entry in facets[facet]}
+
+
+class TestFilterIndex(TestCase):
+    def setUp(self):
+        filter_index._indexes.clear()
+        department = Department.objects.create(dept_name="Computer Science")
+        course = Course.objects.create(course_id="CS234", course_name="Data Structures", department_id=department)
+        lists = Unit.objects.create(unit_id=1, unit_name="Lists", course_id=course)
+        trees = Unit.objects.create(unit_id=2, unit_name="Trees", course_id=course)
+        spec = [
+            (lists, "CO1", "BT1", 2), (lists, "CO1", "BT2", 5), (lists, "CO2", "BT2", 10),
+            (trees, "CO2", "BT2", 5), (trees, "CO3", "BT3", 10), (trees, "CO3", "BT3", 10),
+        ]
+        self.q = [
+            Question.objects.create(unit_id=unit, course_id=course, text=f"Question {i}", marks=marks, co=co, bt=bt).q_id
+            for i, (unit, co, bt, marks) in enumerate(spec)
+        ]
+        self.client = APIClient()
+        self.client.force_authenticate(
+            CustomUser.objects.create_user(username="faculty1", email="jane@example.com", password="pw", role="faculty")
+        )
+
+    def test_filters_combine_within_and_across_facets(self):
+        index = CourseFilterIndex.for_course("CS234")
+        selected = filter_values({'bts': ['BT2'], 'marks': ['5', 10]})
+        self.assertEqual(index.q_ids_for(index.match(selected)), [self.q[1], self.q[2], self.q[3]])
+        self.assertEqual(index.q_ids_for(index.match({})), self.q)
+        self.assertEqual(index.match(filter_values({'cos': ['CO9']})), 0)
+
+    def test_facet_counts_ignore_their_own_selection(self):
+        index = CourseFilterIndex.for_course("CS234")
+        facets = index.facet_counts(filter_values({'unit_numbers': [1], 'marks': [10]}))
+        self.assertEqual(counts(facets, 'marks'), {2: 1, 5: 1, 10: 1})
+        self.assertEqual(counts(facets, 'unit_numbers'), {1: 1, 2: 2})
+        self.assertEqual(counts(facets, 'cos'), {'CO1': 0, 'CO2': 1, 'CO3': 0})
+        self.assertEqual(facets['unit_numbers'][1]['label'], "Trees")
+
+    def test_index_follows_bank_changes(self):
+        index = get_filter_index("CS234")
+        self.assertIs(get_filter_index("CS234"), index)
+        Question.objects.get(q_id=self.q[0]).delete()
+        self.assertEqual(len(get_filter_index("CS234")), 5)
+
+    def test_index_follows_bulk_changes(self):
+        index = get_filter_index("CS234")
+        Question.objects.filter(q_id=self.q[0]).update(co="CO9")
+        self.assertIsNot(get_filter_index("CS234"), index)
+        self.assertEqual(counts(get_filter_index("CS234").facet_counts({}), "cos")["CO9"], 1)
+
+        Question.objects.filter(q_id__in=self.q[:2]).delete()
+        self.assertEqual(len(get_filter_index("CS234")), 4)
+
+        # The admin's "delete selected" action
+        request = RequestFactory().post('/admin/api/question/')
+        QuestionAdmin(Question, admin.site).delete_queryset(request, Question.objects.filter(q_id=self.q[2]))
+        self.assertEqual(len(get_filter_index("CS234")), 3)
+
+        Unit.objects.filter(unit_name="Trees").delete()
+        self.assertEqual(len(get_filter_index("CS234")), 0)
+
+    def test_bad_filter_values(self):
+        with self.assertRaises(FilterIndexError):
+            filter_values({'marks': ['ten']})
+
+    def test_endpoint_returns_questions_and_facets(self):
+        response = self.client.post('/api/course/CS234/filter-questions/', {'cos': ['CO3']}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([q['id'] for q in response.data['questions']], self.q[4:])
+        self.assertEqual(response.data['questions'][0]['text'], "Question 4")
+        self.assertEqual(response.data['total'], 2)
+        self.assertEqual(counts(response.data['facets'], 'bts'), {'BT1': 0, 'BT2': 0, 'BT3': 2})
+
+        response = self.client.post('/api/course/CS234/filter-questions/', {
+            'unit_numbers': [1], 'fields': 'id,marks,unit_name',
+        }, format='json')
+        self.assertEqual(response.data['questions'][0], {'id': self.q[0], 'marks': 2, 'unit_name': 'Lists'})
+
+        response = self.client.post('/api/course/XX999/filter-questions/', {}, format='json')
+        self.assertEqual(response.status_code, 404)
@@ -0,0 +1,64 @@
+import io
+import os
+import shutil
+import tempfile
+
+from PIL import Image
+from django.test import SimpleTestCase
+
+from api.tests.test_parser import make_png
+from api.utils.image_pipeline import ImagePipeline
+from api.utils.media_store import MediaStore
+
+
+def make_jpeg(size):
+    buffer = io.BytesIO()
+    Image.new('RGB', size, (10, 120, 200)).save(buffer, format='JPEG')
+    return buffer.getvalue()
+
+
+class TestImagePipeline(SimpleTestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.pipeline = ImagePipeline(store=MediaStore(self.tmpdir))
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+    def test_large_photo_is_downscaled_to_print_size(self):
+        blob = make_jpeg((4000, 3000))
+        path, thumbnail = self.pipeline.process(blob)
+
+        self.assertTrue(path.endswith('.jpg'))
+        self.assertLess(os.path.getsize(path), len(blob))
+        with Image.open(path) as image:
+            self.assertLessEqual(image.size, (900, 600))
+            self.assertEqual(image.size[0] * 3, image.size[1] * 4)
+        with Image.open(thumbnail) as image:
+            self.assertEqual(image.format, 'WEBP')
+            self.assertLessEqual(image.width, 240)
+            self.assertLessEqual(image.height, 160)
+
+    def test_small_png_is_stored_unchanged(self):
+        blob = make_png()
+        path, thumbnail = self.pipeline.process(blob)
+
+        self.assertTrue(path.endswith('.png'))
+        with open(path, 'rb') as f:
+            self.assertEqual(f.read(), blob)
+        self.assertTrue(thumbnail.endswith('.webp'))
+
+    def test_vector_images_keep_their_real_format(self):
+        emf = b'\x01\x00\x00\x00' + b'\x00' * 36 + b' EMF' + b'\x00' * 40
+        path, thumbnail = self.pipeline.process(emf)
+
+        self.assertTrue(path.endswith('.emf'))
+        self.assertIsNone(thumbnail)
+
+    def test_repeated_blob_is_processed_once(self):
+        blob = make_jpeg((2000, 2000))
+        first = self.pipeline.process(blob)
+        os.remove(first[0])
+        # Served from the memo, so the removed file is not rewritten
+        self.assertEqual(self.pipeline.process(blob), first)
+        self.assertFalse(os.path.exists(first[0]))
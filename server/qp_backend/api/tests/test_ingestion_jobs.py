@@ -0,0 +1,109 @@
+import os
+import shutil
+import tempfile
+import threading
+from datetime import timedelta
+from unittest import mock
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from api.models import CustomUser, Department, Course, Faculty, FacultyCourse, Question, IngestionJob
+from api.tests.test_parser import build_question_bank
+from api.utils.ingestion_jobs import IngestionWorkerPool, enqueue_job
+
+
+class TestIngestionJobs(TestCase):
+    def setUp(self):
+        self.department = Department.objects.create(dept_name="Information Science")
+        self.course = Course.objects.create(
+            course_id="IS101", course_name="Introduction to Programming", department_id=self.department
+        )
+        self.user = CustomUser.objects.create_user(
+            username="faculty1", email="faculty1@example.com", password="testpassword", role="faculty"
+        )
+        self.faculty = Faculty.objects.create(
+            f_id="1", name="Jane Doe", email="faculty1@example.com", user=self.user
+        )
+        FacultyCourse.objects.create(faculty_id=self.faculty, course_id=self.course)
+        self.tmpdir = tempfile.mkdtemp()
+        self.path = build_question_bank(os.path.join(self.tmpdir, "bank.docx"), [
+            ("What is Python?", 2, 1, "CO1", "BT1"),
+            ("Explain recursion.", 10, 2, "CO2", "BT3"),
+        ])
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+    @mock.patch.object(IngestionWorkerPool, 'ensure_started')
+    def test_run_pending_processes_queued_job(self, _):
+        job = enqueue_job(self.course, self.faculty, self.path, "bank.docx")
+        self.assertEqual(job.status, 'queued')
+
+        self.assertEqual(IngestionWorkerPool.run_pending(), 1)
+        job.refresh_from_db()
+        self.assertEqual(job.status, 'succeeded')
+        self.assertEqual(job.rows_processed, 2)
+        self.assertEqual(job.rows_failed, 0)
+        self.assertIsNotNone(job.finished_at)
+        self.assertEqual(Question.objects.filter(course_id=self.course).count(), 2)
+        self.assertFalse(os.path.exists(self.path))
+
+    @mock.patch.object(IngestionWorkerPool, 'ensure_started')
+    def test_async_upload_returns_job_and_status(self, _):
+        client = APIClient()
+        client.force_authenticate(self.user)
+        with open(self.path, 'rb') as f:
+            upload = SimpleUploadedFile("bank.docx", f.read())
+        response = client.post('/api/upload-question/', {
+            'course_id': 'IS101', 'file': upload, 'async': 'true'
+        }, format='multipart')
+
+        self.assertEqual(response.status_code, 202)
+        job_id = response.data['job']['job_id']
+        self.assertEqual(Question.objects.count(), 0)
+
+        IngestionWorkerPool.run_pending()
+        response = client.get(f'/api/upload-jobs/{job_id}/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['job']['status'], 'succeeded')
+        self.assertEqual(response.data['job']['rows_processed'], 2)
+        self.assertFalse(IngestionJob.objects.filter(status='queued').exists())
+
+    @mock.patch.object(IngestionWorkerPool, 'ensure_started')
+    def test_only_jobs_with_a_lapsed_lease_are_requeued(self, _):
+        now = timezone.now()
+        alive = enqueue_job(self.course, self.faculty, self.path, "alive.docx")
+        dead = enqueue_job(self.course, self.faculty, self.path, "dead.docx")
+        legacy = enqueue_job(self.course, self.faculty, self.path, "legacy.docx")
+        # Started long ago, but still beating: a large upload in progress
+        IngestionJob.objects.filter(pk=alive.pk).update(
+            status='running', started_at=now - timedelta(hours=2), heartbeat_at=now - timedelta(seconds=10)
+        )
+        IngestionJob.objects.filter(pk=dead.pk).update(
+            status='running', started_at=now - timedelta(minutes=5), heartbeat_at=now - timedelta(minutes=3)
+        )
+        # Claimed before jobs had heartbeats
+        IngestionJob.objects.filter(pk=legacy.pk).update(status='running', started_at=now - timedelta(minutes=5))
+
+        with override_settings(INGESTION_JOB_LEASE=120):
+            IngestionWorkerPool.requeue_stale_jobs()
+
+        statuses = dict(IngestionJob.objects.values_list('original_name', 'status'))
+        self.assertEqual(statuses, {'alive.docx': 'running', 'dead.docx': 'queued', 'legacy.docx': 'queued'})
+        self.assertIsNone(IngestionJob.objects.get(pk=dead.pk).heartbeat_at)
+
+    def test_heartbeat_renews_the_lease(self):
+        job = IngestionJob.objects.create(
+            course_id=self.course, file_path=self.path, original_name="bank.docx",
+            status='running', heartbeat_at=timezone.now() - timedelta(minutes=1),
+        )
+        before = job.heartbeat_at
+        stop = mock.Mock(spec=threading.Event)
+        stop.wait.side_effect = [False, True]  # one beat, then the job finishes
+        with mock.patch('api.utils.ingestion_jobs.connection'):
+            IngestionWorkerPool.heartbeat(job, stop)
+        job.refresh_from_db()
+        self.assertGreater(job.heartbeat_at, before)
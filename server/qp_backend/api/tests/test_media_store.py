@@ -0,0 +1,86 @@
+import os
+import time
+import shutil
+import tempfile
+from unittest import mock
+
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from api.models import CustomUser, Department, Course, QuestionMedia
+from api.parser import ingest_questions
+from api.tests.test_parser import build_question_bank, make_png
+from api.utils import media_store
+from api.utils.media_store import MediaStore
+
+
+class TestMediaStore(TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.root = os.path.join(self.tmpdir, "store")
+        self.settings_override = override_settings(QUESTION_MEDIA_ROOT=self.root)
+        self.settings_override.enable()
+        media_store._default_store = None
+
+    def tearDown(self):
+        self.settings_override.disable()
+        media_store._default_store = None
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+    def test_put_is_content_addressed_and_sharded(self):
+        store = MediaStore(self.root)
+        blob = make_png()
+        path = store.put(blob)
+        digest = MediaStore.digest(blob)
+
+        self.assertEqual(path, os.path.join(self.root, digest[:2], digest[2:4], f"{digest}.png"))
+        self.assertEqual(store.put(blob), path)
+        self.assertEqual(store.locate(digest), path)
+        self.assertIsNone(store.locate("not-a-digest"))
+
+    def test_repeated_image_is_stored_once(self):
+        Course.objects.create(course_id="IS101", course_name="Intro", department_id=Department.objects.create(dept_name="IS"))
+        logo = make_png()
+        bank = build_question_bank(os.path.join(self.tmpdir, "bank.docx"), [
+            ("Question one", 2, 1, "CO1", "BT1", logo),
+            ("Question two", 2, 1, "CO1", "BT1", logo),
+            ("Question three", 2, 1, "CO1", "BT1", make_png((0, 0, 255))),
+        ])
+        ingest_questions(bank, "IS101")
+
+        paths = [m.image_paths[0] for m in QuestionMedia.objects.order_by('qm_id')]
+        self.assertEqual(paths[0], paths[1])
+        self.assertNotEqual(paths[0], paths[2])
+        stored = [f for _, _, files in os.walk(self.root) for f in files if not f.endswith('.webp')]
+        self.assertEqual(len(stored), 2)
+
+    def test_image_endpoint_is_cacheable(self):
+        path = media_store.get_media_store().put(make_png())
+        digest = os.path.basename(path).split('.')[0]
+        client = APIClient()
+        client.force_authenticate(CustomUser.objects.create_user(
+            username="faculty1", email="f1@example.com", password="pw", role="faculty"
+        ))
+
+        response = client.get(media_store.image_url(path))
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('immutable', response['Cache-Control'])
+        self.assertEqual(response['ETag'], f'"{digest}"')
+        response.close()
+
+        response = client.get(media_store.image_url(path), HTTP_IF_NONE_MATCH=f'"{digest}"')
+        self.assertEqual(response.status_code, 304)
+
+    def test_signed_url_needs_no_token_and_expires(self):
+        path = media_store.get_media_store().put(make_png())
+        url = media_store.image_url(path)
+        client = APIClient()
+
+        response = client.get(url)
+        self.assertEqual(response.status_code, 200)
+        response.close()
+        self.assertEqual(client.get(url.replace('signature=', 'signature=x')).status_code, 403)
+        self.assertEqual(client.get(url.split('?')[0]).status_code, 403)
+
+        with mock.patch.object(media_store.time, 'time', return_value=time.time() + 3 * 3600):
+            self.assertEqual(client.get(url).status_code, 403)
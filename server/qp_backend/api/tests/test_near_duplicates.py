@@ -0,0 +1,84 @@
+import numpy as np
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from api.models import CustomUser, Department, Course, Unit, Question
+from api.parser import BatchQuestionIngestor, IngestionStats
+from api.utils.fingerprints import minhash_signature
+from api.utils import near_duplicates
+from api.utils.near_duplicates import LSHIndex, get_lsh_index, similar_questions
+
+TEXTS = [
+    "Explain the working of a doubly linked list with a neat diagram",
+    "Explain working of doubly linked lists with neat diagrams.",
+    "Explain the working of a doubly linked list, with a neat diagram",
+    "Insert the keys 10, 20, 5 into a binary search tree",
+    "Define a stack and list its applications",
+]
+
+
+def record(text, marks=5):
+    return BatchQuestionIngestor.build_record(
+        ['1', text, '', str(marks), '1', 'CO1', 'BT2'], [], []
+    ) | {'image_paths': [], 'thumbnails': []}
+
+
+class TestNearDuplicates(TestCase):
+    def setUp(self):
+        near_duplicates._indexes.clear()
+        department = Department.objects.create(dept_name="Computer Science")
+        self.course = Course.objects.create(course_id="CS234", course_name="Data Structures", department_id=department)
+        unit = Unit.objects.create(unit_id=1, unit_name="Lists", course_id=self.course)
+        self.q = [
+            Question.objects.create(unit_id=unit, course_id=self.course, text=text, marks=5, co="CO1", bt="BT2")
+            for text in TEXTS
+        ]
+        self.client = APIClient()
+        self.client.force_authenticate(
+            CustomUser.objects.create_user(username="faculty1", email="jane@example.com", password="pw", role="faculty")
+        )
+
+    def test_signature_tracks_rewording(self):
+        a, b, c = (np.frombuffer(minhash_signature(TEXTS[i]), dtype=np.uint32) for i in (0, 1, 3))
+        self.assertGreater((a == b).mean(), 0.5)
+        self.assertLess((a == c).mean(), 0.2)
+        self.assertEqual(minhash_signature("  "), b'')
+
+    def test_clusters_group_reworded_questions(self):
+        response = self.client.get('/api/course/CS234/questions/duplicates/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['questions_indexed'], 5)
+        self.assertEqual(len(response.data['clusters']), 1)
+        self.assertEqual([q['id'] for q in response.data['clusters'][0]['questions']], [q.q_id for q in self.q[:3]])
+
+    def test_index_is_rebuilt_after_bank_changes(self):
+        index = get_lsh_index("CS234")
+        self.assertIs(get_lsh_index("CS234"), index)
+        self.q[4].text = "Explain working of a doubly linked list with a neat diagram"
+        self.q[4].save()
+        self.assertIsNot(get_lsh_index("CS234"), index)
+        self.assertIn(self.q[4].q_id, [q_id for q_id, _ in get_lsh_index("CS234").query(self.q[0].minhash, 0.5)])
+
+    def test_similar_check(self):
+        result = similar_questions("CS234", "Explain the working of doubly linked list with neat diagram")
+        self.assertEqual([m['id'] for m in result['results'][0]['matches']][:1], [self.q[0].q_id])
+        self.assertEqual(similar_questions("CS234", ["Merge sort"])['results'][0]['matches'], [])
+
+        response = self.client.post('/api/course/CS234/questions/similar/', {'texts': []}, format='json')
+        self.assertEqual(response.status_code, 400)
+
+    def test_ingestion_reports_similar_rows(self):
+        stats = IngestionStats()
+        BatchQuestionIngestor.write_records(
+            [record("Explain the working of doubly linked lists with a neat diagram"), record("Explain quick sort")],
+            self.course, stats=stats,
+        )
+        report = stats.as_dict()
+        self.assertEqual(report['rows_similar'], 1)
+        self.assertEqual(report['similar_questions'][0]['similar_to'][0]['id'], self.q[0].q_id)
+        self.assertEqual(len(get_lsh_index("CS234")), 7)
+
+    def test_empty_index(self):
+        index = LSHIndex([], np.empty((0, 128), dtype=np.uint32))
+        self.assertEqual(index.clusters(0.5), [])
+        self.assertEqual(index.query(minhash_signature("anything"), 0.5), [])
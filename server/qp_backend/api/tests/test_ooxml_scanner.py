@@ -0,0 +1,83 @@
+import os
+import shutil
+import tempfile
+
+import docx
+from docx.oxml import parse_xml
+from django.test import SimpleTestCase
+
+from api.parser import BatchQuestionIngestor, IngestionStats
+from api.tests.test_parser import build_question_bank, make_png
+from api.utils.ooxml_scanner import OOXMLRowScanner, UnsupportedLayout
+
+OMML = (
+    '<m:oMath xmlns:m="http://schemas.openxmlformats.org/officeDocument/2006/math">'
+    '<m:sSup><m:e><m:r><m:t>x</m:t></m:r></m:e><m:sup><m:r><m:t>2</m:t></m:r></m:sup></m:sSup>'
+    '</m:oMath>'
+)
+
+
+class TestOOXMLRowScanner(SimpleTestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmpdir, "bank.docx")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+    def build_rich_bank(self):
+        build_question_bank(self.path, [
+            ("Find the roots", 2, 1, "CO1", "BT1", make_png()),
+            ("Plain question", 5, 2, "CO2", "BT2"),
+            ("Second table question", 10, 3, "CO3", "BT3"),
+        ])
+        doc = docx.Document(self.path)
+        cell = doc.tables[0].rows[1].cells[1]
+        cell.paragraphs[0]._p.append(parse_xml(OMML))
+        run = cell.add_paragraph().add_run("line one")
+        run.add_break()
+        run.add_tab()
+        run.add_text("after tab")
+        doc.save(self.path)
+
+    def test_scanner_matches_python_docx(self):
+        self.build_rich_bank()
+        scanned = BatchQuestionIngestor.scan_rows(self.path, IngestionStats())
+        loaded = BatchQuestionIngestor.read_rows_docx(self.path, IngestionStats())
+
+        self.assertEqual(len(scanned), 3)
+        self.assertEqual(scanned, loaded)
+        self.assertEqual(scanned[0]['text'], "Find the roots\nline one\n\tafter tab")
+        self.assertEqual(scanned[0]['equations'][0]['text'], "x 2")
+        self.assertEqual(scanned[0]['images'], [make_png()])
+
+    def test_each_table_header_row_is_skipped(self):
+        build_question_bank(self.path, [("Q1", 2, 1, "CO1", "BT1")])
+        doc = docx.Document(self.path)
+        second = doc.add_table(rows=2, cols=7)
+        for cell, value in zip(second.rows[1].cells, ["1", "Q2", "", "4", "2", "CO2", "BT2"]):
+            cell.text = value
+        doc.save(self.path)
+
+        with OOXMLRowScanner(self.path) as scanner:
+            rows = list(scanner.iter_rows())
+        self.assertEqual([row['texts'][1] for row in rows], ["Q1", "Q2"])
+
+    def test_merged_cells_fall_back_to_python_docx(self):
+        build_question_bank(self.path, [
+            ("Q1", 2, 1, "CO1", "BT1"),
+            ("Q2", 4, 1, "CO1", "BT1"),
+        ])
+        doc = docx.Document(self.path)
+        table = doc.tables[0]
+        table.cell(1, 5).merge(table.cell(2, 5))
+        doc.save(self.path)
+
+        with OOXMLRowScanner(self.path) as scanner:
+            with self.assertRaises(UnsupportedLayout):
+                list(scanner.iter_rows())
+
+        stats = IngestionStats()
+        records = BatchQuestionIngestor.read_rows(self.path, stats)
+        self.assertEqual([r['text'] for r in records], ["Q1", "Q2"])
+        self.assertEqual(stats.rows_total, 2)
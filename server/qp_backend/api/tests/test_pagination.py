@@ -0,0 +1,78 @@
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from api.models import CustomUser, Department, Course, Unit, Question
+
+
+class TestKeysetPagination(TestCase):
+    def setUp(self):
+        department = Department.objects.create(dept_name="Computer Science")
+        self.ids = {}
+        for course_id in ("CS300", "CS234"):
+            course = Course.objects.create(course_id=course_id, course_name=course_id, department_id=department)
+            unit = Unit.objects.create(unit_id=1, unit_name="Unit 1", course_id=course)
+            self.ids[course_id] = [
+                Question.objects.create(unit_id=unit, course_id=course, text=f"{course_id} question {i}", marks=5).q_id
+                for i in range(7)
+            ]
+        self.client = APIClient()
+        self.client.force_authenticate(
+            CustomUser.objects.create_user(username="faculty1", email="jane@example.com", password="pw", role="faculty")
+        )
+
+    def collect(self, url, params):
+        seen, pages = [], 0
+        while url:
+            response = self.client.get(url, params if pages == 0 else None)
+            self.assertEqual(response.status_code, 200)
+            seen += [q['q_id'] for q in response.data['questions']]
+            pages += 1
+            url = response.data['next']
+        return seen, pages
+
+    def test_pages_through_all_questions_in_key_order(self):
+        seen, pages = self.collect('/api/questions/', {'page_size': 3})
+        self.assertEqual(seen, self.ids["CS234"] + self.ids["CS300"])
+        self.assertEqual(pages, 5)
+
+    def test_course_listing_is_paginated(self):
+        response = self.client.get('/api/course/CS300/questions/', {'page_size': 5})
+        self.assertEqual([q['q_id'] for q in response.data['questions']], self.ids["CS300"][:5])
+        self.assertEqual(response.data['page_size'], 5)
+
+        response = self.client.get('/api/course/CS300/questions/', {'page_size': 5, 'cursor': response.data['next_cursor']})
+        self.assertEqual([q['q_id'] for q in response.data['questions']], self.ids["CS300"][5:])
+        self.assertIsNone(response.data['next'])
+
+    def test_next_page_continues_after_the_cursor_key(self):
+        first = self.client.get('/api/questions/', {'page_size': 7})
+        unit = Unit.objects.get(course_id="CS234")
+        Question.objects.create(unit_id=unit, course_id_id="CS234", text="late addition", marks=5)
+        second = self.client.get(first.data['next'])
+        self.assertEqual([q['q_id'] for q in second.data['questions']][:1], [Question.objects.get(text="late addition").q_id])
+        self.assertNotIn(self.ids["CS234"][0], [q['q_id'] for q in second.data['questions']])
+
+    def test_invalid_cursor(self):
+        response = self.client.get('/api/questions/', {'cursor': 'not-a-cursor'})
+        self.assertEqual(response.status_code, 404)
+
+    def test_listing_is_paged_by_default(self):
+        unit = Unit.objects.get(course_id="CS300")
+        Question.objects.bulk_create([
+            Question(unit_id=unit, course_id_id="CS300", text=f"bulk question {i}", marks=2) for i in range(60)
+        ])
+        expected = list(Question.objects.filter(course_id="CS300").order_by('q_id').values_list('q_id', flat=True))
+
+        response = self.client.get('/api/course/CS300/questions/')
+        self.assertEqual([q['q_id'] for q in response.data['questions']], expected[:50])
+        self.assertEqual(response.data['page_size'], 50)
+        self.assertIsNotNone(response.data['next_cursor'])
+
+        # Oversized requests are clamped to QUESTION_PAGE_SIZE_MAX
+        with self.settings(QUESTION_PAGE_SIZE_MAX=20):
+            response = self.client.get('/api/questions/', {'page_size': 10000})
+        self.assertEqual(len(response.data['questions']), 20)
+
+        seen, pages = self.collect('/api/course/CS300/questions/', {})
+        self.assertEqual(seen, expected)
+        self.assertEqual(pages, 2)
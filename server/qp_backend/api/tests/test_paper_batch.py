@@ -0,0 +1,97 @@
+import io
+import json
+import shutil
+import zipfile
+import tempfile
+
+from django.test import TestCase, override_settings
+from docx import Document
+from rest_framework.test import APIClient
+
+from api.models import CustomUser, Department, Course, Unit, Faculty, Question
+from api.tests.test_paper_templates import Metadata
+from api.utils import paper_cache
+from api.utils.paper_batch import PaperBatch, PaperBatchError, set_labels
+from api.utils.render_context import PaperRenderContext
+
+
+class TestPaperBatch(TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.settings_override = override_settings(PAPER_CACHE_DIR=self.tmpdir)
+        self.settings_override.enable()
+        paper_cache._default_cache = None
+
+        department = Department.objects.create(dept_name="Computer Science")
+        course = Course.objects.create(course_id="CS234", course_name="Data Structures", department_id=department)
+        unit = Unit.objects.create(unit_id=1, unit_name="Lists", course_id=course)
+        self.user = CustomUser.objects.create_user(
+            username="faculty1", email="jane@example.com", password="pw", role="faculty"
+        )
+        self.faculty = Faculty.objects.create(f_id="1", name="Jane Doe", email="jane@example.com", user=self.user)
+        self.q = [
+            Question.objects.create(unit_id=unit, course_id=course, text=f"Question {i}", marks=5, co="CO1", bt="BT2").q_id
+            for i in range(6)
+        ]
+        self.selections = [
+            {'A': [self.q[0], self.q[1]], 'B': [self.q[2]]},
+            {'A': [self.q[3], self.q[4]], 'B': [self.q[5]]},
+            {'A': [self.q[1], self.q[0]], 'B': [self.q[5]]},
+        ]
+
+    def tearDown(self):
+        self.settings_override.disable()
+        paper_cache._default_cache = None
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+    def test_set_labels(self):
+        self.assertEqual(set_labels(3), ['A', 'B', 'C'])
+        self.assertEqual(set_labels(28)[-3:], ['Z', 'AA', 'AB'])
+
+    def test_load_many_shares_two_queries(self):
+        with self.assertNumQueries(2):
+            contexts = PaperRenderContext.load_many(self.selections)
+        self.assertEqual([c.parts for c in contexts], self.selections)
+        self.assertEqual(set(contexts[1].questions), {self.q[3], self.q[4], self.q[5]})
+
+    def test_builds_zip_with_manifest_and_reuses_cache(self):
+        PaperBatch(Metadata("CS234", self.faculty), self.selections[:1]).build()
+
+        archive, manifest = PaperBatch(Metadata("CS234", self.faculty), self.selections).build(workers=2)
+        with zipfile.ZipFile(archive) as zf:
+            names = zf.namelist()
+            paper_b = Document(io.BytesIO(zf.read('question_paper_B.docx')))
+            self.assertEqual(json.loads(zf.read('manifest.json')), manifest)
+
+        self.assertEqual(names, [
+            'question_paper_A.docx', 'question_paper_B.docx', 'question_paper_C.docx', 'manifest.json'
+        ])
+        self.assertEqual([p['cache'] for p in manifest['papers']], ['hit', 'miss', 'miss'])
+        self.assertEqual(manifest['papers'][1]['total_marks'], 15)
+        self.assertEqual(paper_b.tables[1].cell(1, 1).text, "Question 3")
+
+    def test_rejects_bad_sets(self):
+        metadata = Metadata("CS234", self.faculty)
+        with self.assertRaises(PaperBatchError):
+            PaperBatch(metadata, [])
+        with self.assertRaises(PaperBatchError):
+            PaperBatch(metadata, self.selections[:2], labels=['X', 'X'])
+        with self.assertRaises(PaperBatchError):
+            PaperBatch(metadata, self.selections[:1], labels=['../evil'])
+
+    def test_endpoint_returns_zip(self):
+        client = APIClient()
+        client.force_authenticate(self.user)
+        response = client.post('/api/generate-paper/sets/', {
+            'course_code': 'CS234', 'course_title': 'Data Structures', 'date': '2026-03-14',
+            'max_marks': 50, 'duration': '90 mins', 'semester': '3',
+            'sets': [
+                {'label': 'P1', 'part_a': self.selections[0]['A'], 'part_b': self.selections[0]['B']},
+                {'label': 'P2', 'part_a': self.selections[1]['A'], 'part_b': self.selections[1]['B']},
+            ],
+        }, format='json')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'application/zip')
+        with zipfile.ZipFile(io.BytesIO(b''.join(response.streaming_content))) as zf:
+            self.assertIn('question_paper_P2.docx', zf.namelist())
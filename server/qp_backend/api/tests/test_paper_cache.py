@@ -0,0 +1,121 @@
+import os
+import time
+import shutil
+import tempfile
+from datetime import datetime
+
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from api.models import CustomUser, Department, Course, Unit, Faculty, Question
+from api.tests.test_paper_templates import Metadata
+from api.utils import paper_cache
+from api.utils.paper_cache import PaperCache, paper_cache_key
+from api.utils.render_context import PaperRenderContext
+
+
+class TestPaperCache(TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.settings_override = override_settings(PAPER_CACHE_DIR=self.tmpdir)
+        self.settings_override.enable()
+        paper_cache._default_cache = None
+
+        department = Department.objects.create(dept_name="Computer Science")
+        self.course = Course.objects.create(course_id="CS234", course_name="Data Structures", department_id=department)
+        unit = Unit.objects.create(unit_id=1, unit_name="Lists", course_id=self.course)
+        self.user = CustomUser.objects.create_user(
+            username="faculty1", email="jane@example.com", password="pw", role="faculty"
+        )
+        self.faculty = Faculty.objects.create(f_id="1", name="Jane Doe", email="jane@example.com", user=self.user)
+        self.questions = [
+            Question.objects.create(unit_id=unit, course_id=self.course, text=f"Question {i}", marks=5, co="CO1", bt="BT2")
+            for i in range(3)
+        ]
+        self.parts = {'A': [self.questions[0].q_id, self.questions[1].q_id], 'B': [self.questions[2].q_id]}
+
+    def tearDown(self):
+        self.settings_override.disable()
+        paper_cache._default_cache = None
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+    def key(self, metadata=None, parts=None):
+        context = PaperRenderContext.load(parts or self.parts)
+        return paper_cache_key(metadata or Metadata("CS234", self.faculty), context, "HEADING")
+
+    def test_key_tracks_metadata_selection_and_content(self):
+        key = self.key()
+        self.assertEqual(key, self.key())
+
+        later = Metadata("CS234", self.faculty)
+        later.date = datetime(2026, 3, 15)
+        self.assertNotEqual(key, self.key(metadata=later))
+        self.assertNotEqual(key, self.key(parts={'A': self.parts['A'][::-1], 'B': self.parts['B']}))
+
+        question = self.questions[2]
+        question.marks = 10
+        question.save()
+        self.assertNotEqual(key, self.key())
+
+    def test_case_only_edit_is_a_cache_miss(self):
+        key = self.key()
+        question = self.questions[0]
+        question.text = question.text.upper()
+        question.save()
+        self.assertNotEqual(key, self.key())
+
+        key = self.key()
+        question.co = "co1"
+        question.save()
+        self.assertNotEqual(key, self.key())
+
+    def test_eviction_keeps_cache_under_budget(self):
+        cache = PaperCache(self.tmpdir, max_bytes=350)
+        for age, key in [(30, 'a'), (20, 'b'), (10, 'c')]:
+            cache.put(key, lambda f: f.write(b'x' * 100)).close()
+            os.utime(cache.path_for(key), (time.time() - age, time.time() - age))
+        cache.open('a').close()  # now the most recently used
+        self.assertIsNone(cache.open('missing'))
+
+        cache.put('d', lambda f: f.write(b'x' * 100)).close()
+        self.assertEqual(sorted(os.listdir(self.tmpdir)), ['a.docx', 'c.docx', 'd.docx'])
+
+    def test_open_entries_survive_eviction(self):
+        cache = PaperCache(self.tmpdir, max_bytes=150)
+        with cache.put('a', lambda f: f.write(b'a' * 100)) as first:
+            # Storing 'b' evicts 'a' while it is still being served
+            cache.put('b', lambda f: f.write(b'b' * 100)).close()
+            self.assertIsNone(cache.open('a'))
+            self.assertEqual(first.read(), b'a' * 100)
+
+    def test_regenerating_same_paper_hits_cache(self):
+        client = APIClient()
+        client.force_authenticate(self.user)
+        payload = {
+            'course_code': 'CS234', 'course_title': 'Data Structures', 'date': '2026-03-14',
+            'max_marks': 50, 'duration': '90 mins', 'semester': '3',
+            'selected_questions': {'part_a': self.parts['A'], 'part_b': self.parts['B']},
+        }
+        first = client.post('/api/generate-paper/', payload, format='json')
+        self.assertEqual(first['X-Paper-Cache'], 'miss')
+        first_body = b''.join(first.streaming_content)
+        second = client.post('/api/generate-paper/', payload, format='json')
+        self.assertEqual(second['X-Paper-Cache'], 'hit')
+        self.assertEqual(b''.join(second.streaming_content), first_body)
+        self.assertEqual(len(os.listdir(self.tmpdir)), 1)
+
+    def test_stream_delivery_skips_the_disk(self):
+        client = APIClient()
+        client.force_authenticate(self.user)
+        response = client.post('/api/generate-paper/?delivery=stream', {
+            'course_code': 'CS234', 'course_title': 'Data Structures', 'date': '2026-03-14',
+            'max_marks': 50, 'duration': '90 mins', 'semester': '3',
+            'selected_questions': {'part_a': self.parts['A'], 'part_b': self.parts['B']},
+        }, format='json')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['X-Paper-Cache'], 'bypass')
+        body = b''.join(response.streaming_content)
+        self.assertEqual(int(response['Content-Length']), len(body))
+        self.assertTrue(body.startswith(b'PK'))
+        self.assertEqual(os.listdir(self.tmpdir), [])
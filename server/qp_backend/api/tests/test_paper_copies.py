@@ -0,0 +1,100 @@
+import io
+import json
+import zipfile
+
+from django.test import TestCase
+from docx import Document
+from rest_framework.test import APIClient
+
+from api.models import CustomUser, Department, Course, Unit, Faculty, Question
+from api.utils.paper_copies import PaperCopies, PaperCopyError, copy_count
+from api.utils.paper_generator import QuestionPaperGenerator
+from api.utils.paper_templates import PaperTemplate
+from api.utils.render_context import PaperRenderContext, QuestionRecord
+
+HEADER = {
+    'date': '14-03-2026', 'max_marks': 50, 'course_code': 'CS234', 'duration': '90 mins',
+    'semester': '3', 'improvement_cie': 'No', 'faculty': 'Jane Doe', 'course_title': 'Data Structures',
+}
+
+
+def question_rows(docx_bytes, table):
+    doc = Document(io.BytesIO(docx_bytes))
+    return [(row.cells[0].text, row.cells[1].text) for row in doc.tables[table].rows[1:]]
+
+
+class TestPaperCopies(TestCase):
+    def setUp(self):
+        questions = {
+            q_id: QuestionRecord(q_id, f"Question {q_id}", 5, 'CO1', 'BT2', 1, 'Lists', '', [], [], [])
+            for q_id in range(1, 9)
+        }
+        self.context = PaperRenderContext(questions, {'A': [1, 2, 3], 'B': [4, 5, 6, 7, 8]})
+        doc = QuestionPaperGenerator.fill(PaperTemplate('DEPARTMENT OF TESTING'), HEADER, self.context)
+        self.copies = PaperCopies(doc, self.context, seed=42)
+
+    def test_first_copy_keeps_the_original_order(self):
+        rows = question_rows(self.copies.build(self.copies.order(1)), 2)
+        self.assertEqual(rows, [(str(n), f"Question {q}") for n, q in enumerate([4, 5, 6, 7, 8], 1)])
+
+    def test_copies_are_seeded_renumbered_permutations(self):
+        order = self.copies.order(7)
+        self.assertEqual(order, self.copies.order(7))
+        data = self.copies.build(order)
+        with zipfile.ZipFile(io.BytesIO(data)) as package:
+            self.assertIsNone(package.testzip())
+
+        rows = question_rows(data, 2)
+        self.assertEqual([n for n, _ in rows], ['1', '2', '3', '4', '5'])
+        self.assertEqual([text for _, text in rows], [f"Question {[4, 5, 6, 7, 8][i]}" for i in order['B']])
+        self.assertEqual(sorted(text for _, text in question_rows(data, 1)), ["Question 1", "Question 2", "Question 3"])
+        self.assertIn("Total Marks: 40", Document(io.BytesIO(data)).paragraphs[-1].text)
+
+    def test_stream_builds_zip_with_manifest(self):
+        archive = zipfile.ZipFile(io.BytesIO(b''.join(self.copies.stream(12))))
+        self.assertEqual(archive.namelist()[:2], ['copy_01.docx', 'copy_02.docx'])
+        manifest = json.loads(archive.read('manifest.json'))
+        self.assertEqual(len(manifest['copies']), 12)
+        orders = {tuple(c['part_b']) for c in manifest['copies']}
+        self.assertGreater(len(orders), 1)
+
+        copy = manifest['copies'][5]
+        rows = question_rows(archive.read(copy['file']), 2)
+        self.assertEqual([text for _, text in rows], [f"Question {q}" for q in copy['part_b']])
+
+    def test_copy_count_limits(self):
+        self.assertEqual(copy_count("30"), 30)
+        for value in (0, 'many', None, 10_000):
+            with self.assertRaises(PaperCopyError):
+                copy_count(value)
+
+
+class TestPaperCopiesView(TestCase):
+    def setUp(self):
+        department = Department.objects.create(dept_name="Computer Science")
+        course = Course.objects.create(course_id="CS234", course_name="Data Structures", department_id=department)
+        unit = Unit.objects.create(unit_id=1, unit_name="Lists", course_id=course)
+        user = CustomUser.objects.create_user(username="faculty1", email="jane@example.com", password="pw", role="faculty")
+        Faculty.objects.create(f_id="1", name="Jane Doe", email="jane@example.com", user=user)
+        self.q = [
+            Question.objects.create(unit_id=unit, course_id=course, text=f"Question {i}", marks=5, co="CO1", bt="BT2").q_id
+            for i in range(4)
+        ]
+        self.client = APIClient()
+        self.client.force_authenticate(user)
+        self.payload = {
+            'course_code': 'CS234', 'course_title': 'Data Structures', 'date': '2026-03-14',
+            'max_marks': 50, 'duration': '90 mins', 'semester': '3',
+            'selected_questions': {'part_a': self.q[:2], 'part_b': self.q[2:]},
+        }
+
+    def test_streams_requested_copies(self):
+        response = self.client.post('/api/generate-paper/copies/', {**self.payload, 'copies': 5, 'seed': 3}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'application/zip')
+        archive = zipfile.ZipFile(io.BytesIO(b''.join(response.streaming_content)))
+        self.assertEqual(len(archive.namelist()), 6)
+
+    def test_rejects_bad_copy_count(self):
+        response = self.client.post('/api/generate-paper/copies/', {**self.payload, 'copies': 0}, format='json')
+        self.assertEqual(response.status_code, 400)
@@ -0,0 +1,121 @@
+import shutil
+import tempfile
+
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from api.models import CustomUser, Department, Course, Unit, Faculty, Question, PaperMetadata
+from api.utils import paper_cache
+
+
+class TestPaperHistory(TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.settings_override = override_settings(PAPER_CACHE_DIR=self.tmpdir)
+        self.settings_override.enable()
+        paper_cache._default_cache = None
+
+        department = Department.objects.create(dept_name="Computer Science")
+        course = Course.objects.create(course_id="CS234", course_name="Data Structures", department_id=department)
+        unit = Unit.objects.create(unit_id=1, unit_name="Lists", course_id=course)
+        self.user = CustomUser.objects.create_user(
+            username="faculty1", email="jane@example.com", password="pw", role="faculty"
+        )
+        Faculty.objects.create(f_id="1", name="Jane Doe", email="jane@example.com", user=self.user)
+        self.q = [
+            Question.objects.create(unit_id=unit, course_id=course, text=f"Question {i}", marks=5, co="CO1", bt="BT2").q_id
+            for i in range(3)
+        ]
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.payload = {
+            'course_code': 'CS234', 'course_title': 'Data Structures', 'date': '2026-03-14',
+            'max_marks': 15, 'duration': '90 mins', 'semester': '3',
+            'selected_questions': {'part_a': [self.q[1], self.q[0]], 'part_b': [self.q[2]]},
+        }
+
+    def tearDown(self):
+        self.settings_override.disable()
+        paper_cache._default_cache = None
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+    def generate(self):
+        response = self.client.post('/api/generate-paper/', self.payload, format='json')
+        self.assertEqual(response.status_code, 200)
+        return int(response['X-Paper-Id'])
+
+    def test_generation_stores_paper_and_selection(self):
+        paper = PaperMetadata.objects.get(pk=self.generate())
+        self.assertEqual(paper.max_marks, 15)
+        self.assertEqual(
+            list(paper.selections.values_list('part', 'question_id', 'order')),
+            [('A', self.q[1], 1), ('A', self.q[0], 2), ('B', self.q[2], 1)],
+        )
+
+    def test_download_uses_cache_then_rebuilds(self):
+        paper_id = self.generate()
+        response = self.client.get(f'/api/papers/{paper_id}/download/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['X-Paper-Cache'], 'hit')
+        first = b''.join(response.streaming_content)
+
+        shutil.rmtree(self.tmpdir)
+        paper_cache._default_cache = None
+        response = self.client.get(f'/api/papers/{paper_id}/download/')
+        self.assertEqual(response['X-Paper-Cache'], 'miss')
+        self.assertEqual(len(b''.join(response.streaming_content)), len(first))
+
+    def test_history_lists_own_papers(self):
+        self.generate()
+        response = self.client.get('/api/papers/', {'course_code': 'CS234'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['count'], 1)
+        self.assertEqual(response.data['results'][0]['question_count'], 3)
+        self.assertEqual(response.data['results'][0]['total_marks'], 15)
+
+        self.assertEqual(self.client.get('/api/papers/', {'course_code': 'MA101'}).data['count'], 0)
+
+    def test_other_faculty_cannot_download(self):
+        paper_id = self.generate()
+        other = CustomUser.objects.create_user(username="faculty2", email="john@example.com", password="pw", role="faculty")
+        Faculty.objects.create(f_id="2", name="John Roe", email="john@example.com", user=other)
+        self.client.force_authenticate(other)
+
+        self.assertEqual(self.client.get(f'/api/papers/{paper_id}/download/').status_code, 403)
+        self.assertEqual(self.client.get('/api/papers/').data['count'], 0)
+        self.assertEqual(self.client.get('/api/papers/999/download/').status_code, 404)
+
+    def test_improvement_flag_is_parsed_strictly(self):
+        self.payload['is_improvement_cie'] = 'false'
+        self.assertFalse(PaperMetadata.objects.get(pk=self.generate()).is_improvement_cie)
+        self.payload['is_improvement_cie'] = 'true'
+        self.assertTrue(PaperMetadata.objects.get(pk=self.generate()).is_improvement_cie)
+
+        self.payload['is_improvement_cie'] = 'maybe'
+        response = self.client.post('/api/generate-paper/', self.payload, format='json')
+        self.assertEqual(response.status_code, 400)
+
+    def test_bad_header_fields_are_a_bad_request(self):
+        for field, value in (('date', '14-03-2026'), ('date', None), ('max_marks', 'fifteen'), ('max_marks', None),
+                             ('course_code', None), ('course_title', '  '), ('duration', None), ('semester', 'x' * 21)):
+            payload = {**self.payload, field: value}
+            response = self.client.post('/api/generate-paper/', payload, format='json')
+            self.assertEqual(response.status_code, 400, (field, value))
+            self.assertIn(field, response.data['error'])
+        self.assertFalse(PaperMetadata.objects.exists())
+
+    def test_sets_and_copies_are_stored_but_previews_are_not(self):
+        response = self.client.post('/api/generate-paper/preview/', self.payload, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(PaperMetadata.objects.exists())
+
+        sets = {**self.payload, 'sets': [{'part_a': [self.q[0]], 'part_b': [self.q[2]]}, {'part_a': [self.q[1]]}]}
+        response = self.client.post('/api/generate-paper/sets/', sets, format='json')
+        self.assertEqual(response.status_code, 200)
+        ids = [int(i) for i in response['X-Paper-Ids'].split(',')]
+        self.assertEqual([PaperMetadata.objects.get(pk=i).selections.count() for i in ids], [2, 1])
+
+        response = self.client.post('/api/generate-paper/copies/', {**self.payload, 'copies': 2}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(PaperMetadata.objects.get(pk=response['X-Paper-Id']).selections.count(), 3)
+        self.assertEqual(PaperMetadata.objects.count(), 3)
@@ -0,0 +1,89 @@
+from django.test import TestCase
+from lxml import etree
+from rest_framework.test import APIClient
+
+from api.models import CustomUser, Department, Course, Unit, Faculty, Question, QuestionMedia
+from api.tests.test_paper_templates import Metadata
+from api.utils.equations import get_equation_converter
+from api.utils.paper_preview import equation_markup, render_preview, safe_mathml
+from api.utils.render_context import PaperRenderContext
+
+OMML = (
+    '<m:oMath xmlns:m="http://schemas.openxmlformats.org/officeDocument/2006/math">'
+    '<m:f><m:num><m:r><m:t>1</m:t></m:r></m:num><m:den><m:r><m:t>2</m:t></m:r></m:den></m:f></m:oMath>'
+)
+DIGEST = 'ab' * 32
+
+
+class TestPaperPreview(TestCase):
+    def setUp(self):
+        department = Department.objects.create(dept_name="Computer Science")
+        course = Course.objects.create(course_id="CS234", course_name="Data Structures", department_id=department)
+        unit = Unit.objects.create(unit_id=1, unit_name="Lists", course_id=course)
+        self.user = CustomUser.objects.create_user(
+            username="faculty1", email="jane@example.com", password="pw", role="faculty"
+        )
+        self.faculty = Faculty.objects.create(f_id="1", name="Jane Doe", email="jane@example.com", user=self.user)
+        self.q = [
+            Question.objects.create(unit_id=unit, course_id=course, text=f"Question {i} <b>", marks=5, co="CO1", bt="BT2")
+            for i in range(3)
+        ]
+        QuestionMedia.objects.create(
+            question_id=self.q[0],
+            equations=[get_equation_converter().convert(etree.fromstring(OMML))],
+            image_paths=[f"images/sha256/ab/{DIGEST}.png"],
+            thumbnails=[f"images/sha256/cd/{'cd' * 32}.webp"],
+        )
+        self.parts = {'A': [self.q[0].q_id, self.q[1].q_id], 'B': [self.q[2].q_id]}
+
+    def test_preview_mirrors_paper_structure(self):
+        context = PaperRenderContext.load(self.parts)
+        html = render_preview(Metadata("CS234", self.faculty), context, "DEPARTMENT OF COMPUTER SCIENCE")
+
+        self.assertIn("DEPARTMENT OF COMPUTER SCIENCE", html)
+        self.assertIn("Part- A", html)
+        self.assertIn("Part- B", html)
+        self.assertIn("Total Marks: 15", html)
+        self.assertIn("Question 0 &lt;b&gt;", html)
+        self.assertIn('<mfrac>', html)
+        self.assertIn(f'src="/api/question-images/{"cd" * 32}/?expires=', html)
+        self.assertIn('loading="lazy"', html)
+        self.assertIn(f'href="/api/question-images/{DIGEST}/?expires=', html)
+        self.assertIn("the paper's maximum is 50", html)
+
+    def test_mathml_is_sanitized(self):
+        self.assertIsNone(safe_mathml('<math><script>alert(1)</script></math>'))
+        self.assertEqual(
+            safe_mathml('<math xmlns="http://www.w3.org/1998/Math/MathML"><mi onclick="x()" mathvariant="bold">x</mi></math>'),
+            '<math xmlns="http://www.w3.org/1998/Math/MathML"><mi mathvariant="bold">x</mi></math>',
+        )
+        self.assertIn('&lt;svg', equation_markup({'omml': '', 'mathml': '<svg/>', 'text': '<svg>'}))
+
+    def test_legacy_omml_is_converted(self):
+        self.assertIn('<mfrac>', equation_markup({'mathml': OMML, 'text': '1 2'}))
+
+    def test_endpoint_returns_html(self):
+        client = APIClient()
+        client.force_authenticate(self.user)
+        response = client.post('/api/generate-paper/preview/', {
+            'course_code': 'CS234', 'course_title': 'Data Structures', 'date': '2026-03-14',
+            'max_marks': 15, 'duration': '90 mins', 'semester': '3',
+            'selected_questions': {'part_a': self.parts['A'], 'part_b': self.parts['B']},
+        }, format='json')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['Content-Type'].startswith('text/html'))
+        self.assertEqual(response['X-Paper-Total-Marks'], '15')
+        self.assertNotIn('class="warning"', response.content.decode())
+
+    def test_endpoint_links_are_absolute(self):
+        client = APIClient()
+        client.force_authenticate(self.user)
+        response = client.post('/api/generate-paper/preview/', {
+            'course_code': 'CS234', 'course_title': 'Data Structures', 'date': '2026-03-14',
+            'max_marks': 15, 'duration': '90 mins', 'semester': '3',
+            'selected_questions': {'part_a': self.parts['A'], 'part_b': self.parts['B']},
+        }, format='json')
+        html = response.content.decode()
+        self.assertIn(f'src="http://testserver/api/question-images/{"cd" * 32}/?expires=', html)
+        self.assertNotIn('data:', html)
@@ -0,0 +1,126 @@
+import os
+import pickle
+import shutil
+import tempfile
+from datetime import datetime
+
+from django.test import TestCase, override_settings
+
+from rest_framework.test import APIClient
+
+from api.models import CustomUser, Department, Course, Unit, Faculty, Question, QuestionMedia
+from api.tests.test_parser import make_png
+from api.utils import media_store
+from api.utils.paper_generator import QuestionPaperGenerator
+from api.utils.paper_templates import get_paper_template, department_heading
+from api.utils.render_context import PaperRenderContext, UnknownQuestionsError
+
+
+class Metadata:
+    def __init__(self, course_code, faculty):
+        self.course_code = course_code
+        self.course_title = "Data Structures"
+        self.date = datetime(2026, 3, 14)
+        self.max_marks = 50
+        self.duration = "90 mins"
+        self.semester = "3"
+        self.faculty = faculty
+        self.is_improvement_cie = False
+
+
+class Selection:
+    def __init__(self, question, part):
+        self.question = question
+        self.part = part
+
+
+class TestPaperTemplates(TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.settings_override = override_settings(QUESTION_MEDIA_ROOT=self.tmpdir)
+        self.settings_override.enable()
+        media_store._default_store = None
+
+        department = Department.objects.create(dept_name="Computer Science")
+        self.course = Course.objects.create(course_id="CS234", course_name="Data Structures", department_id=department)
+        unit = Unit.objects.create(unit_id=1, unit_name="Lists", course_id=self.course)
+        self.faculty = Faculty.objects.create(f_id="1", name="Jane Doe", email="jane@example.com")
+        self.questions = [
+            Question.objects.create(unit_id=unit, course_id=self.course, text=f"Question {i}", marks=i + 1, co="CO1", bt="BT2")
+            for i in range(4)
+        ]
+        QuestionMedia.objects.create(
+            question_id=self.questions[0],
+            image_paths=[media_store.get_media_store().put(make_png())],
+            equations=[{'text': 'x 2', 'omml': (
+                '<m:oMath xmlns:m="http://schemas.openxmlformats.org/officeDocument/2006/math">'
+                '<m:r><m:t>x</m:t></m:r></m:oMath>'
+            )}],
+        )
+
+    def tearDown(self):
+        self.settings_override.disable()
+        media_store._default_store = None
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+    def render(self, course_code="CS234"):
+        selections = [Selection(q, 'A' if i < 2 else 'B') for i, q in enumerate(self.questions)]
+        questions_data = Question.objects.filter(q_id__in=[q.q_id for q in self.questions]).prefetch_related('media')
+        return QuestionPaperGenerator.create_paper(Metadata(course_code, self.faculty), selections, questions_data)
+
+    def test_heading_follows_course_department(self):
+        self.assertEqual(department_heading("Computer Science"), "DEPARTMENT OF COMPUTER SCIENCE")
+        self.assertEqual(department_heading(None), "DEPARTMENT OF INFORMATION SCIENCE AND ENGINEERING")
+        doc = self.render()
+        self.assertEqual(doc.paragraphs[0].text, "DEPARTMENT OF COMPUTER SCIENCE")
+
+    def test_paper_is_filled_from_template(self):
+        doc = self.render()
+        header, part_a, part_b = doc.tables
+        self.assertEqual(header.cell(0, 1).text, "14-03-2026")
+        self.assertEqual(header.cell(3, 3).text, "Jane Doe")
+        self.assertEqual([r.cells[1].paragraphs[0].text.strip() for r in part_a.rows[1:]], ["Question 0", "Question 1"])
+        self.assertEqual(len(part_a.rows[1].cells[1]._element.xpath('.//m:oMath')), 1)
+        self.assertEqual([r.cells[0].text for r in part_b.rows[1:]], ["1", "2"])
+        self.assertEqual(part_b.rows[2].cells[2].text, "4")
+        self.assertEqual(len(part_a.rows[1].cells[1]._element.xpath('.//w:drawing')), 1)
+        self.assertIn("Total Marks: 10", [p.text for p in doc.paragraphs])
+        self.assertNotIn("@@", "\n".join(p.text for p in doc.paragraphs))
+
+    def test_template_is_compiled_once_per_department(self):
+        self.assertIs(get_paper_template("Computer Science"), get_paper_template("Computer Science"))
+        self.assertIsNot(get_paper_template("Computer Science"), get_paper_template(None))
+        # Rendering twice does not leak rows into the cached skeleton
+        self.render()
+        self.assertEqual(len(self.render().tables[1].rows), 3)
+
+    def test_render_context_loads_in_fixed_queries(self):
+        parts = {'A': [q.q_id for q in self.questions[:2]], 'B': [q.q_id for q in self.questions[2:]]}
+        get_paper_template("Computer Science")
+        # Questions with units, media, and the course's department
+        with self.assertNumQueries(3):
+            context = PaperRenderContext.load(parts)
+            doc = QuestionPaperGenerator.render(Metadata("CS234", self.faculty), context)
+        self.assertEqual(context.total_marks, 10)
+        self.assertEqual(context.part('A')[0].image_paths, self.questions[0].media.get().image_paths)
+        self.assertEqual(len(doc.tables[2].rows), 3)
+        pickle.loads(pickle.dumps(context))
+
+    def test_unknown_ids_are_reported_up_front(self):
+        with self.assertRaises(UnknownQuestionsError) as ctx:
+            PaperRenderContext.load({'A': [self.questions[0].q_id, 999], 'B': [998]})
+        self.assertEqual(ctx.exception.missing, [998, 999])
+
+        user = CustomUser.objects.create_user(
+            username="faculty1", email="jane@example.com", password="pw", role="faculty"
+        )
+        Faculty.objects.filter(pk="1").update(user=user)
+        client = APIClient()
+        client.force_authenticate(user)
+        response = client.post('/api/generate-paper/', {
+            'course_code': 'CS234', 'course_title': 'Data Structures', 'date': '2026-03-14',
+            'max_marks': 50, 'duration': '90 mins', 'semester': '3',
+            'selected_questions': {'part_a': [999], 'part_b': []},
+        }, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data['missing_question_ids'], [999])
@@ -0,0 +1,217 @@
+import io
+import os
+import tempfile
+
+import docx
+from PIL import Image
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from api.models import Department, Course, Unit, Question, QuestionMedia
+from api.parser import ingest_questions
+from api.utils import media_store
+from api.utils.fingerprints import media_hash, question_fingerprint
+
+
+def build_question_bank(path, rows):
+    """Write a bank in the 7-column upload layout; a row may carry image bytes as a 6th item."""
+    doc = docx.Document()
+    table = doc.add_table(rows=1, cols=7)
+    for cell, title in zip(table.rows[0].cells, ['Sl', 'Question', 'Image', 'Marks', 'Unit', 'CO', 'BT']):
+        cell.text = title
+    for i, row in enumerate(rows, 1):
+        text, marks, unit, co, bt = row[:5]
+        cells = table.add_row().cells
+        for cell, value in zip(cells, [str(i), text, '', str(marks), str(unit), co, bt]):
+            cell.text = value
+        if len(row) > 5 and row[5]:
+            cells[2].paragraphs[0].add_run().add_picture(io.BytesIO(row[5]))
+    doc.save(path)
+    return path
+
+
+def make_png(color=(200, 30, 30), size=(40, 20)):
+    buffer = io.BytesIO()
+    Image.new('RGB', size, color).save(buffer, format='PNG')
+    return buffer.getvalue()
+
+
+class TestBatchIngestion(TestCase):
+    def setUp(self):
+        self.department = Department.objects.create(dept_name="Information Science")
+        self.course = Course.objects.create(
+            course_id="IS101",
+            course_name="Introduction to Programming",
+            department_id=self.department,
+        )
+        Unit.objects.create(unit_id=1, unit_name="Basics of Python", course_id=self.course)
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, "bank.docx")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_ingest_creates_questions_units_and_media(self):
+        build_question_bank(self.path, [
+            ("What is Python?", 2, 1, "CO1", "BT1"),
+            ("Explain recursion.", 10, 2, "CO2", "BT3"),
+            ("Define a stack.", 5, 3, "CO1", "BT2"),
+        ])
+        questions, stats = ingest_questions(self.path, "IS101")
+
+        self.assertEqual(len(questions), 3)
+        self.assertEqual(stats.rows_inserted, 3)
+        self.assertEqual(stats.rows_failed, 0)
+        self.assertEqual(Unit.objects.filter(course_id=self.course).count(), 3)
+        self.assertEqual(QuestionMedia.objects.count(), 3)
+        recursion = Question.objects.get(text="Explain recursion.")
+        self.assertEqual(recursion.unit_id.unit_id, 2)
+        self.assertEqual(recursion.marks, 10)
+
+    def test_invalid_rows_are_counted_not_fatal(self):
+        build_question_bank(self.path, [
+            ("What is Python?", 2, 1, "CO1", "BT1"),
+            ("Broken marks", "two", 1, "CO1", "BT1"),
+        ])
+        questions, stats = ingest_questions(self.path, "IS101")
+
+        self.assertEqual(len(questions), 1)
+        self.assertEqual(stats.rows_total, 2)
+        self.assertEqual(stats.rows_failed, 1)
+
+    def test_repeated_rows_with_other_details_are_reported(self):
+        build_question_bank(self.path, [
+            ("What is Python?", 2, 1, "CO1", "BT1"),
+            ("What is Python?", 2, 1, "CO1", "BT1"),   # exact repeat
+            ("What is Python?", 5, 2, "CO2", "BT2"),   # same text, other details: this one is kept
+        ])
+        questions, stats = ingest_questions(self.path, "IS101")
+
+        self.assertEqual(len(questions), 1)
+        self.assertEqual((questions[0].marks, questions[0].co), (5, "CO2"))
+        self.assertEqual((stats.rows_skipped, stats.rows_collapsed), (1, 1))
+        self.assertEqual(stats.as_dict()['collapsed_questions'], [
+            {'text': "What is Python?", 'marks': 2, 'unit': 1, 'co': "CO1", 'bt': "BT1"},
+        ])
+
+    def test_query_count_does_not_grow_with_rows(self):
+        build_question_bank(self.path, [
+            (f"Question {i}", 2, i % 4 + 1, "CO1", "BT1") for i in range(60)
+        ])
+        with CaptureQueriesContext(connection) as ctx:
+            questions, _ = ingest_questions(self.path, "IS101")
+
+        self.assertEqual(len(questions), 60)
+        self.assertLess(len(ctx.captured_queries), 15)
+
+
+class TestIdempotentReupload(TestCase):
+    def setUp(self):
+        self.course = Course.objects.create(course_id="IS101", course_name="Intro to Programming")
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, "bank.docx")
+        self.settings_override = override_settings(QUESTION_MEDIA_ROOT=os.path.join(self.tmpdir.name, "media"))
+        self.settings_override.enable()
+        media_store._default_store = None
+
+    def tearDown(self):
+        self.settings_override.disable()
+        media_store._default_store = None
+        self.tmpdir.cleanup()
+
+    def test_reupload_inserts_updates_and_skips(self):
+        build_question_bank(self.path, [
+            ("What is Python?", 2, 1, "CO1", "BT1"),
+            ("Explain recursion.", 10, 2, "CO2", "BT3"),
+        ])
+        ingest_questions(self.path, "IS101")
+        original_ids = set(Question.objects.values_list('q_id', flat=True))
+
+        build_question_bank(self.path, [
+            ("What is Python?", 2, 1, "CO1", "BT1"),     # unchanged
+            ("Explain recursion.", 5, 2, "CO2", "BT2"),  # corrected marks and BT
+            ("Define a stack.", 5, 3, "CO1", "BT2"),     # new
+        ])
+        questions, stats = ingest_questions(self.path, "IS101")
+
+        self.assertEqual((stats.rows_inserted, stats.rows_updated, stats.rows_skipped), (1, 1, 1))
+        self.assertEqual(len(questions), 2)
+        self.assertEqual(Question.objects.count(), 3)
+        self.assertTrue(original_ids <= set(Question.objects.values_list('q_id', flat=True)))
+        recursion = Question.objects.get(text="Explain recursion.")
+        self.assertEqual((recursion.marks, recursion.bt), (5, "BT2"))
+        self.assertEqual(recursion.media.count(), 1)
+
+    def test_identical_reupload_writes_nothing(self):
+        build_question_bank(self.path, [("What is Python?", 2, 1, "CO1", "BT1")])
+        ingest_questions(self.path, "IS101")
+        questions, stats = ingest_questions(self.path, "IS101")
+
+        self.assertEqual(questions, [])
+        self.assertEqual(stats.rows_skipped, 1)
+        self.assertEqual(Question.objects.count(), 1)
+
+    def test_case_and_media_fixes_are_updates(self):
+        build_question_bank(self.path, [
+            ("What is python?", 2, 1, "co1", "BT1"),
+            ("Label the diagram.", 5, 1, "CO1", "BT1", make_png()),
+            ("Define a stack.", 5, 1, "CO1", "BT1", make_png()),
+        ])
+        ingest_questions(self.path, "IS101")
+
+        build_question_bank(self.path, [
+            ("What is Python?", 2, 1, "CO1", "BT1"),                     # case fixed
+            ("Label the diagram.", 5, 1, "CO1", "BT1", make_png((0, 90, 200))),  # image replaced
+            ("Define a stack.", 5, 1, "CO1", "BT1", make_png()),         # unchanged
+        ])
+        _, stats = ingest_questions(self.path, "IS101")
+
+        self.assertEqual((stats.rows_inserted, stats.rows_updated, stats.rows_skipped), (0, 2, 1))
+        python = Question.objects.get(text="What is Python?")
+        self.assertEqual(python.co, "CO1")
+        # Saving through the model fingerprints the stored media the same way ingestion does
+        diagram = Question.objects.get(text="Label the diagram.")
+        ingested = diagram.fingerprint
+        diagram.save()
+        self.assertEqual(diagram.fingerprint, ingested)
+
+    def test_save_keeps_fingerprint_current(self):
+        unit = Unit.objects.create(unit_id=1, unit_name="Unit 1", course_id=self.course)
+        question = Question.objects.create(unit_id=unit, course_id=self.course, text="Q", marks=2)
+        before = question.fingerprint
+        question.marks = 4
+        question.save(update_fields=['marks'])
+        question.refresh_from_db()
+        self.assertNotEqual(question.fingerprint, before)
+        self.assertEqual(len(question.text_hash), 64)
+
+    def test_save_skips_signatures_when_their_inputs_are_unchanged(self):
+        unit = Unit.objects.create(unit_id=1, unit_name="Unit 1", course_id=self.course)
+        question = Question.objects.get(pk=Question.objects.create(unit_id=unit, course_id=self.course, text="Q", marks=2).pk)
+        version = Course.objects.get(pk="IS101").question_version
+
+        question.difficulty_level = 'Hard'
+        # savepoint, UPDATE question, UPDATE course version, release; no unit or media reads
+        with self.assertNumQueries(4):
+            question.save()
+        self.assertEqual(Course.objects.get(pk="IS101").question_version, version + 1)
+
+        before = question.fingerprint
+        question.text = "q"
+        question.save()
+        self.assertNotEqual(question.fingerprint, before)
+        self.assertEqual(Question.objects.get(pk=question.pk).fingerprint, question.fingerprint)
+
+    def test_media_written_after_the_question_is_fingerprinted(self):
+        # parse_docx and the question API create the question first, then its media
+        unit = Unit.objects.create(unit_id=1, unit_name="Unit 1", course_id=self.course)
+        question = Question.objects.create(unit_id=unit, course_id=self.course, text="Solve it.", marks=5, co="CO1", bt="BT2")
+        equations = [{'mathml': '<math/>', 'text': 'x^2'}]
+        media = QuestionMedia.objects.create(question_id=question, equations=equations, image_paths=[])
+
+        expected = question_fingerprint("Solve it.", 5, 1, "CO1", "BT2", media_hash(equations, []))
+        self.assertEqual(Question.objects.get(pk=question.pk).fingerprint, expected)
+
+        media.delete()
+        self.assertEqual(Question.objects.get(pk=question.pk).fingerprint, question_fingerprint("Solve it.", 5, 1, "CO1", "BT2"))
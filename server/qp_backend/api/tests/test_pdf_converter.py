@@ -0,0 +1,175 @@
+import io
+import os
+import sys
+import shutil
+import tempfile
+from unittest import mock
+
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from api.models import CustomUser, Department, Course, Unit, Faculty, Question
+from api.utils import paper_cache, pdf_converter
+from api.utils.pdf_converter import PdfConverterPool, PdfConversionError
+
+# Stands in for soffice: "converts" by writing the source bytes behind a PDF header
+FAKE_SOFFICE = """#!{python}
+import os, sys, time
+args = sys.argv[1:]
+if os.environ.get('FAKE_SOFFICE_SLEEP'):
+    time.sleep(float(os.environ['FAKE_SOFFICE_SLEEP']))
+outdir = args[args.index('--outdir') + 1]
+src = args[-1]
+name = os.path.splitext(os.path.basename(src))[0] + '.pdf'
+with open(src, 'rb') as f, open(os.path.join(outdir, name), 'wb') as out:
+    out.write(b'%PDF-1.7\\n' + f.read())
+"""
+
+
+class FakeConverter:
+    def __init__(self):
+        self.calls = 0
+
+    def convert(self, docx_file):
+        self.calls += 1
+        return b'%PDF-1.7\n' + docx_file.read()[:2]
+
+
+@mock.patch.object(pdf_converter, 'uno', None)
+class TestColdConversion(TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.binary = os.path.join(self.tmpdir, 'soffice')
+        with open(self.binary, 'w') as f:
+            f.write(FAKE_SOFFICE.format(python=sys.executable))
+        os.chmod(self.binary, 0o755)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+    def pool(self, **kwargs):
+        with override_settings(SOFFICE_BINARY=self.binary):
+            return PdfConverterPool(**kwargs)
+
+    def test_converts_through_soffice(self):
+        pdf = self.pool().convert(io.BytesIO(b'PK docx'))
+        self.assertEqual(pdf, b'%PDF-1.7\nPK docx')
+
+    def test_timeout_is_reported(self):
+        with mock.patch.dict(os.environ, {'FAKE_SOFFICE_SLEEP': '5'}):
+            with self.assertRaisesMessage(PdfConversionError, 'timed out'):
+                self.pool(timeout=0.5).convert(io.BytesIO(b'PK'))
+
+    def test_missing_office_is_reported(self):
+        with override_settings(SOFFICE_BINARY=os.path.join(self.tmpdir, 'missing')):
+            pool = PdfConverterPool()
+        with self.assertRaisesMessage(PdfConversionError, 'not installed'):
+            pool.convert(io.BytesIO(b'PK'))
+
+
+@mock.patch.object(pdf_converter, 'uno', object())
+class TestWarmPool(TestCase):
+    def test_office_pipes_are_private_to_the_process(self):
+        with mock.patch.object(pdf_converter.OfficeProcess, 'start'), \
+                mock.patch.object(pdf_converter.atexit, 'register'):
+            pool = PdfConverterPool(size=2)
+            pool.ensure_started()
+        try:
+            names = [worker.pipe_name for worker in pool._workers]
+            self.assertEqual(names, [f"qp-soffice-{os.getpid()}-0", f"qp-soffice-{os.getpid()}-1"])
+        finally:
+            pool.close()
+
+
+    def test_failed_start_leaves_no_partial_pool(self):
+        with mock.patch.object(pdf_converter.OfficeProcess, 'start',
+                               side_effect=[None, PdfConversionError("did not start"), None, None]), \
+                mock.patch.object(pdf_converter.OfficeProcess, 'close', autospec=True,
+                                  side_effect=pdf_converter.OfficeProcess.close) as close, \
+                mock.patch.object(pdf_converter.atexit, 'register'):
+            pool = PdfConverterPool(size=2)
+            with self.assertRaises(PdfConversionError):
+                pool.ensure_started()
+            self.assertEqual((pool._workers, pool._idle.qsize()), ([], 0))
+            self.assertEqual(close.call_count, 2)
+
+            # The next conversion retries the whole pool
+            pool.ensure_started()
+            self.assertEqual((len(pool._workers), pool._idle.qsize()), (2, 2))
+        pool.close()
+
+    def test_slot_whose_restart_failed_is_started_on_next_use(self):
+        def start(worker, startup_timeout=30):
+            worker.desktop = object()
+
+        with mock.patch.object(pdf_converter.OfficeProcess, 'start', autospec=True, side_effect=start) as started, \
+                mock.patch.object(pdf_converter.OfficeProcess, 'convert'), \
+                mock.patch.object(pdf_converter.atexit, 'register'):
+            pool = PdfConverterPool(size=1)
+            pool.ensure_started()
+            worker = pool._workers[0]
+            worker.desktop = None  # as left by a restart that failed
+            pool._convert_warm('paper.docx', 'paper.pdf')
+        try:
+            self.assertEqual(started.call_count, 2)
+            self.assertTrue(worker.running)
+            self.assertIs(pool._idle.get_nowait(), worker)
+        finally:
+            pool.close()
+
+
+class TestPdfPaperExport(TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.settings_override = override_settings(PAPER_CACHE_DIR=self.tmpdir)
+        self.settings_override.enable()
+        paper_cache._default_cache = None
+        self.converter = FakeConverter()
+        pdf_converter._default_pool = self.converter
+
+        department = Department.objects.create(dept_name="Computer Science")
+        course = Course.objects.create(course_id="CS234", course_name="Data Structures", department_id=department)
+        unit = Unit.objects.create(unit_id=1, unit_name="Lists", course_id=course)
+        self.user = CustomUser.objects.create_user(
+            username="faculty1", email="jane@example.com", password="pw", role="faculty"
+        )
+        Faculty.objects.create(f_id="1", name="Jane Doe", email="jane@example.com", user=self.user)
+        questions = [
+            Question.objects.create(unit_id=unit, course_id=course, text=f"Question {i}", marks=5, co="CO1", bt="BT2")
+            for i in range(2)
+        ]
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.payload = {
+            'course_code': 'CS234', 'course_title': 'Data Structures', 'date': '2026-03-14',
+            'max_marks': 50, 'duration': '90 mins', 'semester': '3',
+            'selected_questions': {'part_a': [questions[0].q_id], 'part_b': [questions[1].q_id]},
+        }
+
+    def tearDown(self):
+        self.settings_override.disable()
+        paper_cache._default_cache = None
+        pdf_converter._default_pool = None
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+    def test_pdf_is_converted_once_then_cached(self):
+        first = self.client.post('/api/generate-paper/?format=pdf', self.payload, format='json')
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(first['Content-Type'], 'application/pdf')
+        self.assertIn('.pdf"', first['Content-Disposition'])
+        self.assertEqual(b''.join(first.streaming_content), b'%PDF-1.7\nPK')
+
+        second = self.client.post('/api/generate-paper/?format=pdf', self.payload, format='json')
+        self.assertEqual(second['X-Paper-Cache'], 'hit')
+        b''.join(second.streaming_content)
+        self.assertEqual(self.converter.calls, 1)
+        self.assertEqual([name[-4:] for name in os.listdir(self.tmpdir)], ['.pdf'])
+
+    def test_unavailable_converter_returns_503(self):
+        self.converter.convert = mock.Mock(side_effect=PdfConversionError("LibreOffice is not installed on the server"))
+        response = self.client.post('/api/generate-paper/', {**self.payload, 'format': 'pdf'}, format='json')
+        self.assertEqual(response.status_code, 503)
+
+    def test_unknown_format_is_rejected(self):
+        response = self.client.post('/api/generate-paper/', {**self.payload, 'format': 'odt'}, format='json')
+        self.assertEqual(response.status_code, 400)
@@ -0,0 +1,72 @@
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from api.models import CustomUser, Department, Course, Unit, Question, QuestionMedia
+from api.utils import filter_index
+from api.utils.question_fields import PREVIEW_CHARS, FieldsetError, requested_fields, text_preview
+
+LONG_TEXT = "Derive the time complexity of building a binary heap bottom up " * 10
+
+
+class TestQuestionFields(TestCase):
+    def setUp(self):
+        filter_index._indexes.clear()
+        department = Department.objects.create(dept_name="Computer Science")
+        course = Course.objects.create(course_id="CS234", course_name="Data Structures", department_id=department)
+        unit = Unit.objects.create(unit_id=3, unit_name="Heaps", course_id=course)
+        self.long = Question.objects.create(unit_id=unit, course_id=course, text=LONG_TEXT, marks=10, co="CO2", bt="BT3")
+        self.short = Question.objects.create(unit_id=unit, course_id=course, text="Define a heap", marks=2, co="CO1", bt="BT1")
+        QuestionMedia.objects.create(question_id=self.long, equations=[{'mathml': '<math/>', 'text': 'x'}], image_paths=[])
+        self.client = APIClient()
+        self.client.force_authenticate(
+            CustomUser.objects.create_user(username="faculty1", email="jane@example.com", password="pw", role="faculty")
+        )
+
+    def test_text_preview(self):
+        preview = text_preview(LONG_TEXT[:PREVIEW_CHARS + 1])
+        self.assertTrue(preview.endswith('…'))
+        self.assertLessEqual(len(preview), PREVIEW_CHARS + 1)
+        self.assertTrue(LONG_TEXT.startswith(preview[:-1]))
+        self.assertEqual(text_preview("Define\n  a heap"), "Define a heap")
+
+    def test_requested_fields(self):
+        self.assertEqual(requested_fields("q_id, text_preview,q_id", []), ['q_id', 'text_preview'])
+        self.assertEqual(requested_fields(None, ['q_id']), ['q_id'])
+        with self.assertRaises(FieldsetError):
+            requested_fields("q_id,password", [])
+
+    def test_course_listing_projection(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/course/CS234/questions/', {'fields': 'q_id,text_preview,marks,unit_id'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['questions'][0], {
+            'q_id': self.long.q_id, 'text_preview': text_preview(LONG_TEXT), 'marks': 10, 'unit_id': 3,
+        })
+        self.assertEqual(response.data['questions'][1]['text_preview'], "Define a heap")
+        listing = [q['sql'] for q in queries.captured_queries if 'api_question' in q['sql']][-1]
+        self.assertNotIn('"tags"', listing)
+        self.assertNotIn('AS "_text"', listing)
+
+    def test_default_payloads_are_unchanged(self):
+        row = self.client.get('/api/course/CS234/questions/').data['questions'][0]
+        self.assertEqual(row['course_name'], "Data Structures")
+        self.assertTrue(row['has_equations'])
+        self.assertFalse(row['has_image'])
+
+        response = self.client.post('/api/course/CS234/filter-questions/', {'marks': [10]}, format='json')
+        self.assertEqual(response.data['questions'], [{
+            'id': self.long.q_id, 'text': LONG_TEXT, 'marks': 10, 'co': 'CO2', 'bt': 'BT3', 'unit_id': 3,
+            'unit_name': 'Heaps', 'image_paths': [], 'image_urls': [], 'thumbnail_urls': [],
+            'equations': [{'mathml': '<math/>', 'text': 'x'}],
+        }])
+
+    def test_filter_listing_fields_and_errors(self):
+        response = self.client.post('/api/course/CS234/filter-questions/', {'fields': ['id', 'has_equations']}, format='json')
+        self.assertEqual(response.data['questions'], [
+            {'id': self.long.q_id, 'has_equations': True}, {'id': self.short.q_id, 'has_equations': False},
+        ])
+        response = self.client.post('/api/course/CS234/filter-questions/', {'fields': 'id,secret'}, format='json')
+        self.assertEqual(response.status_code, 400)
+
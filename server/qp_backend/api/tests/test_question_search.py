@@ -0,0 +1,63 @@
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from api.models import CustomUser, Department, Course, Unit, Question, QuestionMedia
+from api.utils.question_search import SearchQueryError, headlines, search_questions, search_text
+
+
+class TestQuestionSearch(TestCase):
+    def setUp(self):
+        department = Department.objects.create(dept_name="Computer Science")
+        course = Course.objects.create(course_id="CS234", course_name="Data Structures", department_id=department)
+        other = Course.objects.create(course_id="CS300", course_name="Algorithms", department_id=department)
+        lists = Unit.objects.create(unit_id=1, unit_name="Lists", course_id=course)
+        trees = Unit.objects.create(unit_id=2, unit_name="Trees", course_id=course)
+        self.questions = [
+            Question.objects.create(unit_id=lists, course_id=course, text="Reverse a linked list <in place>", marks=5, co="CO1", bt="BT2"),
+            Question.objects.create(unit_id=lists, course_id=course, text="Explain a doubly linked list", marks=10, co="CO1", bt="BT3"),
+            Question.objects.create(unit_id=trees, course_id=course, text="Insert into a binary search tree", marks=5, co="CO2", bt="BT2"),
+        ]
+        Question.objects.create(
+            unit_id=Unit.objects.create(unit_id=1, unit_name="Graphs", course_id=other),
+            course_id=other, text="Detect a cycle in a linked list", marks=5, co="CO1", bt="BT2",
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(
+            CustomUser.objects.create_user(username="faculty1", email="jane@example.com", password="pw", role="faculty")
+        )
+
+    def test_search_matches_terms(self):
+        found = search_questions(Question.objects.filter(course_id="CS234"), "linked list")
+        self.assertEqual([q.q_id for q in found], [self.questions[0].q_id, self.questions[1].q_id])
+
+    def test_headline_escapes_text_and_marks_matches(self):
+        snippets = headlines(self.questions[:1], "list")
+        self.assertEqual(snippets[self.questions[0].q_id], "Reverse a linked <mark>list</mark> &lt;in place&gt;")
+
+    def test_search_text_is_validated(self):
+        for value in ('', '   ', None, 'x' * 201):
+            with self.assertRaises(SearchQueryError):
+                search_text(value)
+
+    def test_endpoint_combines_search_with_filters(self):
+        response = self.client.post('/api/course/CS234/questions/search/', {'q': 'linked', 'marks': [10]}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['count'], 1)
+        result = response.data['results'][0]
+        self.assertEqual(result['id'], self.questions[1].q_id)
+        self.assertIn('<mark>linked</mark>', result['headline'])
+
+        response = self.client.post('/api/course/CS234/questions/search/', {'q': ''}, format='json')
+        self.assertEqual(response.status_code, 400)
+
+    def test_endpoint_query_count_does_not_grow_with_page(self):
+        unit = Unit.objects.get(course_id="CS234", unit_id=1)
+        for i in range(10):
+            question = Question.objects.create(unit_id=unit, course_id_id="CS234", text=f"Sort linked list {i}", marks=5)
+            QuestionMedia.objects.create(question_id=question, image_paths=[], thumbnails=[], equations=[f"x^{i}"])
+
+        # count, page, prefetched media
+        with self.assertNumQueries(3):
+            response = self.client.post('/api/course/CS234/questions/search/', {'q': 'sort'}, format='json')
+        self.assertEqual(len(response.data['results']), 10)
+        self.assertEqual(response.data['results'][0]['equations'], ['x^0'])
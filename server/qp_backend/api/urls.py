@@ -31,8 +31,23 @@ urlpatterns = [
     path('course/<str:course_id>/questions/', views.course_questions_view, name='course-questions'),
     path('add-question/', views.question_view, name='add-question'),
     path('upload-question/', views.FileUploadView.as_view(), name='upload_question'),
+    path('upload-question/batch/', views.BatchFileUploadView.as_view(), name='upload_question_batch'),
+    path('upload-jobs/<int:job_id>/', views.UploadJobStatusView.as_view(), name='upload-job-status'),
+    path('upload-sessions/', views.UploadSessionView.as_view(), name='upload-sessions'),
+    path('upload-sessions/<uuid:upload_id>/', views.UploadSessionDetailView.as_view(), name='upload-session-detail'),
+    path('upload-sessions/<uuid:upload_id>/complete/', views.UploadSessionCompleteView.as_view(), name='upload-session-complete'),
     path('course/<str:course_id>/filter-questions/', views.FilterQuestionsView.as_view(), name='filter-questions'),
+    path('course/<str:course_id>/questions/search/', views.SearchQuestionsView.as_view(), name='search-questions'),
+    path('course/<str:course_id>/questions/similar/', views.SimilarQuestionsView.as_view(), name='similar-questions'),
+    path('course/<str:course_id>/questions/duplicates/', views.DuplicateQuestionsView.as_view(), name='duplicate-questions'),
+    path('course/<str:course_id>/assemble-paper/', views.AssemblePaperView.as_view(), name='assemble-paper'),
     path('generate-paper/', views.GeneratePaperView.as_view(), name='generate_paper'),
+    path('generate-paper/preview/', views.GeneratePaperPreviewView.as_view(), name='generate_paper_preview'),
+    path('generate-paper/sets/', views.GeneratePaperSetsView.as_view(), name='generate_paper_sets'),
+    path('generate-paper/copies/', views.GeneratePaperCopiesView.as_view(), name='generate_paper_copies'),
+    path('papers/', views.PaperHistoryView.as_view(), name='paper-history'),
+    path('papers/<int:paper_id>/download/', views.PaperDownloadView.as_view(), name='paper-download'),
+    path('question-images/<str:digest>/', views.question_image_view, name='question-image'),
     path('questions/', views.QuestionListView.as_view(), name='list_questions'),
 
     # Department Management
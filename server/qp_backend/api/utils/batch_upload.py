@@ -0,0 +1,153 @@
+import os
+import time
+import shutil
+import logging
+import zipfile
+import tempfile
+from concurrent.futures import as_completed
+
+from django.conf import settings
+
+from ..parser import BatchQuestionIngestor, IngestionStats, parse_document
+from .near_duplicates import get_lsh_index
+from .process_pool import process_pool
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+
+BATCH_SPOOL_DIR = os.path.join("temp", "batches")
+# Settings parse_document reads in the worker processes
+WORKER_SETTINGS = (
+    'QUESTION_MEDIA_ROOT', 'QUESTION_IMAGE_PRINT_SIZE', 'QUESTION_THUMBNAIL_SIZE', 'EQUATION_CACHE_SIZE',
+)
+
+
+class BatchUploadError(Exception):
+    pass
+
+
+class BatchUpload:
+    """Unpacks a ZIP or several .docx uploads and ingests them for one course.
+
+    Parsing (python-docx work) is spread over a process pool; the parent
+    process is the only writer, saving each document's rows as soon as its
+    parse finishes.
+    """
+
+    def __init__(self):
+        os.makedirs(BATCH_SPOOL_DIR, exist_ok=True)
+        self.workdir = tempfile.mkdtemp(dir=BATCH_SPOOL_DIR)
+        self.documents = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        shutil.rmtree(self.workdir, ignore_errors=True)
+
+    def _target_path(self, name):
+        return os.path.join(self.workdir, f"{len(self.documents):04d}_{os.path.basename(name)}")
+
+    def _check_limits(self):
+        max_files = getattr(settings, 'BATCH_UPLOAD_MAX_FILES', 200)
+        if len(self.documents) > max_files:
+            raise BatchUploadError(f"A batch may contain at most {max_files} documents")
+
+    def add_upload(self, uploaded_file):
+        if uploaded_file.name.lower().endswith('.zip'):
+            self.add_zip(uploaded_file)
+        elif uploaded_file.name.lower().endswith('.docx'):
+            path = self._target_path(uploaded_file.name)
+            with open(path, "wb") as f:
+                for chunk in uploaded_file.chunks():
+                    f.write(chunk)
+            self.documents.append((uploaded_file.name, path))
+            self._check_limits()
+        else:
+            raise BatchUploadError(f"Unsupported file in batch: {uploaded_file.name}")
+
+    def add_zip(self, uploaded_file):
+        max_bytes = getattr(settings, 'BATCH_UPLOAD_MAX_BYTES', 500 * 1024 * 1024)
+        try:
+            archive = zipfile.ZipFile(uploaded_file)
+        except zipfile.BadZipFile:
+            raise BatchUploadError(f"{uploaded_file.name} is not a valid ZIP archive")
+
+        with archive:
+            members = [
+                info for info in archive.infolist()
+                if not info.is_dir()
+                and info.filename.lower().endswith('.docx')
+                and not os.path.basename(info.filename).startswith(('.', '~$'))
+                and '__MACOSX' not in info.filename
+            ]
+            if sum(info.file_size for info in members) > max_bytes:
+                raise BatchUploadError("ZIP archive is too large once extracted")
+            for info in members:
+                # Only the base name is used, so archive paths cannot escape workdir
+                path = self._target_path(info.filename)
+                with archive.open(info) as src, open(path, "wb") as dst:
+                    shutil.copyfileobj(src, dst)
+                self.documents.append((info.filename, path))
+                self._check_limits()
+
+    def ingest(self, course, workers=None):
+        started = time.perf_counter()
+        workers = workers or getattr(settings, 'INGESTION_PROCESSES', None) or os.cpu_count() or 1
+        workers = max(1, min(workers, len(self.documents)))
+        results = []
+        inserted = 0
+        # Every document is checked for near-duplicates against the bank as it was before the
+        # batch; writing a document would otherwise invalidate the index for the next one
+        index = get_lsh_index(course.course_id)
+
+        with process_pool(workers, WORKER_SETTINGS) as pool:
+            futures = {
+                pool.submit(parse_document, path): name for name, path in self.documents
+            }
+            for future in as_completed(futures):
+                name = futures[future]
+                try:
+                    records, stats, error = future.result()
+                except Exception as e:
+                    records, stats, error = [], None, str(e)
+
+                stats = stats or IngestionStats()
+                if records:
+                    try:
+                        BatchQuestionIngestor.write_records(records, course, stats=stats, index=index)
+                        inserted += stats.rows_inserted
+                    except Exception as e:
+                        logging.error(f"Error saving questions from {name}: {e}")
+                        error = str(e)
+                results.append({
+                    'file': name,
+                    'rows_total': stats.rows_total,
+                    'rows_inserted': stats.rows_inserted,
+                    'rows_updated': stats.rows_updated,
+                    'rows_skipped': stats.rows_skipped,
+                    'rows_failed': stats.rows_failed,
+                    'rows_collapsed': stats.rows_collapsed,
+                    'rows_similar': len(stats.near_duplicates),
+                    'error': error,
+                })
+
+        elapsed = time.perf_counter() - started
+        logging.info(
+            f"Batch ingested {inserted} rows from {len(self.documents)} documents "
+            f"with {workers} workers in {elapsed:.2f}s"
+        )
+        results.sort(key=lambda r: r['file'])
+        return {
+            'documents': len(self.documents),
+            'workers': workers,
+            'rows_inserted': inserted,
+            'rows_updated': sum(r['rows_updated'] for r in results),
+            'rows_skipped': sum(r['rows_skipped'] for r in results),
+            'rows_failed': sum(r['rows_failed'] for r in results),
+            'rows_collapsed': sum(r['rows_collapsed'] for r in results),
+            'rows_similar': sum(r['rows_similar'] for r in results),
+            'elapsed_seconds': round(elapsed, 3),
+            'rows_per_second': round(inserted / elapsed, 1) if elapsed else 0.0,
+            'files': results,
+        }
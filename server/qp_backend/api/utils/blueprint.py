@@ -0,0 +1,505 @@
+import time
+import logging
+
+import numpy as np
+from django.conf import settings
+
+from ..models import Question
+from .render_context import PARTS
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+
+DIFFICULTIES = ('Easy', 'Medium', 'Hard')
+# Coverage still owed outranks the difficulty mix when scoring candidates
+COVERAGE_WEIGHT = 4.0
+# Stop searching after this many attempts in a row bring no improvement
+STALL_ATTEMPTS = 25
+
+
+class BlueprintError(Exception):
+    """The blueprint itself is malformed."""
+
+
+class BlueprintInfeasible(Exception):
+    """The blueprint is well formed but the course's questions cannot satisfy it."""
+
+    def __init__(self, unmet):
+        self.unmet = unmet
+        super().__init__("Blueprint cannot be met: " + "; ".join(u['message'] for u in unmet))
+
+
+def _unmet(constraint, key, required, available, message):
+    return {
+        'constraint': constraint, 'key': key, 'required': required,
+        'available': available, 'message': message,
+    }
+
+
+def reachable_sums(values, counts, limit, max_items=None):
+    """Subset-sum table over a multiset of mark values.
+
+    Without ``max_items`` returns a bool array ``r`` where ``r[s]`` says some
+    selection (each value used at most its count) sums to ``s``. With it,
+    returns ``r[n, s]`` for selections of exactly ``n`` questions.
+    """
+    if max_items is None:
+        reach = np.zeros(limit + 1, dtype=bool)
+        reach[0] = True
+        for value, count in zip(values, counts):
+            value, count = int(value), min(int(count), limit // max(int(value), 1))
+            # Binary splitting: chunks of 1, 2, 4, ... copies cover every count
+            chunk = 1
+            while count > 0 and value > 0:
+                take = min(chunk, count)
+                step = value * take
+                if step <= limit:
+                    reach[step:] |= reach[:-step].copy()
+                count -= take
+                chunk *= 2
+        return reach
+
+    reach = np.zeros((max_items + 1, limit + 1), dtype=bool)
+    reach[0, 0] = True
+    for value, count in zip(values, counts):
+        value = int(value)
+        if value <= 0 or value > limit:
+            continue
+        for _ in range(min(int(count), max_items, limit // value)):
+            reach[1:, value:] |= reach[:-1, :-value].copy()
+    return reach
+
+
+class Blueprint:
+    """Normalized blueprint for one paper.
+
+    ``parts`` maps 'A'/'B' to ``{"marks": 20, "count": 4, "question_marks": [5]}``
+    (count and question_marks optional). ``co`` and ``bt`` give the minimum
+    marks each outcome/level must carry (a list means "at least one question").
+    ``units`` gives the exact marks per unit number. ``difficulty`` is the
+    target share of marks per level and is met as closely as possible.
+    """
+
+    def __init__(self, data):
+        parts = data.get('parts') or {}
+        if not isinstance(parts, dict):
+            raise BlueprintError("parts must map part names to marks")
+        self.parts = []
+        for name in PARTS:
+            spec = parts.get(name, parts.get(f'part_{name.lower()}'))
+            if spec is None:
+                continue
+            if not isinstance(spec, dict):
+                spec = {'marks': spec}
+            try:
+                marks = int(spec['marks'])
+                count = int(spec['count']) if spec.get('count') else None
+                question_marks = sorted({int(m) for m in spec.get('question_marks') or []})
+            except (KeyError, TypeError, ValueError):
+                raise BlueprintError(f"Part {name} needs integer 'marks' (and optional 'count', 'question_marks')")
+            if marks <= 0 or (count is not None and count <= 0):
+                raise BlueprintError(f"Part {name} marks and count must be positive")
+            self.parts.append({'name': name, 'marks': marks, 'count': count, 'question_marks': question_marks})
+        if not self.parts:
+            raise BlueprintError("Blueprint needs marks for at least one part")
+
+        self.max_marks = sum(p['marks'] for p in self.parts)
+        if data.get('max_marks') not in (None, '') and self._integer(data['max_marks'], 'max_marks') != self.max_marks:
+            raise BlueprintError(
+                f"max_marks is {data['max_marks']} but the parts add up to {self.max_marks}"
+            )
+
+        self.co = self._coverage(data.get('co'), 'co')
+        self.bt = self._coverage(data.get('bt'), 'bt')
+        try:
+            self.units = {int(k): int(v) for k, v in (data.get('units') or {}).items()}
+        except (TypeError, ValueError, AttributeError):
+            raise BlueprintError("units must map unit numbers to marks")
+        if self.units and sum(self.units.values()) != self.max_marks:
+            raise BlueprintError(
+                f"Unit marks add up to {sum(self.units.values())}, not the paper's {self.max_marks}"
+            )
+
+        self.difficulty = {}
+        mix = data.get('difficulty') or {}
+        if mix:
+            if not isinstance(mix, dict):
+                raise BlueprintError("difficulty must map levels to shares")
+            unknown = set(mix) - set(DIFFICULTIES)
+            if unknown:
+                raise BlueprintError(f"Unknown difficulty levels: {', '.join(sorted(unknown))}")
+            try:
+                shares = {level: float(v) for level, v in mix.items()}
+            except (TypeError, ValueError):
+                raise BlueprintError("difficulty shares must be numbers")
+            if any(v < 0 for v in shares.values()) or sum(shares.values()) <= 0:
+                raise BlueprintError("difficulty shares must be positive")
+            # Accept fractions or percentages
+            total = sum(shares.values())
+            self.difficulty = {level: v / total for level, v in shares.items()}
+
+        exclude = data.get('exclude') or []
+        if not isinstance(exclude, (list, tuple)):
+            raise BlueprintError("exclude must be a list of question ids")
+        self.exclude = {self._integer(q_id, 'exclude') for q_id in exclude}
+        seed = data.get('seed')
+        self.seed = None if seed in (None, '') else self._integer(seed, 'seed')
+        if self.seed is not None and self.seed < 0:
+            raise BlueprintError("seed must be a non-negative integer")
+
+    @staticmethod
+    def _integer(value, name):
+        try:
+            return int(value)
+        except (TypeError, ValueError):
+            raise BlueprintError(f"{name} must be an integer")
+
+    def _coverage(self, value, name):
+        if not value:
+            return {}
+        if isinstance(value, (list, tuple)):
+            return {str(k): 1 for k in value}
+        try:
+            return {str(k): int(v) for k, v in value.items()}
+        except (TypeError, ValueError, AttributeError):
+            raise BlueprintError(f"{name} must be a list or map marks per {name.upper()}")
+
+
+class QuestionBank:
+    """The constraint-relevant columns of a course's questions as NumPy arrays.
+
+    Questions that agree on unit, marks, CO, BT and difficulty are
+    interchangeable for any blueprint, so they are grouped into classes; the
+    solver works on the classes (a few hundred even for very large banks) and
+    only draws concrete questions at the end.
+    """
+
+    def __init__(self, q_ids, marks, co, bt, units, difficulty):
+        self.q_ids = np.asarray(q_ids, dtype=np.int64)
+        self.marks = np.asarray(marks, dtype=np.int64)
+        self.co_labels, co_codes = self._encode(co)
+        self.bt_labels, bt_codes = self._encode(bt)
+        self.unit_labels, unit_codes = self._encode(units)
+        diff_labels, diff_codes = self._encode(difficulty)
+        diff_codes = np.array([DIFFICULTIES.index(d) if d in DIFFICULTIES else 0 for d in diff_labels],
+                              dtype=np.int64)[diff_codes] if len(diff_codes) else diff_codes
+
+        # One mixed-radix key per question, then group identical keys
+        columns = [unit_codes, self.marks, co_codes, bt_codes, diff_codes]
+        radices = [max(int(c.max()) + 1, 1) if len(c) else 1 for c in columns]
+        key = np.zeros(len(self.q_ids), dtype=np.int64)
+        for column, radix in zip(columns, radices):
+            key = key * radix + column
+        keys, self.class_of, self.class_count = np.unique(key, return_inverse=True, return_counts=True)
+        self.class_of = self.class_of.reshape(-1)
+        decoded = []
+        for radix in reversed(radices):
+            keys, column = np.divmod(keys, radix)
+            decoded.append(column)
+        self.c_unit, self.c_marks, self.c_co, self.c_bt, self.c_diff = reversed(decoded)
+
+    @staticmethod
+    def _encode(values):
+        codes = {}
+        encoded = np.fromiter((codes.setdefault(v, len(codes)) for v in values), dtype=np.int64, count=len(values))
+        return list(codes), encoded
+
+    @classmethod
+    def load(cls, course_id, exclude=()):
+        rows = (
+            Question.objects.filter(course_id_id=course_id, marks__gt=0)
+            .exclude(q_id__in=exclude)
+            .values_list('q_id', 'marks', 'co', 'bt', 'unit_id__unit_id', 'difficulty_level')
+        )
+        columns = list(zip(*rows)) or [[]] * 6
+        return cls(*columns)
+
+    def __len__(self):
+        return len(self.q_ids)
+
+    def code(self, labels, value):
+        return labels.index(value) if value in labels else None
+
+    def members(self):
+        """Question indices grouped by class: (order, start offsets)."""
+        order = np.argsort(self.class_of, kind='stable')
+        starts = np.concatenate(([0], np.cumsum(self.class_count)[:-1]))
+        return order, starts
+
+
+class BlueprintSolver:
+    """Randomized greedy search with feasibility look-ahead over question classes.
+
+    Each attempt repeatedly scores every class that can still be placed
+    (vectorized) and takes the best one, preferring classes that pay off CO/BT
+    coverage and difficulty targets. A pick is only allowed if the part and
+    unit it lands in can still be completed exactly, judged by subset-sum
+    tables built once up front. Attempts differ by random tie-breaking; the
+    best feasible one found within the time budget wins.
+    """
+
+    def __init__(self, bank, blueprint, rng=None):
+        self.bank = bank
+        self.blueprint = blueprint
+        self.rng = rng or np.random.default_rng(blueprint.seed)
+        self.C = len(bank.class_count)
+
+        self._build_parts()
+        self._build_units()
+        self.co_need = self._need(bank.co_labels, blueprint.co)
+        self.bt_need = self._need(bank.bt_labels, blueprint.bt)
+        self.diff_target = np.array(
+            [blueprint.difficulty.get(level, 0.0) * blueprint.max_marks for level in DIFFICULTIES]
+        )
+
+    def _need(self, labels, required):
+        need = np.zeros(len(labels) + 1)
+        for label, marks in required.items():
+            if label in labels:
+                need[labels.index(label)] = marks
+        return need
+
+    def _values(self, mask):
+        values = self.bank.c_marks[mask]
+        counts = self.bank.class_count[mask]
+        uniq = np.unique(values)
+        return uniq, [int(counts[values == v].sum()) for v in uniq]
+
+    def _build_parts(self):
+        bank = self.bank
+        self.part_allowed = []
+        self.part_reach = []
+        for part in self.blueprint.parts:
+            allowed = np.ones(self.C, dtype=bool)
+            if part['question_marks']:
+                allowed = np.isin(bank.c_marks, part['question_marks'])
+            allowed &= bank.c_marks <= part['marks']
+            values, counts = self._values(allowed)
+            self.part_allowed.append(allowed)
+            self.part_reach.append(reachable_sums(values, counts, part['marks'], part['count']))
+
+    def _build_units(self):
+        bank = self.bank
+        self.unit_target = None
+        if not self.blueprint.units:
+            return
+        # Classes from units outside the blueprint get a zero target and are never picked
+        self.unit_target = np.zeros(len(bank.unit_labels), dtype=np.int64)
+        limit = max(self.blueprint.units.values())
+        self.unit_reach = np.zeros((len(bank.unit_labels), limit + 1), dtype=bool)
+        self.unit_reach[:, 0] = True
+        for number, marks in self.blueprint.units.items():
+            code = bank.code(bank.unit_labels, number)
+            if code is None:
+                continue
+            self.unit_target[code] = marks
+            values, counts = self._values(bank.c_unit == code)
+            self.unit_reach[code, :marks + 1] = reachable_sums(values, counts, marks)
+
+    def precheck(self):
+        """Constraints that no selection can meet, found without searching."""
+        bp, bank = self.blueprint, self.bank
+        unmet = []
+        if not len(bank):
+            return [_unmet('bank', None, bp.max_marks, 0, "The course has no questions with marks")]
+
+        for part, reach, allowed in zip(bp.parts, self.part_reach, self.part_allowed):
+            ok = reach[part['marks']] if part['count'] is None else reach[part['count'], part['marks']]
+            if not ok:
+                how = f"{part['count']} questions totalling" if part['count'] else "questions totalling"
+                unmet.append(_unmet(
+                    'part', part['name'], part['marks'],
+                    int((bank.c_marks * bank.class_count)[allowed].sum()),
+                    f"Part {part['name']}: no combination of {how} exactly {part['marks']} marks",
+                ))
+
+        for number, marks in bp.units.items():
+            code = bank.code(bank.unit_labels, number)
+            available = int((bank.c_marks * bank.class_count)[bank.c_unit == code].sum()) if code is not None else 0
+            if code is None or not self.unit_reach[code, marks]:
+                unmet.append(_unmet(
+                    'unit', number, marks, available,
+                    f"Unit {number}: no combination of its questions totals exactly {marks} marks",
+                ))
+
+        for name, labels, required, column in (('co', bank.co_labels, bp.co, bank.c_co),
+                                               ('bt', bank.bt_labels, bp.bt, bank.c_bt)):
+            for label, marks in required.items():
+                code = bank.code(labels, label)
+                available = int((bank.c_marks * bank.class_count)[column == code].sum()) if code is not None else 0
+                if available < marks or marks > bp.max_marks:
+                    unmet.append(_unmet(
+                        name, label, marks, available,
+                        f"{label}: needs {marks} marks but the course has {available} marks of {label} questions",
+                    ))
+        return unmet
+
+    def _attempt(self, noise):
+        bank, bp = self.bank, self.blueprint
+        c_marks = bank.c_marks
+        avail = bank.class_count.copy()
+        part_left = np.array([p['marks'] for p in bp.parts])
+        count_left = [p['count'] for p in bp.parts]
+        unit_left = self.unit_target.copy() if self.unit_target is not None else None
+        co_need, bt_need = self.co_need.copy(), self.bt_need.copy()
+        diff_left = self.diff_target.copy()
+        picks = []
+
+        while part_left.sum() > 0:
+            ok = avail > 0
+            if unit_left is not None:
+                rem = unit_left[bank.c_unit] - c_marks
+                ok &= rem >= 0
+                ok &= self.unit_reach[bank.c_unit, np.clip(rem, 0, None)]
+            fits = np.zeros((len(bp.parts), self.C), dtype=bool)
+            for i, reach in enumerate(self.part_reach):
+                if count_left[i] == 0 or part_left[i] == 0:
+                    continue
+                rem = part_left[i] - c_marks
+                fit = self.part_allowed[i] & (rem >= 0)
+                rem = np.clip(rem, 0, None)
+                if count_left[i] is None:
+                    fit &= reach[rem]
+                else:
+                    fit &= reach[count_left[i] - 1, rem]
+                fits[i] = fit
+            ok &= fits.any(axis=0)
+            if not ok.any():
+                break
+
+            score = COVERAGE_WEIGHT * (np.minimum(c_marks, co_need[bank.c_co]) + np.minimum(c_marks, bt_need[bank.c_bt]))
+            if bp.difficulty:
+                wanted = diff_left[bank.c_diff]
+                score += np.minimum(c_marks, wanted) - np.maximum(c_marks - wanted, 0)
+            score += self.rng.random(self.C) * noise
+            score[~ok] = -np.inf
+            c = int(np.argmax(score))
+
+            # Place it in the part with the most marks still to fill
+            candidates = np.flatnonzero(fits[:, c])
+            i = int(candidates[np.argmax(part_left[candidates])])
+            m = int(c_marks[c])
+            picks.append((c, i))
+            avail[c] -= 1
+            part_left[i] -= m
+            if count_left[i] is not None:
+                count_left[i] -= 1
+            if unit_left is not None:
+                unit_left[bank.c_unit[c]] -= m
+            co_need[bank.c_co[c]] -= m
+            bt_need[bank.c_bt[c]] -= m
+            diff_left[bank.c_diff[c]] -= m
+
+        unmet = []
+        for part, left, n in zip(bp.parts, part_left, count_left):
+            if left or n:
+                unmet.append(_unmet('part', part['name'], part['marks'], part['marks'] - int(left),
+                                    f"Part {part['name']}: could only fill {part['marks'] - int(left)} of {part['marks']} marks"))
+        if unit_left is not None:
+            for number, marks in bp.units.items():
+                left = int(unit_left[bank.code(bank.unit_labels, number)])
+                if left:
+                    unmet.append(_unmet('unit', number, marks, marks - left,
+                                        f"Unit {number}: could only place {marks - left} of {marks} marks"))
+        for name, labels, required, need in (('co', bank.co_labels, bp.co, co_need), ('bt', bank.bt_labels, bp.bt, bt_need)):
+            for label, marks in required.items():
+                # Labels the bank lacks get no row in `need`, as in _need()
+                code = bank.code(labels, label)
+                left = int(need[code]) if code is not None else marks
+                if left > 0:
+                    unmet.append(_unmet(name, label, marks, marks - left,
+                                        f"{label}: only {marks - left} of the required {marks} marks fit alongside the other constraints"))
+        deviation = float(np.abs(diff_left).sum()) if bp.difficulty else 0.0
+        return picks, unmet, deviation
+
+    def solve(self, time_budget=None, max_attempts=None):
+        time_budget = time_budget or getattr(settings, 'BLUEPRINT_TIME_BUDGET', 0.08)
+        max_attempts = max_attempts or getattr(settings, 'BLUEPRINT_MAX_ATTEMPTS', 200)
+        started = time.perf_counter()
+
+        unmet = self.precheck()
+        if unmet:
+            raise BlueprintInfeasible(unmet)
+
+        best = closest = None
+        attempts = stalled = 0
+        while attempts < max_attempts and stalled < STALL_ATTEMPTS:
+            # The first attempt is the plain greedy; later ones explore around it
+            picks, unmet, deviation = self._attempt(noise=0.01 + attempts * 0.5)
+            attempts += 1
+            stalled += 1
+            if not unmet:
+                if best is None or deviation < best[1]:
+                    best = (picks, deviation)
+                    stalled = 0
+                if deviation < 0.5:
+                    break
+            elif closest is None or len(unmet) < len(closest):
+                closest = unmet
+            if time.perf_counter() - started > time_budget:
+                break
+
+        if best is None:
+            raise BlueprintInfeasible(closest)
+        return self._result(best[0], best[1], attempts, time.perf_counter() - started)
+
+    def _result(self, picks, deviation, attempts, elapsed):
+        bank, bp = self.bank, self.blueprint
+        order, starts = bank.members()
+        taken = {}
+        for c, _ in picks:
+            taken[c] = taken.get(c, 0) + 1
+        drawn = {}
+        for c, k in taken.items():
+            members = order[starts[c]:starts[c] + bank.class_count[c]]
+            drawn[c] = list(self.rng.choice(members, size=k, replace=False))
+
+        selected = {part['name']: [] for part in bp.parts}
+        summary = {'co': {}, 'bt': {}, 'units': {}, 'difficulty': {}}
+        for c, i in picks:
+            index = drawn[c].pop()
+            m = int(bank.c_marks[c])
+            selected[bp.parts[i]['name']].append((bank.unit_labels[bank.c_unit[c]], int(bank.q_ids[index])))
+            for key, value in (('co', bank.co_labels[bank.c_co[c]]), ('bt', bank.bt_labels[bank.c_bt[c]]),
+                               ('units', bank.unit_labels[bank.c_unit[c]]), ('difficulty', DIFFICULTIES[bank.c_diff[c]])):
+                summary[key][value] = summary[key].get(value, 0) + m
+
+        # Questions appear in unit order within each part
+        selected = {name: [q_id for _, q_id in sorted(rows, key=lambda r: (r[0] is None, r[0], r[1]))]
+                    for name, rows in selected.items()}
+        return {
+            'selected_questions': {
+                f'part_{name.lower()}': selected.get(name, []) for name in PARTS
+            },
+            'max_marks': bp.max_marks,
+            'summary': {
+                'marks': {
+                    part['name']: part['marks'] for part in bp.parts
+                },
+                **summary,
+                'difficulty_target': {
+                    level: round(share * bp.max_marks, 2) for level, share in bp.difficulty.items()
+                },
+                'difficulty_deviation': round(deviation, 2),
+            },
+            'attempts': attempts,
+            'solve_ms': round(elapsed * 1000, 2),
+        }
+
+
+def assemble_paper(course_id, data):
+    """Pick questions from ``course_id`` for the blueprint in ``data``."""
+    blueprint = Blueprint(data)
+    started = time.perf_counter()
+    bank = QuestionBank.load(course_id, blueprint.exclude)
+    load_seconds = time.perf_counter() - started
+
+    result = BlueprintSolver(bank, blueprint).solve()
+    result['bank_size'] = len(bank)
+    result['question_classes'] = len(bank.class_count)
+    result['load_ms'] = round(load_seconds * 1000, 2)
+    logging.info(
+        f"Assembled a {blueprint.max_marks}-mark paper for {course_id} from {len(bank)} questions "
+        f"in {result['solve_ms']:.1f}ms ({result['attempts']} attempts)"
+    )
+    return result
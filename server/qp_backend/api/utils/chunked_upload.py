@@ -0,0 +1,185 @@
+import os
+import hashlib
+import logging
+import tempfile
+import threading
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from ..models import UploadSession
+from .ingestion_jobs import enqueue_job
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+
+CHUNKED_UPLOAD_DIR = os.path.join("temp", "chunked")
+READ_SIZE = 64 * 1024
+
+
+class UploadError(Exception):
+    pass
+
+
+class UploadOffsetMismatch(UploadError):
+    def __init__(self, expected):
+        super().__init__(f"Part must start at offset {expected}")
+        self.expected = expected
+
+
+# upload_id -> (offset, sha256 state) for parts received by this process. A
+# session that continues on another worker, or after a restart, is rehashed
+# from disk once at completion instead.
+_hashers = {}
+_hashers_lock = threading.Lock()
+
+
+def _hasher_at(upload_id, offset):
+    with _hashers_lock:
+        entry = _hashers.get(upload_id)
+    if entry and entry[0] == offset:
+        # Work on a copy so a part that fails halfway leaves the saved state intact
+        return entry[1].copy()
+    if offset == 0:
+        return hashlib.sha256()
+    return None
+
+
+def _forget(upload_id):
+    with _hashers_lock:
+        _hashers.pop(upload_id, None)
+
+
+def file_sha256(path):
+    hasher = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            hasher.update(block)
+    return hasher.hexdigest()
+
+
+def expire_stale_sessions():
+    ttl = getattr(settings, 'CHUNKED_UPLOAD_TTL', 24 * 60 * 60)
+    cutoff = timezone.now() - timedelta(seconds=ttl)
+    stale = list(UploadSession.objects.filter(status='receiving', updated_at__lt=cutoff))
+    for session in stale:
+        abort_session(session)
+    if stale:
+        logging.info(f"Expired {len(stale)} abandoned upload sessions")
+
+
+def create_session(course, faculty, original_name, size, sha256=''):
+    max_bytes = getattr(settings, 'CHUNKED_UPLOAD_MAX_BYTES', 200 * 1024 * 1024)
+    if size <= 0 or size > max_bytes:
+        raise UploadError(f"Upload size must be between 1 and {max_bytes} bytes")
+    if sha256 and len(sha256) != 64:
+        raise UploadError("sha256 must be a 64-character hex digest")
+
+    expire_stale_sessions()
+    os.makedirs(CHUNKED_UPLOAD_DIR, exist_ok=True)
+    # mkstemp names never collide, whatever the uploaded file was called
+    fd, path = tempfile.mkstemp(dir=CHUNKED_UPLOAD_DIR, suffix='.part')
+    os.close(fd)
+    return UploadSession.objects.create(
+        course_id=course,
+        faculty=faculty,
+        original_name=original_name,
+        file_path=path,
+        size=size,
+        sha256=sha256.lower(),
+    )
+
+
+def write_part(session, offset, stream, length):
+    """Append ``length`` bytes read from ``stream`` at ``offset``; returns the new offset.
+
+    The request body is copied to disk in small reads and hashed on the way,
+    so a part is never held in memory as a whole. The session row is locked
+    for the duration, which serializes parts sent concurrently for one upload.
+    """
+    with transaction.atomic():
+        session = UploadSession.objects.select_for_update().get(pk=session.pk)
+        if session.status != 'receiving':
+            raise UploadError(f"Upload is {session.status}")
+        if offset != session.received:
+            raise UploadOffsetMismatch(session.received)
+        if length <= 0 or offset + length > session.size:
+            raise UploadError(f"Part exceeds the declared size of {session.size} bytes")
+
+        hasher = _hasher_at(session.upload_id, offset)
+        written = 0
+        with open(session.file_path, "r+b") as f:
+            # Drop anything a previously interrupted part left past the offset
+            f.seek(offset)
+            f.truncate()
+            while written < length:
+                block = stream.read(min(READ_SIZE, length - written))
+                if not block:
+                    break
+                f.write(block)
+                if hasher:
+                    hasher.update(block)
+                written += len(block)
+
+        session.received = offset + written
+        session.save(update_fields=['received', 'updated_at'])
+        if hasher:
+            with _hashers_lock:
+                _hashers[session.upload_id] = (session.received, hasher)
+        else:
+            _forget(session.upload_id)
+    return session.received
+
+
+def complete_session(session):
+    """Verify the assembled file and hand it to the ingestion job queue."""
+    with transaction.atomic():
+        session = UploadSession.objects.select_for_update().get(pk=session.pk)
+        if session.status == 'completed':
+            return session
+        if session.status != 'receiving':
+            raise UploadError(f"Upload is {session.status}")
+        if session.received != session.size:
+            raise UploadError(f"Upload incomplete: received {session.received} of {session.size} bytes")
+
+        hasher = _hasher_at(session.upload_id, session.size)
+        digest = hasher.hexdigest() if hasher else file_sha256(session.file_path)
+        _forget(session.upload_id)
+        corrupt = bool(session.sha256) and digest != session.sha256
+        if not corrupt:
+            session.sha256 = digest
+            session.job = enqueue_job(
+                session.course_id, session.faculty, session.file_path, session.original_name
+            )
+            session.status = 'completed'
+            session.save(update_fields=['sha256', 'job', 'status', 'updated_at'])
+
+    if corrupt:
+        # Damaged in transit; the client has to start over
+        abort_session(session)
+        raise UploadError("Checksum mismatch, upload discarded")
+    return session
+
+
+def abort_session(session):
+    _forget(session.upload_id)
+    if os.path.exists(session.file_path):
+        os.remove(session.file_path)
+    session.status = 'aborted'
+    session.save(update_fields=['status', 'updated_at'])
+    return session
+
+
+def serialize_session(session):
+    return {
+        'upload_id': str(session.upload_id),
+        'course_id': session.course_id_id,
+        'file_name': session.original_name,
+        'size': session.size,
+        'offset': session.received,
+        'status': session.status,
+        'sha256': session.sha256 or None,
+        'job_id': session.job_id,
+    }
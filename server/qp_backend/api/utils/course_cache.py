@@ -0,0 +1,48 @@
+import time
+import logging
+import threading
+
+from ..models import Course
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+
+
+class CourseIndexCache:
+    """In-process, per-course structures built from a course's question bank.
+
+    Each entry remembers the Course.question_version it was built at; any
+    change to the course's questions bumps the counter, so the next lookup
+    costs one primary-key query and rebuilds only when the bank has changed.
+    """
+
+    def __init__(self, name, build):
+        self.name = name
+        self.build = build
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def get(self, course_id):
+        version = Course.objects.filter(pk=course_id).values_list('question_version', flat=True).first()
+        if version is None:
+            raise Course.DoesNotExist(f"Course {course_id} not found")
+        with self._lock:
+            cached = self._entries.get(course_id)
+            if cached and cached[0] == version:
+                return cached[1]
+
+        started = time.perf_counter()
+        index = self.build(course_id)
+        logging.info(
+            f"Built {self.name} for {course_id}: {len(index)} questions in {time.perf_counter() - started:.2f}s"
+        )
+        with self._lock:
+            # A concurrent build may have stored a newer version meanwhile; keep that one
+            cached = self._entries.get(course_id)
+            if not cached or cached[0] <= version:
+                self._entries[course_id] = (version, index)
+        return index
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
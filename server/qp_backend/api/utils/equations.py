@@ -0,0 +1,536 @@
+import re
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+
+from django.conf import settings
+from lxml import etree
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+
+M_NS = 'http://schemas.openxmlformats.org/officeDocument/2006/math'
+MATHML_NS = 'http://www.w3.org/1998/Math/MathML'
+
+# OMML -> presentation MathML. Covers the structures Word's equation editor
+# produces (fractions, scripts, radicals, n-ary operators, delimiters,
+# functions, accents, bars, limits, matrices and equation arrays).
+OMML_TO_MATHML_XSLT = '''<?xml version="1.0" encoding="UTF-8"?>
+<xsl:stylesheet version="1.0"
+    xmlns:xsl="http://www.w3.org/1999/XSL/Transform"
+    xmlns:m="http://schemas.openxmlformats.org/officeDocument/2006/math"
+    xmlns="http://www.w3.org/1998/Math/MathML"
+    exclude-result-prefixes="m">
+  <xsl:output method="xml" omit-xml-declaration="yes"/>
+
+  <xsl:variable name="digits" select="'0123456789'"/>
+  <xsl:variable name="operators"
+      select="'+-=&lt;&gt;()[]{}|,;:!/*&#x2212;&#x00B1;&#x2213;&#x00D7;&#x00F7;&#x22C5;&#x00B7;&#x2264;&#x2265;&#x2260;&#x2248;&#x2261;&#x221D;&#x2192;&#x2190;&#x2194;&#x21D2;&#x21D4;&#x2208;&#x2209;&#x2282;&#x2286;&#x222A;&#x2229;&#x2227;&#x2228;&#x00AC;&#x2200;&#x2203;&#x2211;&#x220F;&#x222B;&#x222E;&#x2202;&#x2207;&#x2032;'"/>
+
+  <xsl:template match="text()"/>
+
+  <xsl:template match="m:oMathPara">
+    <math display="block"><xsl:apply-templates select="m:oMath/*"/></math>
+  </xsl:template>
+
+  <xsl:template match="m:oMath">
+    <math><xsl:apply-templates/></math>
+  </xsl:template>
+
+  <xsl:template match="m:e|m:num|m:den|m:sup|m:sub|m:deg|m:lim|m:fName">
+    <mrow><xsl:apply-templates/></mrow>
+  </xsl:template>
+
+  <!-- Runs -->
+  <xsl:template match="m:r">
+    <xsl:variable name="text"><xsl:for-each select="m:t"><xsl:value-of select="."/></xsl:for-each></xsl:variable>
+    <xsl:choose>
+      <xsl:when test="m:rPr/m:nor[not(@m:val) or @m:val='1' or @m:val='on' or @m:val='true']">
+        <mtext><xsl:value-of select="$text"/></mtext>
+      </xsl:when>
+      <xsl:when test="ancestor::m:fName and string-length(translate($text, concat($digits, $operators, ' '), '')) = string-length($text)">
+        <mi><xsl:value-of select="$text"/></mi>
+      </xsl:when>
+      <xsl:otherwise>
+        <xsl:call-template name="tokens"><xsl:with-param name="s" select="$text"/></xsl:call-template>
+      </xsl:otherwise>
+    </xsl:choose>
+  </xsl:template>
+
+  <xsl:template name="tokens">
+    <xsl:param name="s"/>
+    <xsl:if test="string-length($s) &gt; 0">
+      <xsl:variable name="c" select="substring($s, 1, 1)"/>
+      <xsl:choose>
+        <xsl:when test="contains($digits, $c)">
+          <xsl:variable name="number">
+            <xsl:call-template name="leading-number"><xsl:with-param name="s" select="$s"/></xsl:call-template>
+          </xsl:variable>
+          <mn><xsl:value-of select="$number"/></mn>
+          <xsl:call-template name="tokens">
+            <xsl:with-param name="s" select="substring($s, string-length($number) + 1)"/>
+          </xsl:call-template>
+        </xsl:when>
+        <xsl:otherwise>
+          <xsl:choose>
+            <xsl:when test="$c = ' '"/>
+            <xsl:when test="contains($operators, $c)"><mo><xsl:value-of select="$c"/></mo></xsl:when>
+            <xsl:otherwise><mi><xsl:value-of select="$c"/></mi></xsl:otherwise>
+          </xsl:choose>
+          <xsl:call-template name="tokens"><xsl:with-param name="s" select="substring($s, 2)"/></xsl:call-template>
+        </xsl:otherwise>
+      </xsl:choose>
+    </xsl:if>
+  </xsl:template>
+
+  <xsl:template name="leading-number">
+    <xsl:param name="s"/>
+    <xsl:variable name="c" select="substring($s, 1, 1)"/>
+    <xsl:if test="$c != '' and (contains($digits, $c) or ($c = '.' and contains($digits, substring($s, 2, 1))))">
+      <xsl:value-of select="$c"/>
+      <xsl:call-template name="leading-number"><xsl:with-param name="s" select="substring($s, 2)"/></xsl:call-template>
+    </xsl:if>
+  </xsl:template>
+
+  <!-- Fractions -->
+  <xsl:template match="m:f">
+    <xsl:choose>
+      <xsl:when test="m:fPr/m:type/@m:val = 'lin'">
+        <mrow><xsl:apply-templates select="m:num"/><mo>/</mo><xsl:apply-templates select="m:den"/></mrow>
+      </xsl:when>
+      <xsl:otherwise>
+        <mfrac>
+          <xsl:if test="m:fPr/m:type/@m:val = 'noBar'"><xsl:attribute name="linethickness">0</xsl:attribute></xsl:if>
+          <xsl:if test="m:fPr/m:type/@m:val = 'skw'"><xsl:attribute name="bevelled">true</xsl:attribute></xsl:if>
+          <xsl:apply-templates select="m:num"/>
+          <xsl:apply-templates select="m:den"/>
+        </mfrac>
+      </xsl:otherwise>
+    </xsl:choose>
+  </xsl:template>
+
+  <!-- Scripts -->
+  <xsl:template match="m:sSup">
+    <msup><xsl:apply-templates select="m:e"/><xsl:apply-templates select="m:sup"/></msup>
+  </xsl:template>
+
+  <xsl:template match="m:sSub">
+    <msub><xsl:apply-templates select="m:e"/><xsl:apply-templates select="m:sub"/></msub>
+  </xsl:template>
+
+  <xsl:template match="m:sSubSup">
+    <msubsup>
+      <xsl:apply-templates select="m:e"/><xsl:apply-templates select="m:sub"/><xsl:apply-templates select="m:sup"/>
+    </msubsup>
+  </xsl:template>
+
+  <xsl:template match="m:sPre">
+    <mmultiscripts>
+      <xsl:apply-templates select="m:e"/>
+      <mprescripts/>
+      <xsl:apply-templates select="m:sub"/><xsl:apply-templates select="m:sup"/>
+    </mmultiscripts>
+  </xsl:template>
+
+  <!-- Radicals -->
+  <xsl:template match="m:rad">
+    <xsl:choose>
+      <xsl:when test="m:radPr/m:degHide[not(@m:val) or @m:val='1' or @m:val='on' or @m:val='true'] or not(m:deg/*)">
+        <msqrt><xsl:apply-templates select="m:e/*"/></msqrt>
+      </xsl:when>
+      <xsl:otherwise>
+        <mroot><xsl:apply-templates select="m:e"/><xsl:apply-templates select="m:deg"/></mroot>
+      </xsl:otherwise>
+    </xsl:choose>
+  </xsl:template>
+
+  <!-- N-ary operators (sums, products, integrals) -->
+  <xsl:template match="m:nary">
+    <xsl:variable name="chr">
+      <xsl:choose>
+        <xsl:when test="m:naryPr/m:chr/@m:val"><xsl:value-of select="m:naryPr/m:chr/@m:val"/></xsl:when>
+        <xsl:otherwise>&#x222B;</xsl:otherwise>
+      </xsl:choose>
+    </xsl:variable>
+    <xsl:variable name="hideSub" select="boolean(m:naryPr/m:subHide[not(@m:val) or @m:val='1' or @m:val='on' or @m:val='true'])"/>
+    <xsl:variable name="hideSup" select="boolean(m:naryPr/m:supHide[not(@m:val) or @m:val='1' or @m:val='on' or @m:val='true'])"/>
+    <xsl:variable name="under" select="m:naryPr/m:limLoc/@m:val = 'undOvr'"/>
+    <mrow>
+      <xsl:choose>
+        <xsl:when test="$hideSub and $hideSup">
+          <mo largeop="true"><xsl:value-of select="$chr"/></mo>
+        </xsl:when>
+        <xsl:when test="$hideSub">
+          <xsl:element name="{substring('msupmover', 1 + 4 * $under, 4 + $under)}">
+            <mo largeop="true"><xsl:value-of select="$chr"/></mo><xsl:apply-templates select="m:sup"/>
+          </xsl:element>
+        </xsl:when>
+        <xsl:when test="$hideSup">
+          <xsl:element name="{substring('msubmunder', 1 + 4 * $under, 4 + 2 * $under)}">
+            <mo largeop="true"><xsl:value-of select="$chr"/></mo><xsl:apply-templates select="m:sub"/>
+          </xsl:element>
+        </xsl:when>
+        <xsl:otherwise>
+          <xsl:element name="{substring('msubsupmunderover', 1 + 7 * $under, 7 + 3 * $under)}">
+            <mo largeop="true"><xsl:value-of select="$chr"/></mo>
+            <xsl:apply-templates select="m:sub"/><xsl:apply-templates select="m:sup"/>
+          </xsl:element>
+        </xsl:otherwise>
+      </xsl:choose>
+      <xsl:apply-templates select="m:e"/>
+    </mrow>
+  </xsl:template>
+
+  <!-- Delimiters -->
+  <xsl:template match="m:d">
+    <xsl:variable name="beg">
+      <xsl:choose>
+        <xsl:when test="m:dPr/m:begChr"><xsl:value-of select="m:dPr/m:begChr/@m:val"/></xsl:when>
+        <xsl:otherwise>(</xsl:otherwise>
+      </xsl:choose>
+    </xsl:variable>
+    <xsl:variable name="end">
+      <xsl:choose>
+        <xsl:when test="m:dPr/m:endChr"><xsl:value-of select="m:dPr/m:endChr/@m:val"/></xsl:when>
+        <xsl:otherwise>)</xsl:otherwise>
+      </xsl:choose>
+    </xsl:variable>
+    <xsl:variable name="sep">
+      <xsl:choose>
+        <xsl:when test="m:dPr/m:sepChr"><xsl:value-of select="m:dPr/m:sepChr/@m:val"/></xsl:when>
+        <xsl:otherwise>|</xsl:otherwise>
+      </xsl:choose>
+    </xsl:variable>
+    <mrow>
+      <xsl:if test="string($beg)"><mo fence="true" form="prefix"><xsl:value-of select="$beg"/></mo></xsl:if>
+      <xsl:for-each select="m:e">
+        <xsl:if test="position() &gt; 1"><mo separator="true"><xsl:value-of select="$sep"/></mo></xsl:if>
+        <xsl:apply-templates select="."/>
+      </xsl:for-each>
+      <xsl:if test="string($end)"><mo fence="true" form="postfix"><xsl:value-of select="$end"/></mo></xsl:if>
+    </mrow>
+  </xsl:template>
+
+  <!-- Functions -->
+  <xsl:template match="m:func">
+    <mrow><xsl:apply-templates select="m:fName"/><mo>&#x2061;</mo><xsl:apply-templates select="m:e"/></mrow>
+  </xsl:template>
+
+  <!-- Accents, bars and grouping characters -->
+  <xsl:template match="m:acc">
+    <mover accent="true">
+      <xsl:apply-templates select="m:e"/>
+      <mo>
+        <xsl:choose>
+          <xsl:when test="m:accPr/m:chr/@m:val"><xsl:value-of select="m:accPr/m:chr/@m:val"/></xsl:when>
+          <xsl:otherwise>&#x0302;</xsl:otherwise>
+        </xsl:choose>
+      </mo>
+    </mover>
+  </xsl:template>
+
+  <xsl:template match="m:bar">
+    <xsl:choose>
+      <xsl:when test="m:barPr/m:pos/@m:val = 'top'">
+        <mover accent="true"><xsl:apply-templates select="m:e"/><mo>&#x00AF;</mo></mover>
+      </xsl:when>
+      <xsl:otherwise>
+        <munder accentunder="true"><xsl:apply-templates select="m:e"/><mo>_</mo></munder>
+      </xsl:otherwise>
+    </xsl:choose>
+  </xsl:template>
+
+  <xsl:template match="m:groupChr">
+    <xsl:variable name="chr">
+      <xsl:choose>
+        <xsl:when test="m:groupChrPr/m:chr/@m:val"><xsl:value-of select="m:groupChrPr/m:chr/@m:val"/></xsl:when>
+        <xsl:otherwise>&#x23DF;</xsl:otherwise>
+      </xsl:choose>
+    </xsl:variable>
+    <xsl:choose>
+      <xsl:when test="m:groupChrPr/m:pos/@m:val = 'top'">
+        <mover><xsl:apply-templates select="m:e"/><mo><xsl:value-of select="$chr"/></mo></mover>
+      </xsl:when>
+      <xsl:otherwise>
+        <munder><xsl:apply-templates select="m:e"/><mo><xsl:value-of select="$chr"/></mo></munder>
+      </xsl:otherwise>
+    </xsl:choose>
+  </xsl:template>
+
+  <xsl:template match="m:limLow">
+    <munder><xsl:apply-templates select="m:e"/><xsl:apply-templates select="m:lim"/></munder>
+  </xsl:template>
+
+  <xsl:template match="m:limUpp">
+    <mover><xsl:apply-templates select="m:e"/><xsl:apply-templates select="m:lim"/></mover>
+  </xsl:template>
+
+  <!-- Matrices and equation arrays -->
+  <xsl:template match="m:m">
+    <mtable><xsl:apply-templates select="m:mr"/></mtable>
+  </xsl:template>
+
+  <xsl:template match="m:mr">
+    <mtr><xsl:apply-templates select="m:e"/></mtr>
+  </xsl:template>
+
+  <xsl:template match="m:mr/m:e">
+    <mtd><xsl:apply-templates/></mtd>
+  </xsl:template>
+
+  <xsl:template match="m:eqArr">
+    <mtable columnalign="left"><xsl:apply-templates select="m:e"/></mtable>
+  </xsl:template>
+
+  <xsl:template match="m:eqArr/m:e">
+    <mtr><mtd><xsl:apply-templates/></mtd></mtr>
+  </xsl:template>
+
+  <!-- Boxes -->
+  <xsl:template match="m:borderBox">
+    <menclose notation="box"><xsl:apply-templates select="m:e/*"/></menclose>
+  </xsl:template>
+
+  <xsl:template match="m:box|m:phant">
+    <mrow><xsl:apply-templates select="m:e/*"/></mrow>
+  </xsl:template>
+</xsl:stylesheet>
+'''
+
+# Compiled once per process; XSLT objects are not shared between threads
+_xslt_local = threading.local()
+
+
+def _omml_to_mathml():
+    transform = getattr(_xslt_local, 'transform', None)
+    if transform is None:
+        transform = etree.XSLT(etree.fromstring(OMML_TO_MATHML_XSLT.encode('utf-8')))
+        _xslt_local.transform = transform
+    return transform
+
+
+_LATEX_SYMBOLS = {
+    'α': r'\alpha', 'β': r'\beta', 'γ': r'\gamma', 'δ': r'\delta',
+    'ε': r'\epsilon', 'ζ': r'\zeta', 'η': r'\eta', 'θ': r'\theta',
+    'ι': r'\iota', 'κ': r'\kappa', 'λ': r'\lambda', 'μ': r'\mu',
+    'ν': r'\nu', 'ξ': r'\xi', 'π': r'\pi', 'ρ': r'\rho',
+    'σ': r'\sigma', 'τ': r'\tau', 'υ': r'\upsilon', 'φ': r'\phi',
+    'χ': r'\chi', 'ψ': r'\psi', 'ω': r'\omega', 'Γ': r'\Gamma',
+    'Δ': r'\Delta', 'Θ': r'\Theta', 'Λ': r'\Lambda', 'Ξ': r'\Xi',
+    'Π': r'\Pi', 'Σ': r'\Sigma', 'Φ': r'\Phi', 'Ψ': r'\Psi',
+    'Ω': r'\Omega', '∞': r'\infty', '∂': r'\partial', '∇': r'\nabla',
+    '−': '-', '±': r'\pm', '∓': r'\mp', '×': r'\times',
+    '÷': r'\div', '⋅': r'\cdot', '·': r'\cdot', '≤': r'\leq',
+    '≥': r'\geq', '≠': r'\neq', '≈': r'\approx', '≡': r'\equiv',
+    '∝': r'\propto', '→': r'\rightarrow', '←': r'\leftarrow',
+    '↔': r'\leftrightarrow', '⇒': r'\Rightarrow', '⇔': r'\Leftrightarrow',
+    '∈': r'\in', '∉': r'\notin', '⊂': r'\subset', '⊆': r'\subseteq',
+    '∪': r'\cup', '∩': r'\cap', '∧': r'\wedge', '∨': r'\vee',
+    '¬': r'\neg', '∀': r'\forall', '∃': r'\exists', '∑': r'\sum',
+    '∏': r'\prod', '∫': r'\int', '∬': r'\iint', '∭': r'\iiint',
+    '∮': r'\oint', '′': "'", '…': r'\ldots', '⋯': r'\cdots',
+    '{': r'\{', '}': r'\}', '%': r'\%', '#': r'\#', '&': r'\&', '_': r'\_',
+    '⁡': '',
+}
+
+_LATEX_ACCENTS = {
+    '̂': r'\hat', '^': r'\hat', '̃': r'\tilde', '~': r'\tilde',
+    '̇': r'\dot', '̈': r'\ddot', '⃗': r'\vec', '→': r'\vec',
+    '̄': r'\bar', '¯': r'\overline', '‾': r'\overline',
+    '⏞': r'\overbrace', '⏟': r'\underbrace', '_': r'\underline',
+    '̲': r'\underline',
+}
+
+_LATEX_FUNCTIONS = {
+    'sin', 'cos', 'tan', 'cot', 'sec', 'csc', 'arcsin', 'arccos', 'arctan',
+    'sinh', 'cosh', 'tanh', 'log', 'ln', 'lg', 'exp', 'lim', 'max', 'min',
+    'sup', 'inf', 'det', 'gcd', 'deg', 'dim', 'ker', 'arg', 'mod',
+}
+
+_COMMAND_END = re.compile(r'\\[A-Za-z]+$')
+
+
+def _local(elem):
+    return etree.QName(elem).localname
+
+
+def _join(parts):
+    """Concatenate LaTeX fragments, keeping ``\\alpha x`` from becoming ``\\alphax``."""
+    out = ''
+    for part in parts:
+        if out and part and part[0].isalpha() and _COMMAND_END.search(out):
+            out += ' '
+        out += part
+    return out
+
+
+def _group(latex):
+    if len(latex) == 1 or re.fullmatch(r'\\[A-Za-z]+', latex):
+        return latex
+    return '{' + latex + '}'
+
+
+def _symbol(text):
+    return _join(_LATEX_SYMBOLS.get(ch, ch) for ch in text)
+
+
+def mathml_to_latex(elem):
+    """Translate a presentation MathML element (as produced above) to LaTeX."""
+    name = _local(elem)
+    children = list(elem)
+    convert = mathml_to_latex
+
+    if name == 'mi':
+        text = elem.text or ''
+        if text in _LATEX_FUNCTIONS:
+            return '\\' + text
+        if len(text) > 1:
+            return r'\mathrm{' + text + '}'
+        return _symbol(text)
+    if name == 'mn':
+        return elem.text or ''
+    if name == 'mo':
+        return _symbol(elem.text or '')
+    if name == 'mtext':
+        return r'\text{' + (elem.text or '') + '}'
+    if name == 'mfrac':
+        num, den = convert(children[0]), convert(children[1])
+        if elem.get('linethickness') == '0':
+            return r'\genfrac{}{}{0pt}{}{' + num + '}{' + den + '}'
+        if elem.get('bevelled') == 'true':
+            return _group(num) + '/' + _group(den)
+        return r'\frac{' + num + '}{' + den + '}'
+    if name == 'msup':
+        return _group(convert(children[0])) + '^{' + convert(children[1]) + '}'
+    if name == 'msub':
+        return _group(convert(children[0])) + '_{' + convert(children[1]) + '}'
+    if name == 'msubsup':
+        return (_group(convert(children[0])) + '_{' + convert(children[1])
+                + '}^{' + convert(children[2]) + '}')
+    if name == 'mmultiscripts':
+        base = convert(children[0])
+        sub, sup = convert(children[2]), convert(children[3])
+        return '{}_{' + sub + '}^{' + sup + '}' + _group(base)
+    if name == 'msqrt':
+        return r'\sqrt{' + _join(convert(c) for c in children) + '}'
+    if name == 'mroot':
+        return r'\sqrt[' + convert(children[1]) + ']{' + convert(children[0]) + '}'
+    if name in ('munder', 'mover'):
+        base, script = children[0], children[1]
+        base_latex = convert(base)
+        if _local(script) == 'mo' and (script.text or '') in _LATEX_ACCENTS:
+            return _LATEX_ACCENTS[script.text] + '{' + base_latex + '}'
+        if _local(base) == 'mo' and base.get('largeop') == 'true' or base_latex.startswith(r'\lim'):
+            marker = '_' if name == 'munder' else '^'
+            return base_latex + marker + '{' + convert(script) + '}'
+        command = r'\underset' if name == 'munder' else r'\overset'
+        return command + '{' + convert(script) + '}{' + base_latex + '}'
+    if name == 'munderover':
+        return (convert(children[0]) + '_{' + convert(children[1])
+                + '}^{' + convert(children[2]) + '}')
+    if name == 'mtable':
+        rows = [
+            ' & '.join(_join(convert(c) for c in cell) for cell in row)
+            for row in children
+        ]
+        env = 'aligned' if elem.get('columnalign') == 'left' else 'matrix'
+        return r'\begin{' + env + '}' + r' \\ '.join(rows) + r'\end{' + env + '}'
+    if name == 'menclose':
+        return r'\boxed{' + _join(convert(c) for c in children) + '}'
+    if name == 'mrow' and children:
+        first, last = children[0], children[-1]
+        opens = _local(first) == 'mo' and first.get('form') == 'prefix'
+        closes = _local(last) == 'mo' and last.get('form') == 'postfix'
+        if opens or closes:
+            inner = children[1 if opens else 0:len(children) - 1 if closes else len(children)]
+            left = _symbol(first.text or '') if opens else '.'
+            right = _symbol(last.text or '') if closes else '.'
+            return r'\left' + left + ' ' + _join(convert(c) for c in inner) + r' \right' + right
+    return _join(convert(c) for c in children)
+
+
+class EquationConverter:
+    """Converts OMML equations to MathML and LaTeX, memoizing by content.
+
+    The cache key is the SHA-256 of the exclusive C14N serialization of the
+    ``m:oMath`` element, so the same equation typed into many questions (or
+    saved by different Word versions with other namespace declarations) is
+    converted once. Least recently used entries are evicted past ``maxsize``.
+    """
+
+    def __init__(self, maxsize=None):
+        self.maxsize = maxsize or getattr(settings, 'EQUATION_CACHE_SIZE', 4096)
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def canonicalize(math_elem):
+        return etree.tostring(math_elem, method='c14n', exclusive=True, with_comments=False)
+
+    def convert(self, math_elem, stats=None):
+        """Return a dict with ``omml``, ``mathml``, ``latex`` and ``text`` for one equation.
+
+        The hit or miss is also counted on ``stats`` (``equations_cached`` /
+        ``equations_converted``), so one ingestion can report its own share of
+        a converter that concurrent uploads use too.
+        """
+        omml = self.canonicalize(math_elem)
+        key = hashlib.sha256(omml).hexdigest()
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached is not None:
+                self._cache.move_to_end(key)
+                self.hits += 1
+                if stats is not None:
+                    stats.equations_cached += 1
+                return dict(cached)
+            self.misses += 1
+            if stats is not None:
+                stats.equations_converted += 1
+
+        result = self._convert(omml)
+        with self._lock:
+            self._cache[key] = result
+            if len(self._cache) > self.maxsize:
+                self._cache.popitem(last=False)
+        return dict(result)
+
+    @staticmethod
+    def _convert(omml):
+        source = etree.fromstring(omml)
+        text = ' '.join(source.xpath('.//m:t/text()', namespaces={'m': M_NS}))
+        result = {'omml': omml.decode('utf-8'), 'mathml': '', 'latex': '', 'text': text}
+        try:
+            mathml = _omml_to_mathml()(source).getroot()
+            result['mathml'] = etree.tostring(mathml, encoding='unicode')
+            result['latex'] = mathml_to_latex(mathml)
+        except Exception as e:
+            logging.error(f"Error converting equation '{text}': {e}")
+        return result
+
+    def cache_info(self):
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'size': len(self._cache),
+                'maxsize': self.maxsize,
+            }
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+            self.hits = 0
+            self.misses = 0
+
+
+_default_converter = None
+
+def get_equation_converter():
+    global _default_converter
+    if _default_converter is None:
+        _default_converter = EquationConverter()
+    return _default_converter
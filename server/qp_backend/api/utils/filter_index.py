@@ -0,0 +1,152 @@
+import numpy as np
+
+from ..models import Question
+from .course_cache import CourseIndexCache
+
+# Filter keys of FilterQuestionsView -> whether their values are integers
+FACETS = {
+    'unit_numbers': True,
+    'cos': False,
+    'bts': False,
+    'marks': True,
+}
+
+# Listing fields the index can answer without reading the questions table
+INDEX_FIELDS = {'id', 'q_id', 'unit_id', 'unit_name', 'co', 'bt', 'marks'}
+
+
+class FilterIndexError(ValueError):
+    """Raised for filter values of the wrong type."""
+
+
+def filter_values(data):
+    """{facet: set of values} for the facets the request filters on."""
+    selected = {}
+    for facet, numeric in FACETS.items():
+        values = data.get(facet) or []
+        if not isinstance(values, list):
+            values = [values]
+        if not values:
+            continue
+        try:
+            selected[facet] = {int(v) if numeric else str(v) for v in values}
+        except (TypeError, ValueError):
+            raise FilterIndexError(f"{facet} must be a list of integers")
+    return selected
+
+
+def bitmap(positions, size):
+    """Python int with bit i set for each row position i."""
+    bits = np.zeros(size, dtype=bool)
+    bits[positions] = True
+    return int.from_bytes(np.packbits(bits, bitorder='little').tobytes(), 'little')
+
+
+class CourseFilterIndex:
+    """Bitmaps over one course's questions, one per unit, CO, BT and marks value.
+
+    Row i is the course's i-th question by q_id. A filter is an OR of the
+    bitmaps of the selected values within a facet and an AND across facets,
+    so any combination is a handful of big-integer operations.
+    """
+
+    def __init__(self, q_ids, columns, unit_names):
+        self.q_ids = np.asarray(q_ids, dtype=np.int64)
+        self.columns = columns
+        self.unit_names = unit_names
+        self.all = (1 << len(q_ids)) - 1
+        self.bitmaps = {}
+        for facet, values in columns.items():
+            positions = {}
+            for position, value in enumerate(values):
+                positions.setdefault(value, []).append(position)
+            self.bitmaps[facet] = {
+                value: bitmap(positions[value], len(q_ids)) for value in sorted(positions)
+            }
+
+    @classmethod
+    def for_course(cls, course_id):
+        rows = Question.objects.filter(course_id=course_id).order_by('q_id').values_list(
+            'q_id', 'unit_id__unit_id', 'unit_id__unit_name', 'co', 'bt', 'marks'
+        )
+        q_ids, units, cos, bts, marks, unit_names = [], [], [], [], [], {}
+        for q_id, unit, unit_name, co, bt, mark in rows.iterator(chunk_size=5000):
+            q_ids.append(q_id)
+            units.append(unit)
+            cos.append(co)
+            bts.append(bt)
+            marks.append(mark)
+            unit_names[unit] = unit_name
+        columns = {'unit_numbers': units, 'cos': cos, 'bts': bts, 'marks': marks}
+        return cls(q_ids, columns, unit_names)
+
+    def __len__(self):
+        return len(self.q_ids)
+
+    def facet_mask(self, facet, values):
+        mask = 0
+        bitmaps = self.bitmaps[facet]
+        for value in values:
+            mask |= bitmaps.get(value, 0)
+        return mask
+
+    def match(self, selected, skip=None):
+        """Bitmap of the rows matching every selected facet except `skip`."""
+        mask = self.all
+        for facet, values in selected.items():
+            if facet != skip:
+                mask &= self.facet_mask(facet, values)
+        return mask
+
+    def facet_counts(self, selected):
+        """Matches per value of each facet, given the selections on the other facets.
+
+        Counting against the other facets only keeps every value of a facet
+        selectable, and shows how many questions picking it would add.
+        """
+        counts = {}
+        for facet, bitmaps in self.bitmaps.items():
+            others = self.match(selected, skip=facet)
+            counts[facet] = [
+                {'value': value, 'count': (mask & others).bit_count()}
+                for value, mask in bitmaps.items()
+            ]
+            if facet == 'unit_numbers':
+                for entry in counts[facet]:
+                    entry['label'] = self.unit_names.get(entry['value'])
+        return counts
+
+    def positions(self, mask):
+        if not mask:
+            return np.empty(0, dtype=np.int64)
+        raw = np.frombuffer(mask.to_bytes((len(self) + 7) // 8, 'little'), dtype=np.uint8)
+        return np.flatnonzero(np.unpackbits(raw, bitorder='little')[:len(self)])
+
+    def q_ids_for(self, mask):
+        return self.q_ids[self.positions(mask)].tolist()
+
+    def rows(self, mask, fields):
+        """Listing rows straight from the index, for fields all in INDEX_FIELDS."""
+        columns = self.columns
+        rows = []
+        for position in self.positions(mask).tolist():
+            unit = columns['unit_numbers'][position]
+            values = {
+                'id': int(self.q_ids[position]),
+                'q_id': int(self.q_ids[position]),
+                'unit_id': unit,
+                'unit_name': self.unit_names.get(unit),
+                'co': columns['cos'][position],
+                'bt': columns['bts'][position],
+                'marks': columns['marks'][position],
+            }
+            rows.append({name: values[name] for name in fields})
+        return rows
+
+
+_indexes = CourseIndexCache('filter index', CourseFilterIndex.for_course)
+
+
+def get_filter_index(course_id):
+    """The course's filter index, rebuilt whenever Course.question_version has moved on."""
+    return _indexes.get(course_id)
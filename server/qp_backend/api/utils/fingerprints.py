@@ -0,0 +1,68 @@
+import re
+import json
+import zlib
+import hashlib
+import unicodedata
+
+import numpy as np
+
+_WHITESPACE = re.compile(r'\s+')
+_WORD = re.compile(r'\w+')
+
+
+def normalize_text(text):
+    """Canonical form of question text: NFKC, case-folded, whitespace collapsed."""
+    text = unicodedata.normalize('NFKC', text or '')
+    return _WHITESPACE.sub(' ', text).strip().casefold()
+
+
+def _digest(*parts):
+    return hashlib.sha256('\x1f'.join(parts).encode('utf-8')).hexdigest()
+
+
+def text_hash(text):
+    """Identity of a question within a course; survives mark/unit/CO/BT edits."""
+    return _digest(normalize_text(text))
+
+
+def media_hash(equations, image_paths):
+    """Identity of a question's equations and images as stored on QuestionMedia."""
+    payload = json.dumps([equations or [], image_paths or []], sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def question_fingerprint(text, marks, unit_number, co, bt, media=''):
+    """Hash of exactly what a row stores, media included; changes when any of it does.
+
+    Unlike text_hash nothing is normalized here, so a re-upload that only fixes
+    case, spacing, an equation or an image still counts as an update.
+    """
+    return _digest(text or '', str(int(marks)), str(unit_number), co or '', bt or '', media or media_hash([], []))
+
+
+# MinHash signatures are stored on Question.minhash, so the permutations
+# below are part of the schema: changing them requires recomputing every row
+MINHASH_PERMUTATIONS = 128
+SHINGLE_SIZE = 5
+_PRIME = np.uint64(4294967311)  # smallest prime above 2**32
+_MASK = np.uint64(0xFFFFFFFF)
+_permutations = np.random.RandomState(20240611).randint(1, 1 << 31, size=(2, MINHASH_PERMUTATIONS), dtype=np.int64)
+_A, _B = _permutations.astype(np.uint64)
+
+
+def shingles(text):
+    """Character 5-grams of the normalized words, so rewording shares most of them."""
+    words = ' '.join(_WORD.findall(normalize_text(text)))
+    if len(words) <= SHINGLE_SIZE:
+        return {words} if words else set()
+    return {words[i:i + SHINGLE_SIZE] for i in range(len(words) - SHINGLE_SIZE + 1)}
+
+
+def minhash_signature(text):
+    """128 x uint32 MinHash of the text's shingles as bytes; empty for empty text."""
+    grams = shingles(text)
+    if not grams:
+        return b''
+    hashes = np.fromiter((zlib.crc32(g.encode('utf-8')) for g in grams), dtype=np.uint64, count=len(grams))
+    values = (np.outer(hashes, _A) + _B) % _PRIME & _MASK
+    return values.min(axis=0).astype(np.uint32).tobytes()
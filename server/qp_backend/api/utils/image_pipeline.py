@@ -0,0 +1,126 @@
+import io
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+
+from django.conf import settings
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+from .media_store import get_media_store
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+
+# Pillow format name -> extension we store under
+RASTER_FORMATS = {'PNG': 'png', 'JPEG': 'jpg', 'GIF': 'gif', 'BMP': 'bmp', 'TIFF': 'tif', 'WEBP': 'webp'}
+
+
+def sniff_vector_format(blob):
+    """Recognise the Office vector formats Pillow cannot rasterise on Linux."""
+    if blob[:4] == b'\x01\x00\x00\x00' and blob[40:44] == b' EMF':
+        return 'emf'
+    if blob[:4] == b'\xd7\xcd\xc6\x9a' or blob[:6] in (b'\x01\x00\x09\x00\x00\x03', b'\x02\x00\x09\x00\x00\x03'):
+        return 'wmf'
+    return None
+
+
+class ImagePipeline:
+    """Normalizes images extracted from question banks before they are stored.
+
+    Rasters are decoded once, rotated per EXIF, downscaled to the size they
+    are printed at (QuestionPaperGenerator places every image in a 3x2 inch
+    box, i.e. 900x600 px at 300 dpi) and re-encoded: photos as JPEG, line art
+    and anything with transparency as PNG, the two formats Word embeds
+    natively. A small WebP thumbnail is made for list views. EMF/WMF are kept
+    as-is under their real extension. Results are memoized by the source
+    digest, so a diagram reused across many rows is processed once.
+    """
+
+    def __init__(self, store=None, print_size=None, thumbnail_size=None, memo_size=1024):
+        self.store = store or get_media_store()
+        self.print_size = tuple(print_size or getattr(settings, 'QUESTION_IMAGE_PRINT_SIZE', (900, 600)))
+        self.thumbnail_size = tuple(thumbnail_size or getattr(settings, 'QUESTION_THUMBNAIL_SIZE', (240, 160)))
+        self.memo_size = memo_size
+        self._memo = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _encode(image, fmt, **params):
+        buffer = io.BytesIO()
+        image.save(buffer, format=fmt, **params)
+        return buffer.getvalue()
+
+    @staticmethod
+    def _has_alpha(image):
+        return image.mode in ('RGBA', 'LA', 'PA') or (image.mode == 'P' and 'transparency' in image.info)
+
+    def _print_version(self, blob, image, source_format, source_size):
+        """Return (bytes, ext) of the image as it should be embedded in papers."""
+        oversized = source_size[0] > self.print_size[0] or source_size[1] > self.print_size[1]
+        rotated = image.getexif().get(0x0112, 1) != 1
+        if not oversized and not rotated and source_format in ('PNG', 'JPEG'):
+            # Already printable as-is; re-encoding would only cost quality
+            return blob, RASTER_FORMATS[source_format]
+
+        image = ImageOps.exif_transpose(image)
+        image.thumbnail(self.print_size, Image.LANCZOS)
+        if source_format == 'JPEG' and not self._has_alpha(image):
+            return self._encode(image.convert('RGB'), 'JPEG', quality=85, optimize=True), 'jpg'
+        if image.mode not in ('RGB', 'RGBA', 'L', 'LA', 'P'):
+            image = image.convert('RGBA' if self._has_alpha(image) else 'RGB')
+        return self._encode(image, 'PNG', optimize=True), 'png'
+
+    def _thumbnail(self, image):
+        image = ImageOps.exif_transpose(image)
+        image.thumbnail(self.thumbnail_size, Image.LANCZOS)
+        image = image.convert('RGBA' if self._has_alpha(image) else 'RGB')
+        return self._encode(image, 'WEBP', quality=75, method=4)
+
+    def _process(self, blob):
+        vector_ext = sniff_vector_format(blob)
+        if vector_ext:
+            return self.store.put(blob, vector_ext), None
+
+        try:
+            image = Image.open(io.BytesIO(blob))
+            source_format, source_size = image.format, image.size
+            # JPEG can decode straight at a fraction of full resolution
+            image.draft('RGB', self.print_size)
+            image.load()
+        except (UnidentifiedImageError, OSError, Image.DecompressionBombError) as e:
+            logging.warning(f"Storing unrecognised image unchanged: {e}")
+            return self.store.put(blob, 'bin'), None
+
+        printable, ext = self._print_version(blob, image, source_format, source_size)
+        path = self.store.put(printable, ext)
+        try:
+            thumbnail_path = self.store.put(self._thumbnail(image), 'webp')
+        except Exception as e:
+            logging.error(f"Error creating thumbnail: {e}")
+            thumbnail_path = None
+        return path, thumbnail_path
+
+    def process(self, blob):
+        """Store ``blob`` in normalized form; returns (image_path, thumbnail_path or None)."""
+        key = hashlib.sha256(blob).hexdigest()
+        with self._lock:
+            if key in self._memo:
+                self._memo.move_to_end(key)
+                return self._memo[key]
+
+        result = self._process(blob)
+        with self._lock:
+            self._memo[key] = result
+            if len(self._memo) > self.memo_size:
+                self._memo.popitem(last=False)
+        return result
+
+
+_default_pipeline = None
+
+def get_image_pipeline():
+    global _default_pipeline
+    if _default_pipeline is None or _default_pipeline.store is not get_media_store():
+        _default_pipeline = ImagePipeline()
+    return _default_pipeline
@@ -0,0 +1,199 @@
+import os
+import logging
+import threading
+import tempfile
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction, close_old_connections, connection
+from django.db.models import Q
+from django.utils import timezone
+
+from ..models import IngestionJob
+from ..parser import ingest_questions
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+
+JOB_SPOOL_DIR = os.path.join("temp", "jobs")
+
+
+def spool_upload(uploaded_file, suffix='.docx'):
+    """Copy an uploaded file to a unique path the job worker can read later."""
+    os.makedirs(JOB_SPOOL_DIR, exist_ok=True)
+    fd, path = tempfile.mkstemp(dir=JOB_SPOOL_DIR, suffix=suffix)
+    with os.fdopen(fd, "wb") as f:
+        for chunk in uploaded_file.chunks():
+            f.write(chunk)
+    return path
+
+
+def enqueue_job(course, faculty, file_path, original_name):
+    job = IngestionJob.objects.create(
+        course_id=course,
+        faculty=faculty,
+        file_path=file_path,
+        original_name=original_name,
+    )
+    # Only wake the workers once the job row is visible to their connections
+    transaction.on_commit(IngestionWorkerPool.notify)
+    IngestionWorkerPool.ensure_started()
+    return job
+
+
+def serialize_job(job):
+    return {
+        'job_id': job.pk,
+        'course_id': job.course_id_id,
+        'file_name': job.original_name,
+        'status': job.status,
+        'rows_total': job.rows_total,
+        'rows_processed': job.rows_processed,
+        'rows_failed': job.rows_failed,
+        'rows_collapsed': job.rows_collapsed,
+        'elapsed_seconds': job.get_elapsed_seconds(),
+        'error': job.error or None,
+        'created_at': job.created_at,
+        'finished_at': job.finished_at,
+    }
+
+
+class IngestionWorkerPool:
+    """In-process worker threads that drain the IngestionJob table.
+
+    The database is the queue: a worker claims the oldest queued job with
+    SELECT ... FOR UPDATE SKIP LOCKED, so several processes (gunicorn workers
+    or the process_ingestion_jobs command) can share it without a broker.
+    While a job runs its worker renews the job's heartbeat; a running job
+    whose heartbeat is older than INGESTION_JOB_LEASE belonged to a process
+    that died, and any worker puts it back in the queue.
+    """
+    _lock = threading.Lock()
+    _wakeup = threading.Event()
+    _threads = []
+
+    @classmethod
+    def ensure_started(cls, size=None):
+        size = size or getattr(settings, 'INGESTION_WORKERS', 2)
+        with cls._lock:
+            cls._threads = [t for t in cls._threads if t.is_alive()]
+            if cls._threads:
+                return
+            cls.requeue_stale_jobs()
+            for i in range(size):
+                thread = threading.Thread(
+                    target=cls.worker_loop, name=f"ingestion-worker-{i}", daemon=True
+                )
+                thread.start()
+                cls._threads.append(thread)
+
+    @classmethod
+    def notify(cls):
+        cls._wakeup.set()
+
+    @staticmethod
+    def requeue_stale_jobs():
+        lease = getattr(settings, 'INGESTION_JOB_LEASE', 120)
+        cutoff = timezone.now() - timedelta(seconds=lease)
+        requeued = IngestionJob.objects.filter(
+            Q(heartbeat_at__lt=cutoff) | Q(heartbeat_at__isnull=True, started_at__lt=cutoff),
+            status='running',
+        ).update(status='queued', started_at=None, heartbeat_at=None)
+        if requeued:
+            logging.warning(f"Requeued {requeued} stale ingestion jobs")
+
+    @staticmethod
+    def claim_next_job():
+        with transaction.atomic():
+            job = (
+                IngestionJob.objects.select_for_update(skip_locked=True)
+                .filter(status='queued')
+                .order_by('created_at')
+                .first()
+            )
+            if job is None:
+                return None
+            job.status = 'running'
+            job.started_at = job.heartbeat_at = timezone.now()
+            job.save(update_fields=['status', 'started_at', 'heartbeat_at'])
+        return job
+
+    @staticmethod
+    def heartbeat(job, stop):
+        """Renew ``job``'s lease every INGESTION_HEARTBEAT_INTERVAL seconds until ``stop`` is set."""
+        interval = getattr(settings, 'INGESTION_HEARTBEAT_INTERVAL', 30)
+        try:
+            while not stop.wait(interval):
+                IngestionJob.objects.filter(pk=job.pk, status='running').update(heartbeat_at=timezone.now())
+        except Exception as e:
+            logging.error(f"Heartbeat for ingestion job {job.pk} failed: {e}")
+        finally:
+            connection.close()
+
+    @staticmethod
+    def run_job(job):
+        def report(stats):
+            IngestionJob.objects.filter(pk=job.pk).update(
+                rows_total=stats.rows_total,
+                rows_processed=stats.rows_total,
+                rows_failed=stats.rows_failed,
+                heartbeat_at=timezone.now(),
+            )
+
+        # Parsing reports progress, but writing a large bank can outlast the lease on its own
+        stop = threading.Event()
+        beat = threading.Thread(
+            target=IngestionWorkerPool.heartbeat, args=(job, stop), name=f"ingestion-heartbeat-{job.pk}", daemon=True
+        )
+        beat.start()
+        try:
+            questions, stats = ingest_questions(job.file_path, job.course_id_id, progress=report)
+            job.rows_total = stats.rows_total
+            job.rows_processed = stats.rows_total
+            job.rows_failed = stats.rows_failed
+            job.rows_collapsed = stats.rows_collapsed
+            if questions or stats.rows_skipped:
+                job.status = 'succeeded'
+            else:
+                job.status = 'failed'
+                job.error = "No questions found in the document"
+        except Exception as e:
+            logging.error(f"Ingestion job {job.pk} failed: {e}")
+            job.status = 'failed'
+            job.error = str(e)
+        finally:
+            stop.set()
+            beat.join()
+            job.finished_at = timezone.now()
+            job.save(update_fields=[
+                'status', 'rows_total', 'rows_processed', 'rows_failed', 'rows_collapsed',
+                'error', 'finished_at',
+            ])
+            if os.path.exists(job.file_path):
+                os.remove(job.file_path)
+        return job
+
+    @classmethod
+    def run_pending(cls):
+        """Process queued jobs until none are left; returns how many ran."""
+        count = 0
+        while True:
+            job = cls.claim_next_job()
+            if job is None:
+                return count
+            cls.run_job(job)
+            count += 1
+
+    @classmethod
+    def worker_loop(cls):
+        poll_interval = getattr(settings, 'INGESTION_POLL_INTERVAL', 5)
+        while True:
+            close_old_connections()
+            try:
+                # Jobs of a worker process that died go back to the queue once their lease lapses
+                cls.requeue_stale_jobs()
+                cls.run_pending()
+            except Exception as e:
+                logging.error(f"Ingestion worker error: {e}")
+            cls._wakeup.wait(poll_interval)
+            cls._wakeup.clear()
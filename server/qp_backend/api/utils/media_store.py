@@ -0,0 +1,111 @@
+import os
+import re
+import time
+import hashlib
+import tempfile
+import threading
+
+from django.conf import settings
+from django.core import signing
+from django.urls import reverse
+from django.utils.crypto import constant_time_compare
+
+DIGEST_RE = re.compile(r'^[0-9a-f]{64}$')
+
+
+class MediaStore:
+    """Content-addressed store for question images.
+
+    Blobs are keyed by their SHA-256 and sharded as ``<root>/ab/cd/<digest>.<ext>``,
+    so an image embedded in many questions is written to disk once and every
+    QuestionMedia row simply references the same path.
+    """
+
+    def __init__(self, root=None):
+        self.root = root or getattr(settings, 'QUESTION_MEDIA_ROOT', os.path.join('images', 'sha256'))
+        self._known = set()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def digest(blob):
+        return hashlib.sha256(blob).hexdigest()
+
+    def path_for(self, digest, ext='png'):
+        return os.path.join(self.root, digest[:2], digest[2:4], f"{digest}.{ext}")
+
+    def put(self, blob, ext='png'):
+        """Store ``blob`` unless it is already present and return its path."""
+        path = self.path_for(self.digest(blob), ext)
+        if path in self._known or os.path.exists(path):
+            self._known.add(path)
+            return path
+
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+        # Write to a temp file first so readers never see a partial image
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(blob)
+            os.replace(tmp_path, path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        with self._lock:
+            self._known.add(path)
+        return path
+
+    def locate(self, digest):
+        """Return the stored path for ``digest`` whatever its extension, or None."""
+        if not DIGEST_RE.match(digest):
+            return None
+        directory = os.path.dirname(self.path_for(digest))
+        if not os.path.isdir(directory):
+            return None
+        for name in os.listdir(directory):
+            if name.split('.', 1)[0] == digest and not name.endswith('.tmp'):
+                return os.path.join(directory, name)
+        return None
+
+
+_default_store = None
+
+def get_media_store():
+    global _default_store
+    if _default_store is None:
+        _default_store = MediaStore()
+    return _default_store
+
+
+def image_signature(digest, expires):
+    return signing.Signer(salt='question-image').signature(f"{digest}:{expires}")
+
+
+def image_url(path, request=None):
+    """Signed, expiring URL of the image-serving endpoint for a content-addressed path.
+
+    <img> tags cannot send the API's Authorization header, so the URL carries
+    its own credential: a signature over the digest and an expiry time. The
+    expiry is rounded up to a multiple of QUESTION_IMAGE_URL_TTL, so an image
+    keeps the same URL for a while and browsers reuse their cached copy.
+    With a request the URL is absolute, for clients served from another origin.
+
+    Paths written before the store existed (images/question_<id>_<n>.png)
+    have no digest and return None.
+    """
+    digest = os.path.basename(path).split('.', 1)[0]
+    if not DIGEST_RE.match(digest):
+        return None
+    ttl = getattr(settings, 'QUESTION_IMAGE_URL_TTL', 3600)
+    expires = (int(time.time()) // ttl + 2) * ttl
+    url = f"{reverse('question-image', args=[digest])}?expires={expires}&signature={image_signature(digest, expires)}"
+    return request.build_absolute_uri(url) if request is not None else url
+
+
+def valid_image_signature(digest, expires, signature):
+    try:
+        expires = int(expires)
+    except (TypeError, ValueError):
+        return False
+    return expires >= time.time() and constant_time_compare(signature or '', image_signature(digest, expires))
@@ -0,0 +1,200 @@
+import numpy as np
+from django.conf import settings
+
+from ..models import Question
+from .course_cache import CourseIndexCache
+from .fingerprints import MINHASH_PERMUTATIONS, minhash_signature
+
+# 32 bands of 4 rows: a pair at Jaccard 0.5 shares a band ~87% of the time, at 0.6 ~99%
+LSH_BANDS = 32
+LSH_ROWS = MINHASH_PERMUTATIONS // LSH_BANDS
+MAX_CHECK_TEXTS = 100
+_BAND_MULTIPLIERS = np.array([0x9E3779B97F4A7C15, 0xC2B2AE3D27D4EB4F, 0x165667B19E3779F9, 0x27D4EB2F165667C5],
+                             dtype=np.uint64)[:LSH_ROWS]
+
+
+class NearDuplicateError(Exception):
+    """Raised for an invalid similarity request."""
+
+
+def similarity_threshold(value=None):
+    if value in (None, ''):
+        return getattr(settings, 'NEAR_DUPLICATE_THRESHOLD', 0.5)
+    try:
+        threshold = float(value)
+    except (TypeError, ValueError):
+        raise NearDuplicateError("threshold must be a number between 0 and 1")
+    if not 0 < threshold <= 1:
+        raise NearDuplicateError("threshold must be a number between 0 and 1")
+    return threshold
+
+
+def band_hashes(signatures):
+    """One uint64 per (band, signature): shape (LSH_BANDS, n)."""
+    bands = signatures.reshape(len(signatures), LSH_BANDS, LSH_ROWS).astype(np.uint64)
+    return (bands * _BAND_MULTIPLIERS).sum(axis=2, dtype=np.uint64).T
+
+
+class LSHIndex:
+    """Banded MinHash index over one course's questions.
+
+    Each band keeps its hashes sorted, so a lookup is a binary search per band
+    and the duplicate report only compares questions that share a bucket.
+    """
+
+    def __init__(self, ids, signatures):
+        self.ids = np.asarray(ids, dtype=np.int64)
+        self.signatures = signatures
+        hashes = band_hashes(signatures)
+        self.order = np.argsort(hashes, axis=1, kind='stable')
+        self.keys = np.take_along_axis(hashes, self.order, axis=1)
+
+    @classmethod
+    def for_course(cls, course_id):
+        ids, blobs = [], []
+        rows = Question.objects.filter(course_id=course_id).values_list('q_id', 'minhash')
+        for q_id, minhash in rows.iterator(chunk_size=5000):
+            if minhash and len(minhash) == MINHASH_PERMUTATIONS * 4:
+                ids.append(q_id)
+                blobs.append(bytes(minhash))
+        signatures = np.frombuffer(b''.join(blobs), dtype=np.uint32).reshape(len(ids), MINHASH_PERMUTATIONS)
+        return cls(ids, signatures)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def query(self, minhash, threshold, exclude=()):
+        """[(q_id, similarity)] of indexed questions at or above the threshold, best first."""
+        if not minhash or not len(self):
+            return []
+        signature = np.frombuffer(minhash, dtype=np.uint32)
+        hashes = band_hashes(signature[None, :])[:, 0]
+        candidates = set()
+        for band, key in enumerate(hashes):
+            start = np.searchsorted(self.keys[band], key, side='left')
+            stop = np.searchsorted(self.keys[band], key, side='right')
+            candidates.update(self.order[band, start:stop].tolist())
+        if not candidates:
+            return []
+        rows = np.fromiter(candidates, dtype=np.int64, count=len(candidates))
+        similarity = (self.signatures[rows] == signature).mean(axis=1)
+        matches = [
+            (int(self.ids[row]), float(score))
+            for row, score in zip(rows, similarity)
+            if score >= threshold and int(self.ids[row]) not in exclude
+        ]
+        return sorted(matches, key=lambda m: (-m[1], m[0]))
+
+    def candidate_pairs(self):
+        """Row pairs sharing a bucket, each bucket member paired with the bucket's first row."""
+        pairs = []
+        positions = np.arange(self.keys.shape[1])
+        for band in range(LSH_BANDS):
+            keys = self.keys[band]
+            starts = np.ones(len(keys), dtype=bool)
+            starts[1:] = keys[1:] != keys[:-1]
+            leaders = np.maximum.accumulate(np.where(starts, positions, 0))
+            members = ~starts
+            pairs.append(np.stack([self.order[band, leaders[members]], self.order[band, members]], axis=1))
+        pairs = np.concatenate(pairs)
+        return np.unique(np.sort(pairs, axis=1), axis=0)
+
+    def clusters(self, threshold, chunk_size=50000):
+        """Groups of indexed rows connected by pairs at or above the threshold."""
+        parent = list(range(len(self)))
+
+        def find(row):
+            while parent[row] != row:
+                parent[row] = parent[parent[row]]
+                row = parent[row]
+            return row
+
+        pairs = self.candidate_pairs()
+        for start in range(0, len(pairs), chunk_size):
+            chunk = pairs[start:start + chunk_size]
+            similarity = (self.signatures[chunk[:, 0]] == self.signatures[chunk[:, 1]]).mean(axis=1)
+            for a, b in chunk[similarity >= threshold].tolist():
+                root_a, root_b = find(a), find(b)
+                if root_a != root_b:
+                    parent[max(root_a, root_b)] = min(root_a, root_b)
+
+        groups = {}
+        for row in range(len(self)):
+            groups.setdefault(find(row), []).append(row)
+        return [rows for rows in groups.values() if len(rows) > 1]
+
+
+_indexes = CourseIndexCache('LSH index', LSHIndex.for_course)
+
+
+def get_lsh_index(course_id):
+    """The course's LSH index, rebuilt whenever Course.question_version has moved on."""
+    return _indexes.get(course_id)
+
+
+def similar_questions(course_id, texts, threshold=None, limit=10):
+    """Existing questions of the course that each text nearly duplicates."""
+    if isinstance(texts, str):
+        texts = [texts]
+    if not isinstance(texts, list) or not texts or not all(isinstance(t, str) for t in texts):
+        raise NearDuplicateError("Provide 'text' or a non-empty list of 'texts'")
+    if len(texts) > MAX_CHECK_TEXTS:
+        raise NearDuplicateError(f"At most {MAX_CHECK_TEXTS} texts can be checked at once")
+    threshold = similarity_threshold(threshold)
+    index = get_lsh_index(course_id)
+
+    matches = [index.query(minhash_signature(text), threshold)[:limit] for text in texts]
+    found = {q_id for result in matches for q_id, _ in result}
+    stored = dict(Question.objects.filter(q_id__in=found).values_list('q_id', 'text'))
+    return {
+        'threshold': threshold,
+        'results': [
+            {
+                'text': text,
+                'matches': [
+                    {'id': q_id, 'text': stored[q_id], 'similarity': round(score, 3)}
+                    for q_id, score in result if q_id in stored
+                ],
+            }
+            for text, result in zip(texts, matches)
+        ],
+    }
+
+
+def duplicate_clusters(course_id, threshold=None):
+    """Clusters of near-duplicate questions in the course, largest first."""
+    threshold = similarity_threshold(threshold)
+    index = get_lsh_index(course_id)
+    groups = index.clusters(threshold)
+
+    members = [int(index.ids[row]) for rows in groups for row in rows]
+    stored = {
+        q['q_id']: q for q in Question.objects.filter(q_id__in=members).values(
+            'q_id', 'text', 'marks', 'co', 'bt', 'unit_id__unit_id'
+        )
+    }
+    clusters = []
+    for rows in groups:
+        similarity = (index.signatures[rows] == index.signatures[rows[0]]).mean(axis=1)
+        questions = []
+        for row, score in zip(rows, similarity):
+            question = stored.get(int(index.ids[row]))
+            if question:
+                questions.append({
+                    'id': question['q_id'],
+                    'text': question['text'],
+                    'marks': question['marks'],
+                    'co': question['co'],
+                    'bt': question['bt'],
+                    'unit_id': question['unit_id__unit_id'],
+                    'similarity': round(float(score), 3),
+                })
+        if len(questions) > 1:
+            clusters.append({'size': len(questions), 'questions': questions})
+    clusters.sort(key=lambda c: (-c['size'], c['questions'][0]['id']))
+    return {
+        'threshold': threshold,
+        'questions_indexed': len(index),
+        'duplicate_questions': sum(c['size'] - 1 for c in clusters),
+        'clusters': clusters,
+    }
@@ -0,0 +1,188 @@
+import zipfile
+import posixpath
+
+from lxml import etree
+
+W_NS = 'http://schemas.openxmlformats.org/wordprocessingml/2006/main'
+NS = {
+    'w': W_NS,
+    'm': 'http://schemas.openxmlformats.org/officeDocument/2006/math',
+    'a': 'http://schemas.openxmlformats.org/drawingml/2006/main',
+    'r': 'http://schemas.openxmlformats.org/officeDocument/2006/relationships',
+    'pr': 'http://schemas.openxmlformats.org/package/2006/relationships',
+}
+TBL = f'{{{W_NS}}}tbl'
+TR = f'{{{W_NS}}}tr'
+P = f'{{{W_NS}}}p'
+BR = f'{{{W_NS}}}br'
+T = f'{{{W_NS}}}t'
+W_TYPE = f'{{{W_NS}}}type'
+
+OFFICE_DOCUMENT_REL = 'http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument'
+
+# Precompiled once; evaluated for every row of every upload
+_row_cells = etree.XPath('w:tc', namespaces=NS)
+_row_is_unusual = etree.XPath(
+    'boolean(w:tc/w:tcPr/w:gridSpan[@w:val != "1"] | w:tc/w:tcPr/w:vMerge'
+    ' | w:sdt | w:customXml | w:trPr/w:gridBefore | w:trPr/w:gridAfter)',
+    namespaces=NS,
+)
+_cell_paragraphs = etree.XPath('w:p', namespaces=NS)
+_paragraph_runs = etree.XPath('w:r | w:hyperlink/w:r', namespaces=NS)
+_run_content = etree.XPath(
+    'w:br | w:cr | w:noBreakHyphen | w:ptab | w:t | w:tab', namespaces=NS
+)
+_cell_image_rids = etree.XPath('.//w:drawing', namespaces=NS)
+_drawing_blip_rid = etree.XPath('(.//a:blip/@r:embed)[1]', namespaces=NS)
+_relationships = etree.XPath('/pr:Relationships/pr:Relationship', namespaces=NS)
+
+_RUN_TEXT = {
+    f'{{{W_NS}}}cr': '\n',
+    f'{{{W_NS}}}noBreakHyphen': '-',
+    f'{{{W_NS}}}ptab': '\t',
+    f'{{{W_NS}}}tab': '\t',
+}
+
+
+class UnsupportedLayout(Exception):
+    """Raised when a document needs python-docx's full table model."""
+
+
+def cell_text(tc):
+    """Text of a ``w:tc`` exactly as python-docx's ``_Cell.text`` reports it."""
+    paragraphs = []
+    for p in _cell_paragraphs(tc):
+        parts = []
+        for run in _paragraph_runs(p):
+            for item in _run_content(run):
+                if item.tag == T:
+                    parts.append(item.text or '')
+                elif item.tag == BR:
+                    parts.append('\n' if item.get(W_TYPE, 'textWrapping') == 'textWrapping' else '')
+                else:
+                    parts.append(_RUN_TEXT[item.tag])
+        paragraphs.append(''.join(parts))
+    return '\n'.join(paragraphs)
+
+
+def cell_image_rids(tc):
+    rids = []
+    for drawing in _cell_image_rids(tc):
+        rid = _drawing_blip_rid(drawing)
+        if rid:
+            rids.append(str(rid[0]))
+    return rids
+
+
+def _release(elem):
+    """Drop an already-processed element and its earlier siblings to bound memory."""
+    elem.clear(keep_tail=True)
+    parent = elem.getparent()
+    if parent is not None:
+        while elem.getprevious() is not None:
+            del parent[0]
+
+
+class OOXMLRowScanner:
+    """Streams question rows straight out of ``word/document.xml``.
+
+    Rows are read with lxml iterparse and released as soon as they have been
+    turned into plain records, so memory stays flat however long the bank is.
+    Merged cells, content controls and nested tables raise UnsupportedLayout
+    so the caller can fall back to python-docx.
+    """
+
+    def __init__(self, file_path, equation_extractor=None):
+        self.archive = zipfile.ZipFile(file_path)
+        self.equation_extractor = equation_extractor
+        self.document_path = self._find_document_part()
+        self._image_targets = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.archive.close()
+
+    @staticmethod
+    def _rels_path(part_path):
+        directory, name = posixpath.split(part_path)
+        return posixpath.join(directory, '_rels', f'{name}.rels')
+
+    @staticmethod
+    def _resolve(base_dir, target):
+        if target.startswith('/'):
+            return target.lstrip('/')
+        return posixpath.normpath(posixpath.join(base_dir, target))
+
+    def _read_relationships(self, part_path):
+        try:
+            xml = self.archive.read(self._rels_path(part_path))
+        except KeyError:
+            return []
+        return _relationships(etree.fromstring(xml))
+
+    def _find_document_part(self):
+        for rel in self._read_relationships(''):
+            if rel.get('Type') == OFFICE_DOCUMENT_REL:
+                return self._resolve('', rel.get('Target'))
+        raise UnsupportedLayout("No main document part in package")
+
+    @property
+    def image_targets(self):
+        if self._image_targets is None:
+            base_dir = posixpath.dirname(self.document_path)
+            self._image_targets = {
+                rel.get('Id'): self._resolve(base_dir, rel.get('Target'))
+                for rel in self._read_relationships(self.document_path)
+                if rel.get('TargetMode') != 'External'
+            }
+        return self._image_targets
+
+    def read_image(self, rid):
+        target = self.image_targets.get(rid)
+        if target is None:
+            raise KeyError(f"Unknown image relationship {rid}")
+        return self.archive.read(target)
+
+    def _read_row(self, tr, index):
+        if _row_is_unusual(tr):
+            raise UnsupportedLayout(f"Merged or wrapped cells in row {index}")
+        cells = _row_cells(tr)
+        equations = []
+        if len(cells) > 1 and self.equation_extractor:
+            equations = self.equation_extractor(cells[1])
+        return {
+            'index': index,
+            'texts': [cell_text(tc) for tc in cells],
+            'equations': equations,
+            'image_rids': cell_image_rids(cells[2]) if len(cells) > 2 else [],
+        }
+
+    def iter_rows(self):
+        """Yield one record per table row, skipping each table's header row."""
+        depth = 0
+        row_index = 0
+        with self.archive.open(self.document_path) as source:
+            for event, elem in etree.iterparse(
+                source, events=('start', 'end'), tag=(TBL, TR, P), huge_tree=True
+            ):
+                if elem.tag == TBL:
+                    if event == 'start':
+                        depth += 1
+                        row_index = 0
+                        if depth > 1:
+                            raise UnsupportedLayout("Nested tables")
+                    else:
+                        depth -= 1
+                        _release(elem)
+                elif event == 'end' and elem.tag == TR and depth == 1:
+                    if row_index:
+                        yield self._read_row(elem, row_index)
+                    row_index += 1
+                    _release(elem)
+                elif event == 'end' and elem.tag == P and depth == 0:
+                    _release(elem)
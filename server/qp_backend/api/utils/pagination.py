@@ -0,0 +1,91 @@
+import json
+import base64
+
+from django.conf import settings
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """Forward-only cursor pagination for questions, keyed on (course_id, q_id).
+
+    The cursor is the key of the last row sent, so every page is an index
+    range scan on question_course_qid_idx starting right after it: no OFFSET
+    and no COUNT(*), however deep the client pages or however big the table.
+    """
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+    invalid_cursor_message = 'Invalid cursor'
+
+    def get_page_size(self, request):
+        default = getattr(settings, 'QUESTION_PAGE_SIZE', 50)
+        maximum = getattr(settings, 'QUESTION_PAGE_SIZE_MAX', 500)
+        try:
+            size = int(request.query_params.get(self.page_size_query_param, default))
+        except (TypeError, ValueError):
+            return default
+        return max(1, min(size, maximum))
+
+    @staticmethod
+    def encode_cursor(key):
+        return base64.urlsafe_b64encode(json.dumps(key).encode('utf-8')).decode('ascii')
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            course_id, q_id = json.loads(base64.urlsafe_b64decode(encoded.encode('ascii')))
+            return str(course_id), int(q_id)
+        except (TypeError, ValueError, UnicodeError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        queryset = queryset.order_by('course_id', 'q_id')
+        limit = self.page_size + 1
+
+        after = self.decode_cursor(request)
+        if after is None:
+            rows = list(queryset[:limit])
+        else:
+            # Rest of the cursor's course, then the following courses: two range scans
+            # instead of an OR that the planner cannot turn into a single index range
+            course_id, q_id = after
+            rows = list(queryset.filter(course_id=course_id, q_id__gt=q_id)[:limit])
+            if len(rows) < limit:
+                rows += list(queryset.filter(course_id__gt=course_id)[:limit - len(rows)])
+
+        self.has_next = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+        self.next_key = self.row_key(rows[-1]) if rows and self.has_next else None
+        return rows
+
+    @staticmethod
+    def row_key(row):
+        # Model instances, or dicts from a .values() projection
+        if isinstance(row, dict):
+            return [row['course_id_id'], row['q_id']]
+        return [row.course_id_id, row.q_id]
+
+    def get_next_cursor(self):
+        return self.encode_cursor(self.next_key) if self.next_key else None
+
+    def get_next_link(self):
+        cursor = self.get_next_cursor()
+        if cursor is None:
+            return None
+        return replace_query_param(self.request.build_absolute_uri(), self.cursor_query_param, cursor)
+
+    def page_info(self):
+        return {
+            'next': self.get_next_link(),
+            'next_cursor': self.get_next_cursor(),
+            'page_size': self.page_size,
+        }
+
+    def get_paginated_response(self, data):
+        return Response({**self.page_info(), 'results': data})
@@ -0,0 +1,152 @@
+import io
+import os
+import re
+import json
+import time
+import shutil
+import logging
+import zipfile
+import tempfile
+from concurrent.futures import as_completed
+
+from django.conf import settings
+
+from .paper_cache import get_paper_cache, paper_cache_key
+from .paper_generator import QuestionPaperGenerator
+from .paper_templates import get_paper_template, get_template_for_heading
+from .process_pool import process_pool
+from .render_context import PaperRenderContext
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+
+
+class PaperBatchError(Exception):
+    pass
+
+
+def render_paper(label, heading, header, context):
+    """Render one set to DOCX bytes; runs in a worker process.
+
+    Everything passed in is plain data. Each worker compiles the template once
+    and reuses it for every set it renders, so only the question rows are built per set.
+    """
+    started = time.perf_counter()
+    doc = QuestionPaperGenerator.fill(get_template_for_heading(heading), header, context)
+    buffer = io.BytesIO()
+    doc.save(buffer)
+    return label, buffer.getvalue(), time.perf_counter() - started
+
+
+def set_labels(count):
+    """A, B, ..., Z, then AA, AB, ..."""
+    labels = []
+    for i in range(count):
+        label = ''
+        i += 1
+        while i:
+            i, r = divmod(i - 1, 26)
+            label = chr(ord('A') + r) + label
+        labels.append(label)
+    return labels
+
+
+class PaperBatch:
+    """Several equivalent papers (sets A, B, C, ...) sharing one metadata block.
+
+    The header fields, department template and every selected question are
+    resolved once for the whole batch. Sets already in the paper cache are
+    reused; the rest are rendered across a process pool and cached, and all
+    of them are packed into one ZIP with a timing manifest.
+    """
+
+    def __init__(self, metadata, selections, labels=None):
+        max_sets = getattr(settings, 'PAPER_BATCH_MAX_SETS', 26)
+        if not selections:
+            raise PaperBatchError("At least one paper set is required")
+        if len(selections) > max_sets:
+            raise PaperBatchError(f"A batch may contain at most {max_sets} paper sets")
+        # Unlabelled sets are named by position: A, B, C, ...
+        labels = [
+            str(label) if label else default
+            for label, default in zip(labels or [None] * len(selections), set_labels(len(selections)))
+        ]
+        if not all(re.fullmatch(r'[\w-]{1,20}', label) for label in labels):
+            raise PaperBatchError("Paper set labels may only contain letters, digits, '-' and '_'")
+        if len(set(labels)) != len(labels):
+            raise PaperBatchError("Paper set labels must be unique")
+
+        self.metadata = metadata
+        self.labels = labels
+        self.contexts = PaperRenderContext.load_many(selections)
+        self.template = get_paper_template(QuestionPaperGenerator.department_for(metadata))
+        self.header = QuestionPaperGenerator.header_values(metadata)
+
+    def _render_missing(self, pending, workers):
+        """Yield (label, docx bytes, seconds) for every pending (label, context)."""
+        if workers == 1:
+            for label, context in pending:
+                yield render_paper(label, self.template.heading, self.header, context)
+            return
+
+        with process_pool(workers) as pool:
+            futures = [
+                pool.submit(render_paper, label, self.template.heading, self.header, context)
+                for label, context in pending
+            ]
+            for future in as_completed(futures):
+                yield future.result()
+
+    def build(self, workers=None):
+        """Render every set and return (rewound ZIP file, manifest dict)."""
+        started = time.perf_counter()
+        cache = get_paper_cache()
+        papers = {}
+        pending = []
+        for label, context in zip(self.labels, self.contexts):
+            key = paper_cache_key(self.metadata, context, self.template.heading)
+            cached = cache.open(key)
+            if cached is not None:
+                papers[label] = {'file': cached, 'cache': 'hit', 'render_seconds': 0.0}
+            else:
+                papers[label] = {'key': key, 'cache': 'miss'}
+                pending.append((label, context))
+
+        workers = workers or getattr(settings, 'PAPER_BATCH_PROCESSES', None) or os.cpu_count() or 1
+        workers = max(1, min(workers, len(pending)))
+        for label, data, seconds in self._render_missing(pending, workers):
+            papers[label]['file'] = cache.put(papers[label].pop('key'), lambda f: f.write(data))
+            papers[label]['render_seconds'] = round(seconds, 3)
+
+        archive = tempfile.SpooledTemporaryFile(
+            max_size=getattr(settings, 'PAPER_SPOOL_MAX_MEMORY', 16 * 1024 * 1024)
+        )
+        manifest = {
+            'course_code': self.metadata.course_code,
+            'workers': workers if pending else 0,
+            'papers': [],
+        }
+        # DOCX files are already deflated; storing them avoids compressing twice
+        with zipfile.ZipFile(archive, 'w', zipfile.ZIP_STORED) as zf:
+            for label, context in zip(self.labels, self.contexts):
+                paper = papers[label]
+                file_name = f"question_paper_{label}.docx"
+                with paper['file'] as src, zf.open(file_name, 'w') as dst:
+                    shutil.copyfileobj(src, dst)
+                manifest['papers'].append({
+                    'set': label,
+                    'file': file_name,
+                    'questions': sum(len(q_ids) for q_ids in context.parts.values()),
+                    'total_marks': context.total_marks,
+                    'cache': paper['cache'],
+                    'render_seconds': paper['render_seconds'],
+                })
+            manifest['elapsed_seconds'] = round(time.perf_counter() - started, 3)
+            zf.writestr('manifest.json', json.dumps(manifest, indent=2))
+
+        logging.info(
+            f"Built {len(self.labels)} paper sets ({len(pending)} rendered with {manifest['workers']} workers) "
+            f"in {manifest['elapsed_seconds']:.2f}s"
+        )
+        archive.seek(0)
+        return archive, manifest
@@ -0,0 +1,149 @@
+import os
+import json
+import hashlib
+import logging
+import tempfile
+import threading
+
+from django.conf import settings
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+
+# Bump when the rendered output changes for the same inputs (layout, fonts, ...)
+CACHE_FORMAT_VERSION = 2
+
+
+def _media_version(record):
+    media = json.dumps([record.equations, record.image_paths], sort_keys=True, default=str)
+    return hashlib.sha256(media.encode('utf-8')).hexdigest()
+
+
+def paper_cache_key(metadata, context, heading, fmt='docx'):
+    """Hash of everything that determines a rendered paper.
+
+    Covers the header fields, the template heading, the ordered selection and
+    the exact values each selected question is rendered from (text, marks,
+    CO, BT, unit, plus a hash of its media), so any edit to a question or its
+    images invalidates every paper that uses it while unrelated edits do not.
+    """
+    payload = {
+        'version': CACHE_FORMAT_VERSION,
+        'format': fmt,
+        'heading': heading,
+        'metadata': {
+            'course_code': metadata.course_code,
+            'course_title': metadata.course_title,
+            'date': metadata.date.strftime('%Y-%m-%d'),
+            'max_marks': str(metadata.max_marks),
+            'duration': metadata.duration,
+            'semester': metadata.semester,
+            'faculty': metadata.faculty.name,
+            'is_improvement_cie': bool(metadata.is_improvement_cie),
+        },
+        'parts': context.parts,
+        'questions': {
+            str(q_id): [
+                record.text, record.marks, record.co, record.bt, record.unit_number, record.unit_name,
+                _media_version(record),
+            ]
+            for q_id, record in sorted(context.questions.items())
+        },
+    }
+    encoded = json.dumps(payload, sort_keys=True, default=str).encode('utf-8')
+    return hashlib.sha256(encoded).hexdigest()
+
+
+class PaperCache:
+    """Disk cache of rendered papers keyed by paper_cache_key.
+
+    Entries are plain files named by their key. Reads refresh the file's
+    mtime, and every write evicts the least recently used entries until the
+    cache fits in ``max_bytes``.
+    """
+
+    def __init__(self, root=None, max_bytes=None):
+        self.root = root or getattr(settings, 'PAPER_CACHE_DIR', os.path.join('generated_papers', 'cache'))
+        self.max_bytes = max_bytes or getattr(settings, 'PAPER_CACHE_MAX_BYTES', 500 * 1024 * 1024)
+        self._lock = threading.Lock()
+
+    def path_for(self, key, ext='docx'):
+        return os.path.join(self.root, f"{key}.{ext}")
+
+    def open(self, key, ext='docx'):
+        """Open the cached file for reading, or return None on a miss.
+
+        Callers get the open file rather than a path: another request's write
+        may evict the entry at any moment, but an open handle stays readable.
+        """
+        path = self.path_for(key, ext)
+        try:
+            f = open(path, 'rb')
+        except FileNotFoundError:
+            return None
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            pass
+        return f
+
+    def put(self, key, write, ext='docx'):
+        """Store the output of ``write(file)`` under ``key`` and return it opened for reading."""
+        os.makedirs(self.root, exist_ok=True)
+        path = self.path_for(key, ext)
+        fd, tmp_path = tempfile.mkstemp(dir=self.root, suffix='.tmp')
+        try:
+            with os.fdopen(fd, "wb") as f:
+                write(f)
+            stored = open(tmp_path, 'rb')
+            try:
+                os.replace(tmp_path, path)
+            except Exception:
+                stored.close()
+                raise
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        self.evict(keep=path)
+        return stored
+
+    def entries(self):
+        items = []
+        with os.scandir(self.root) as it:
+            for entry in it:
+                if entry.is_file() and not entry.name.endswith('.tmp'):
+                    stat = entry.stat()
+                    items.append((stat.st_mtime, stat.st_size, entry.path))
+        return items
+
+    def evict(self, keep=None):
+        """Remove least recently used entries until the cache fits its budget."""
+        with self._lock:
+            items = sorted(self.entries())
+            total = sum(size for _, size, _ in items)
+            removed = 0
+            for _, size, path in items:
+                if total <= self.max_bytes:
+                    break
+                if path == keep:
+                    continue
+                try:
+                    # Open handles (downloads in progress) keep working on POSIX
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+                total -= size
+                removed += 1
+        if removed:
+            logging.info(f"Evicted {removed} cached papers to stay under {self.max_bytes} bytes")
+        return removed
+
+
+_default_cache = None
+
+def get_paper_cache():
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = PaperCache()
+    return _default_cache
@@ -1,5 +1,6 @@
 import os
 import json
+import tempfile
 from docx import Document
 from docx.shared import Pt, Inches
 from docx.enum.text import WD_ALIGN_PARAGRAPH
@@ -8,6 +9,10 @@ from datetime import datetime
 import logging
 from django.conf import settings
 
+from ..models import Course
+from .paper_templates import get_paper_template
+from .render_context import PaperRenderContext, PARTS
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 
@@ -22,7 +27,8 @@ class QuestionPaperGenerator:
     @staticmethod
     def add_equation_to_docx(paragraph, equation_data):
         try:
-            math_element = parse_xml(equation_data['mathml'])
+            # Rows ingested before MathML conversion kept the raw OMML under 'mathml'
+            math_element = parse_xml(equation_data.get('omml') or equation_data['mathml'])
             paragraph._p.append(math_element)
             run = paragraph.add_run()
             run.add_text(" ")
@@ -52,128 +58,59 @@ class QuestionPaperGenerator:
             paragraph.add_run(f"[Image: {os.path.basename(image_path)}]")
 
     @staticmethod
-    def create_paper(metadata, selected_questions, questions_data):
-        doc = Document()
-        
-        # Set margins
-        for section in doc.sections:
-            section.top_margin = Inches(1)
-            section.bottom_margin = Inches(1)
-            section.left_margin = Inches(1)
-            section.right_margin = Inches(1)
-
-        # Header
-        header = doc.add_heading('DEPARTMENT OF INFORMATION SCIENCE AND ENGINEERING', 0)
-        header.alignment = WD_ALIGN_PARAGRAPH.CENTER
-
-        # Create header table
-        table = doc.add_table(rows=5, cols=4)
-        table.style = 'Table Grid'
-
-        # Fill header information
-        header_data = [
-            ['Date', metadata.date.strftime('%d-%m-%Y'), 'Maximum Marks', str(metadata.max_marks)],
-            ['Course Code', metadata.course_code, 'Duration', metadata.duration],
-            ['Sem', metadata.semester, 'Improvement CIE', 'Yes' if metadata.is_improvement_cie else 'No'],
-            ['UG/PG', 'UG', 'Faculty:', metadata.faculty.name],
-            ['Course Title', metadata.course_title, '', '']
-        ]
-
-        for i, row_data in enumerate(header_data):
-            for j, text in enumerate(row_data):
-                cell = table.cell(i, j)
-                QuestionPaperGenerator.format_table_cell(cell, text, WD_ALIGN_PARAGRAPH.CENTER)
+    def department_for(metadata):
+        """Department whose template a paper uses: the course's, else the faculty's."""
+        course = Course.objects.filter(course_id=metadata.course_code).select_related('department_id').first()
+        if course and course.department_id:
+            return course.department_id.dept_name
+        faculty_department = getattr(metadata.faculty, 'department_id', None)
+        return faculty_department.dept_name if faculty_department else None
 
-        doc.add_paragraph()
-
-        def add_questions_to_table(questions, table, start_num=1):
-            total_marks = 0
-            for i, selection in enumerate(questions, start_num):
-                question_data = next(q for q in questions_data if q.q_id == selection.question.q_id)
-                row_cells = table.add_row().cells
-                
-                # Question number - keep it compact
-                QuestionPaperGenerator.format_table_cell(row_cells[0], str(i), WD_ALIGN_PARAGRAPH.CENTER)
-                row_cells[0].width = Inches(0.5)  # Fixed width for question number
-                
-                # Question content cell
-                question_cell = row_cells[1]
-                if not question_cell.text.strip():
-                    question_cell._element.clear_content()
-                
-                # Add question text
-                para = question_cell.add_paragraph()
-                para.add_run(question_data.text)
-                
-                # Add equations if present
-                media = question_data.media.first()
-                if media and media.equations:
-                    equations = media.equations
-                    for equation in equations:
-                        eq_para = question_cell.add_paragraph()
-                        QuestionPaperGenerator.add_equation_to_docx(eq_para, equation)
-                
-                # Add images if present
-                if media and media.image_paths:
-                    for img_path in media.image_paths:
-                        QuestionPaperGenerator.add_image_to_docx(doc, question_cell, img_path)
-                
-                # Add other fields
-                QuestionPaperGenerator.format_table_cell(row_cells[2], str(question_data.marks), WD_ALIGN_PARAGRAPH.CENTER)
-                QuestionPaperGenerator.format_table_cell(row_cells[3], question_data.bt, WD_ALIGN_PARAGRAPH.CENTER)
-                QuestionPaperGenerator.format_table_cell(row_cells[4], question_data.co, WD_ALIGN_PARAGRAPH.CENTER)
-                
-                total_marks += question_data.marks
-            
-            return total_marks
-
-        # Part A
-        doc.add_heading('Part- A', level=1).alignment = WD_ALIGN_PARAGRAPH.CENTER
-        partA_table = doc.add_table(rows=1, cols=5)
-        partA_table.style = 'Table Grid'
-        
-        # Set header row and column widths
-        header_cells = partA_table.rows[0].cells
-        headers = ['Q. No.', 'Questions', 'M', 'BT', 'CO']
-        widths = [Inches(0.5), Inches(5.0), Inches(0.4), Inches(0.4), Inches(0.4)]
-        
-        for i, (text, width) in enumerate(zip(headers, widths)):
-            cell = header_cells[i]
-            QuestionPaperGenerator.format_table_cell(cell, text, WD_ALIGN_PARAGRAPH.CENTER)
-            # Set column width
-            for row in partA_table.rows:
-                row.cells[i].width = width
-
-        # Add Part A questions
-        partA_questions = [q for q in selected_questions if q.part == 'A']
-        partA_marks = add_questions_to_table(partA_questions, partA_table)
-
-        doc.add_paragraph()
+    @staticmethod
+    def serialize(doc, max_memory=None):
+        """Save ``doc`` into a rewound buffer that only spills to disk past ``max_memory`` bytes."""
+        max_memory = max_memory or getattr(settings, 'PAPER_SPOOL_MAX_MEMORY', 16 * 1024 * 1024)
+        buffer = tempfile.SpooledTemporaryFile(max_size=max_memory)
+        doc.save(buffer)
+        buffer.seek(0)
+        return buffer
 
-        # Part B
-        doc.add_heading('Part- B', level=1).alignment = WD_ALIGN_PARAGRAPH.CENTER
-        partB_table = doc.add_table(rows=1, cols=5)
-        partB_table.style = 'Table Grid'
-        
-        header_cells = partB_table.rows[0].cells
-        for i, (text, width) in enumerate(zip(headers, widths)):
-            cell = header_cells[i]
-            QuestionPaperGenerator.format_table_cell(cell, text, WD_ALIGN_PARAGRAPH.CENTER)
-            # Set column width
-            for row in partB_table.rows:
-                row.cells[i].width = width
+    @staticmethod
+    def create_paper(metadata, selected_questions, questions_data):
+        context = PaperRenderContext.from_selection(selected_questions, questions_data)
+        return QuestionPaperGenerator.render(metadata, context)
 
-        # Add Part B questions
-        partB_questions = [q for q in selected_questions if q.part == 'B']
-        partB_marks = add_questions_to_table(partB_questions, partB_table)
+    @staticmethod
+    def header_values(metadata):
+        """Header fields shared by every paper rendered for ``metadata``."""
+        return {
+            'date': metadata.date.strftime('%d-%m-%Y'),
+            'max_marks': metadata.max_marks,
+            'course_code': metadata.course_code,
+            'duration': metadata.duration,
+            'semester': metadata.semester,
+            'improvement_cie': 'Yes' if metadata.is_improvement_cie else 'No',
+            'faculty': metadata.faculty.name,
+            'course_title': metadata.course_title,
+        }
 
-        # Add footer with total marks calculation
-        doc.add_paragraph()
-        footer_para = doc.add_paragraph("*********")
-        footer_para.alignment = WD_ALIGN_PARAGRAPH.CENTER
-        doc.add_paragraph("BT-Blooms Taxonomy, CO-Course Outcomes")
-        
-        total_marks_para = doc.add_paragraph(f"Total Marks: {partA_marks + partB_marks}")
-        total_marks_para.alignment = WD_ALIGN_PARAGRAPH.RIGHT
+    @staticmethod
+    def render(metadata, context, template=None):
+        """Build the paper document for a PaperRenderContext."""
+        template = template or get_paper_template(QuestionPaperGenerator.department_for(metadata))
+        return QuestionPaperGenerator.fill(template, QuestionPaperGenerator.header_values(metadata), context)
 
-        return doc 
\ No newline at end of file
+    @staticmethod
+    def fill(template, header, context):
+        """Render ``context`` into ``template`` without touching the database."""
+        doc = template.new_document({**header, 'total_marks': context.total_marks})
+
+        # Skeleton tables: header, Part A, Part B
+        add_image = lambda cell, path: QuestionPaperGenerator.add_image_to_docx(doc, cell, path)
+        for table, part in zip(doc.tables[1:3], PARTS):
+            for number, question in enumerate(context.part(part), 1):
+                template.add_question_row(
+                    table, number, question, QuestionPaperGenerator.add_equation_to_docx, add_image
+                )
+
+        return doc
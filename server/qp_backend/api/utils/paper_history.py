@@ -0,0 +1,120 @@
+from datetime import datetime
+
+from django.db import transaction
+from django.db.models import Count, Sum
+
+from ..models import PaperMetadata, QuestionSelection
+from .render_context import PaperRenderContext, PARTS
+
+
+TRUE_VALUES = {'true', '1', 'yes', 'on'}
+FALSE_VALUES = {'false', '0', 'no', 'off', ''}
+
+
+class PaperRequestError(ValueError):
+    """Raised for a generate-paper payload with a missing or malformed field."""
+
+
+def parse_flag(value, name):
+    """Strict boolean: JSON booleans or their usual form-field spellings."""
+    if value is None or isinstance(value, bool):
+        return bool(value)
+    text = str(value).strip().lower()
+    if text in TRUE_VALUES:
+        return True
+    if text in FALSE_VALUES:
+        return False
+    raise PaperRequestError(f"{name} must be true or false")
+
+
+def parse_date(value):
+    try:
+        return datetime.strptime(str(value), '%Y-%m-%d').date()
+    except (TypeError, ValueError):
+        raise PaperRequestError("date is required in YYYY-MM-DD format")
+
+
+def parse_max_marks(value):
+    try:
+        max_marks = int(value)
+    except (TypeError, ValueError):
+        raise PaperRequestError("max_marks must be a whole number")
+    if max_marks <= 0:
+        raise PaperRequestError("max_marks must be positive")
+    return max_marks
+
+
+def parse_text(data, name):
+    """A required header field, no longer than its PaperMetadata column."""
+    value = data.get(name)
+    value = str(value).strip() if value is not None else ''
+    if not value:
+        raise PaperRequestError(f"{name} is required")
+    max_length = PaperMetadata._meta.get_field(name).max_length
+    if len(value) > max_length:
+        raise PaperRequestError(f"{name} is limited to {max_length} characters")
+    return value
+
+
+def paper_from_request(data, faculty):
+    """An unsaved PaperMetadata for a generate-paper payload; raises PaperRequestError before any rendering."""
+    return PaperMetadata(
+        course_code=parse_text(data, 'course_code'),
+        course_title=parse_text(data, 'course_title'),
+        date=parse_date(data.get('date')),
+        max_marks=parse_max_marks(data.get('max_marks')),
+        duration=parse_text(data, 'duration'),
+        semester=parse_text(data, 'semester'),
+        faculty=faculty,
+        is_improvement_cie=parse_flag(data.get('is_improvement_cie'), 'is_improvement_cie'),
+    )
+
+
+def save_paper(paper, context):
+    """Store the paper and its ordered selection: one insert each."""
+    with transaction.atomic():
+        paper.save()
+        QuestionSelection.objects.bulk_create([
+            QuestionSelection(paper=paper, question_id=q_id, part=part, order=order)
+            for part in PARTS
+            for order, q_id in enumerate(context.parts[part], 1)
+        ])
+    return paper
+
+
+def paper_context(paper):
+    """Rebuild the render context of a stored paper from its selection rows."""
+    parts = {part: [] for part in PARTS}
+    for part, q_id in paper.selections.values_list('part', 'question_id'):
+        if part in parts:
+            parts[part].append(q_id)
+    return PaperRenderContext.load(parts)
+
+
+def paper_history(faculty=None, course_code=None):
+    papers = PaperMetadata.objects.select_related('faculty').annotate(
+        question_count=Count('selections'),
+        total_marks=Sum('selections__question__marks'),
+    ).order_by('-created_at', '-id')  # Meta.ordering is not applied to aggregated queries
+    if faculty is not None:
+        papers = papers.filter(faculty=faculty)
+    if course_code:
+        papers = papers.filter(course_code=course_code)
+    return papers
+
+
+def serialize_paper(paper):
+    return {
+        'id': paper.id,
+        'course_code': paper.course_code,
+        'course_title': paper.course_title,
+        'date': paper.date.strftime('%Y-%m-%d'),
+        'max_marks': paper.max_marks,
+        'duration': paper.duration,
+        'semester': paper.semester,
+        'is_improvement_cie': paper.is_improvement_cie,
+        'faculty': paper.faculty.name,
+        'question_count': getattr(paper, 'question_count', None),
+        'total_marks': getattr(paper, 'total_marks', None),
+        'created_at': paper.created_at.isoformat(),
+    }
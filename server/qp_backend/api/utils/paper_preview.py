@@ -0,0 +1,115 @@
+import os
+import logging
+
+from django.template.loader import render_to_string
+from django.utils.html import escape
+from django.utils.safestring import mark_safe
+from lxml import etree
+
+from .equations import MATHML_NS, get_equation_converter
+from .media_store import image_url
+from .paper_generator import QuestionPaperGenerator
+from .render_context import PARTS
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+
+# Presentation MathML only; anything else in stored markup falls back to plain text
+MATHML_TAGS = {
+    'math', 'mrow', 'mi', 'mn', 'mo', 'ms', 'mtext', 'mspace', 'msub', 'msup', 'msubsup',
+    'mfrac', 'msqrt', 'mroot', 'mfenced', 'mtable', 'mtr', 'mtd', 'munder', 'mover',
+    'munderover', 'mstyle', 'mpadded', 'mphantom', 'menclose', 'mmultiscripts',
+    'mprescripts', 'none', 'semantics', 'annotation',
+}
+MATHML_ATTRIBUTES = {
+    'mathvariant', 'display', 'stretchy', 'fence', 'separator', 'separators', 'accent',
+    'accentunder', 'open', 'close', 'linethickness', 'columnalign', 'rowalign', 'mathsize',
+    'form', 'largeop', 'movablelimits', 'notation', 'lspace', 'rspace', 'width', 'height',
+    'depth', 'encoding', 'bevelled', 'displaystyle', 'scriptlevel',
+}
+
+
+_parser = etree.XMLParser(resolve_entities=False, no_network=True)
+
+
+def safe_mathml(markup):
+    """Re-serialize stored MathML keeping only allow-listed elements and attributes.
+
+    Returns None when the markup is not MathML or contains anything else.
+    """
+    try:
+        root = etree.fromstring(markup.encode('utf-8'), _parser)
+    except (etree.XMLSyntaxError, ValueError):
+        return None
+    for elem in root.iter():
+        if not isinstance(elem.tag, str):
+            return None
+        namespace, _, local = elem.tag.rpartition('}')
+        if namespace.lstrip('{') not in ('', MATHML_NS) or local not in MATHML_TAGS:
+            return None
+        for name in list(elem.attrib):
+            if name not in MATHML_ATTRIBUTES:
+                del elem.attrib[name]
+    return etree.tostring(root, encoding='unicode')
+
+
+def equation_markup(equation):
+    """HTML for one stored equation: its MathML, or its text if that is unusable."""
+    mathml = equation.get('mathml') or ''
+    if 'omml' not in equation and mathml:
+        # Rows ingested before MathML conversion kept the raw OMML under 'mathml'
+        try:
+            mathml = get_equation_converter().convert(etree.fromstring(mathml.encode('utf-8'), _parser))['mathml']
+        except Exception as e:
+            logging.error(f"Error converting legacy equation for preview: {e}")
+            mathml = ''
+    markup = safe_mathml(mathml) if mathml else None
+    if markup is None:
+        return mark_safe(f'<span class="equation-text">{escape(equation.get("text") or "[Equation]")}</span>')
+    return mark_safe(markup)
+
+
+def image_entries(question, request=None):
+    """Signed URLs of a question's thumbnails (lazy loaded) and full-size images.
+
+    The preview is opened outside the API client that holds the token, so the
+    URLs carry their own signature and are absolute when a request is given.
+    """
+    entries = []
+    for index, path in enumerate(question.image_paths):
+        thumbnail = question.thumbnails[index] if index < len(question.thumbnails) else None
+        full = image_url(path, request)
+        entries.append({
+            'src': image_url(thumbnail or path, request) or full,
+            'href': full,
+            'name': os.path.basename(path),
+        })
+    return entries
+
+
+def render_preview(metadata, context, heading, request=None):
+    """HTML with the same structure as the generated DOCX, built from the render context."""
+    header = QuestionPaperGenerator.header_values(metadata)
+    parts = []
+    for part in PARTS:
+        rows = []
+        for number, question in enumerate(context.part(part), 1):
+            rows.append({
+                'number': number,
+                'question': question,
+                'equations': [equation_markup(eq) for eq in question.equations],
+                'images': image_entries(question, request),
+            })
+        parts.append({'title': f'Part- {part}', 'rows': rows, 'marks': sum(r['question'].marks for r in rows)})
+
+    try:
+        max_marks = int(header['max_marks'])
+    except (TypeError, ValueError):
+        max_marks = None
+    return render_to_string('api/paper_preview.html', {
+        'heading': heading,
+        'header': header,
+        'parts': parts,
+        'total_marks': context.total_marks,
+        'marks_mismatch': max_marks is not None and max_marks != context.total_marks,
+    })
@@ -0,0 +1,160 @@
+import io
+import copy
+import threading
+
+from django.conf import settings
+from docx import Document
+from docx.enum.text import WD_ALIGN_PARAGRAPH
+from docx.oxml import parse_xml
+from docx.oxml.ns import qn
+from docx.shared import Inches
+from docx.table import _Cell
+from lxml import etree
+
+DEFAULT_DEPARTMENT = 'INFORMATION SCIENCE AND ENGINEERING'
+QUESTION_HEADERS = ['Q. No.', 'Questions', 'M', 'BT', 'CO']
+QUESTION_WIDTHS = [Inches(0.5), Inches(5.0), Inches(0.4), Inches(0.4), Inches(0.4)]
+
+def token(name):
+    """Placeholder written into the skeleton and replaced per paper."""
+    return f'@@{name.upper()}@@'
+
+
+def department_heading(department_name=None):
+    """The paper heading for a department, e.g. 'DEPARTMENT OF COMPUTER SCIENCE'.
+
+    settings.PAPER_DEPARTMENT_HEADINGS may map a department name to a custom heading.
+    """
+    overrides = getattr(settings, 'PAPER_DEPARTMENT_HEADINGS', {})
+    if department_name in overrides:
+        return overrides[department_name]
+    name = (department_name or DEFAULT_DEPARTMENT).strip().upper()
+    if not name.startswith('DEPARTMENT OF '):
+        name = f'DEPARTMENT OF {name}'
+    return name
+
+
+class PaperTemplate:
+    """A question-paper layout compiled once per heading into OOXML.
+
+    The skeleton (margins, heading, header table, both Part tables with their
+    header rows and column widths, footer) is built with python-docx a single
+    time and kept as package bytes with ``@@FIELD@@`` placeholders. A prototype
+    question row is kept alongside it; rendering a paper loads the skeleton,
+    fills the placeholders and deep-copies the prototype once per question, so
+    the cost of a paper depends only on how many questions it has.
+    """
+
+    def __init__(self, heading):
+        self.heading = heading
+        self.skeleton, self.row_xml = self._compile(heading)
+        self._row = parse_xml(self.row_xml)
+
+    @staticmethod
+    def _center(cell, text):
+        paragraph = cell.paragraphs[0]
+        paragraph.alignment = WD_ALIGN_PARAGRAPH.CENTER
+        paragraph.add_run(text)
+
+    @staticmethod
+    def _question_table(doc, title):
+        doc.add_heading(title, level=1).alignment = WD_ALIGN_PARAGRAPH.CENTER
+        table = doc.add_table(rows=1, cols=len(QUESTION_HEADERS))
+        table.style = 'Table Grid'
+        for cell, text, width in zip(table.rows[0].cells, QUESTION_HEADERS, QUESTION_WIDTHS):
+            PaperTemplate._center(cell, text)
+            cell.width = width
+        return table
+
+    @classmethod
+    def _compile(cls, heading):
+        doc = Document()
+        for section in doc.sections:
+            section.top_margin = Inches(1)
+            section.bottom_margin = Inches(1)
+            section.left_margin = Inches(1)
+            section.right_margin = Inches(1)
+
+        doc.add_heading(heading, 0).alignment = WD_ALIGN_PARAGRAPH.CENTER
+
+        table = doc.add_table(rows=5, cols=4)
+        table.style = 'Table Grid'
+        header_data = [
+            ['Date', token('date'), 'Maximum Marks', token('max_marks')],
+            ['Course Code', token('course_code'), 'Duration', token('duration')],
+            ['Sem', token('semester'), 'Improvement CIE', token('improvement_cie')],
+            ['UG/PG', 'UG', 'Faculty:', token('faculty')],
+            ['Course Title', token('course_title'), '', ''],
+        ]
+        for i, row_data in enumerate(header_data):
+            for j, text in enumerate(row_data):
+                cls._center(table.cell(i, j), text)
+        doc.add_paragraph()
+
+        part_a = cls._question_table(doc, 'Part- A')
+        doc.add_paragraph()
+        cls._question_table(doc, 'Part- B')
+
+        doc.add_paragraph()
+        doc.add_paragraph("*********").alignment = WD_ALIGN_PARAGRAPH.CENTER
+        doc.add_paragraph("BT-Blooms Taxonomy, CO-Course Outcomes")
+        doc.add_paragraph(f"Total Marks: {token('total_marks')}").alignment = WD_ALIGN_PARAGRAPH.RIGHT
+
+        # Prototype question row: fixed widths, centred number/marks/BT/CO columns
+        row = part_a.add_row()
+        for i, (cell, width) in enumerate(zip(row.cells, QUESTION_WIDTHS)):
+            cell.width = width
+            if i != 1:
+                cell.paragraphs[0].alignment = WD_ALIGN_PARAGRAPH.CENTER
+        row_xml = etree.tostring(row._tr)
+        part_a._tbl.remove(row._tr)
+
+        buffer = io.BytesIO()
+        doc.save(buffer)
+        return buffer.getvalue(), row_xml
+
+    @staticmethod
+    def _add_text(paragraph_element, text):
+        paragraph_element.add_r().text = text
+
+    def new_document(self, values):
+        """Load the skeleton and fill the header and footer placeholders."""
+        doc = Document(io.BytesIO(self.skeleton))
+        replacements = {token(name): str(value) for name, value in values.items()}
+        for t in doc.element.body.iter(qn('w:t')):
+            if t.text and '@@' in t.text:
+                for placeholder, value in replacements.items():
+                    t.text = t.text.replace(placeholder, value)
+        return doc
+
+    def add_question_row(self, table, number, question, add_equation, add_image):
+        """Clone the prototype row into ``table`` and fill it for one QuestionRecord."""
+        tr = copy.deepcopy(self._row)
+        table._tbl.append(tr)
+        tcs = tr.findall(qn('w:tc'))
+        for tc, text in zip(tcs, [str(number), None, str(question.marks), question.bt, question.co]):
+            if text is not None:
+                self._add_text(tc.find(qn('w:p')), text)
+
+        question_cell = _Cell(tcs[1], table)
+        self._add_text(tcs[1].find(qn('w:p')), question.text)
+        for equation in question.equations:
+            add_equation(question_cell.add_paragraph(), equation)
+        for image_path in question.image_paths:
+            add_image(question_cell, image_path)
+        return tr
+
+
+_templates = {}
+_templates_lock = threading.Lock()
+
+def get_paper_template(department_name=None):
+    return get_template_for_heading(department_heading(department_name))
+
+
+def get_template_for_heading(heading):
+    with _templates_lock:
+        template = _templates.get(heading)
+        if template is None:
+            template = _templates[heading] = PaperTemplate(heading)
+    return template
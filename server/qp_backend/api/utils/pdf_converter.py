@@ -0,0 +1,271 @@
+import os
+import queue
+import shutil
+import atexit
+import logging
+import tempfile
+import threading
+import subprocess
+import time
+
+from django.conf import settings
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+
+# LibreOffice's Python bridge is only importable from the office's own Python
+# (or with python3-uno installed); without it we fall back to cold conversions.
+try:
+    import uno
+    from com.sun.star.beans import PropertyValue
+except ImportError:
+    uno = None
+
+
+class PdfConversionError(Exception):
+    pass
+
+
+def _property(name, value):
+    prop = PropertyValue()
+    prop.Name = name
+    prop.Value = value
+    return prop
+
+
+class OfficeProcess:
+    """One headless LibreOffice instance listening on its own named UNO pipe.
+
+    Each instance gets a private user profile and a pipe named after the
+    owning process id, so several can run side by side, also across the
+    worker processes of one server. The office is started once and reused for every conversion until
+    it crashes or a conversion times out, at which point it is restarted.
+    """
+
+    def __init__(self, pipe_name, binary=None):
+        self.pipe_name = pipe_name
+        self.binary = binary or getattr(settings, 'SOFFICE_BINARY', 'soffice')
+        self.profile_dir = tempfile.mkdtemp(prefix=f"{pipe_name}-")
+        self.process = None
+        self.desktop = None
+
+    @property
+    def running(self):
+        return self.desktop is not None
+
+    def start(self, startup_timeout=30):
+        try:
+            self.process = subprocess.Popen([
+                self.binary, '--headless', '--invisible', '--nologo', '--norestore', '--nodefault',
+                f"-env:UserInstallation=file://{self.profile_dir}",
+                f"--accept=pipe,name={self.pipe_name};urp;StarOffice.ComponentContext",
+            ], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        except FileNotFoundError:
+            raise PdfConversionError("LibreOffice is not installed on the server")
+
+        local = uno.getComponentContext()
+        resolver = local.ServiceManager.createInstanceWithContext(
+            "com.sun.star.bridge.UnoUrlResolver", local
+        )
+        deadline = time.monotonic() + startup_timeout
+        while True:
+            try:
+                context = resolver.resolve(f"uno:pipe,name={self.pipe_name};urp;StarOffice.ComponentContext")
+                break
+            except Exception:
+                if time.monotonic() > deadline or self.process.poll() is not None:
+                    self.stop()
+                    raise PdfConversionError(f"LibreOffice on pipe {self.pipe_name} did not start")
+                time.sleep(0.2)
+        self.desktop = context.ServiceManager.createInstanceWithContext(
+            "com.sun.star.frame.Desktop", context
+        )
+        logging.info(f"Started LibreOffice converter on pipe {self.pipe_name}")
+
+    def stop(self):
+        self.desktop = None
+        if self.process and self.process.poll() is None:
+            self.process.kill()
+            self.process.wait()
+        self.process = None
+
+    def restart(self):
+        self.stop()
+        self.start()
+
+    def close(self):
+        self.stop()
+        shutil.rmtree(self.profile_dir, ignore_errors=True)
+
+    def convert(self, src, dst):
+        document = self.desktop.loadComponentFromURL(
+            uno.systemPathToFileUrl(os.path.abspath(src)), "_blank", 0, (_property("Hidden", True),)
+        )
+        try:
+            document.storeToURL(
+                uno.systemPathToFileUrl(os.path.abspath(dst)),
+                (_property("FilterName", "writer_pdf_Export"),),
+            )
+        finally:
+            document.close(True)
+
+
+class PdfConverterPool:
+    """A fixed pool of warm OfficeProcess workers behind a queue.
+
+    Requests wait for a free worker for at most ``queue_timeout`` seconds and
+    each conversion is given ``timeout`` seconds; a worker that overruns is
+    killed and restarted so one bad document cannot wedge the pool; a worker
+    whose restart failed stays in the queue and is started again the next
+    time it is picked. When the UNO bridge is not importable every job runs
+    a cold ``soffice --convert-to pdf`` with the same limits instead.
+    """
+
+    def __init__(self, size=None, timeout=None, queue_timeout=None):
+        self.size = size or getattr(settings, 'PDF_CONVERTER_POOL_SIZE', 2)
+        self.timeout = timeout or getattr(settings, 'PDF_CONVERT_TIMEOUT', 30)
+        self.queue_timeout = queue_timeout or getattr(settings, 'PDF_QUEUE_TIMEOUT', 60)
+        self.binary = getattr(settings, 'SOFFICE_BINARY', 'soffice')
+        self._idle = queue.Queue()
+        self._workers = []
+        self._lock = threading.Lock()
+        self._cold_slots = threading.BoundedSemaphore(self.size)
+        self._closed_at_exit = False
+
+    @property
+    def warm(self):
+        return uno is not None
+
+    def ensure_started(self):
+        if not self.warm:
+            return
+        with self._lock:
+            if self._workers:
+                return
+            # Pipe names carry the pid: every server process starts a pool of its own
+            workers = []
+            try:
+                for i in range(self.size):
+                    worker = OfficeProcess(f"qp-soffice-{os.getpid()}-{i}", self.binary)
+                    workers.append(worker)
+                    worker.start()
+            except Exception:
+                # Leave no half-started pool behind, so the next conversion starts it afresh
+                for worker in workers:
+                    worker.close()
+                raise
+            self._workers = workers
+            for worker in workers:
+                self._idle.put(worker)
+            if not self._closed_at_exit:
+                atexit.register(self.close)
+                self._closed_at_exit = True
+
+    def warm_up(self):
+        """Start the office processes in the background so the first PDF request does not wait."""
+        def run():
+            try:
+                self.ensure_started()
+            except Exception as e:
+                logging.error(f"Could not start the PDF converters: {e}")
+
+        if self.warm:
+            threading.Thread(target=run, name="pdf-converter-warm-up", daemon=True).start()
+
+    def close(self):
+        with self._lock:
+            for worker in self._workers:
+                worker.close()
+            self._workers = []
+            self._idle = queue.Queue()
+
+    def _convert_warm(self, src, dst):
+        self.ensure_started()
+        try:
+            worker = self._idle.get(timeout=self.queue_timeout)
+        except queue.Empty:
+            raise PdfConversionError("All PDF converters are busy, try again shortly")
+
+        outcome = {}
+
+        def run():
+            try:
+                worker.convert(src, dst)
+            except Exception as e:
+                outcome['error'] = e
+
+        try:
+            if not worker.running:
+                # An earlier restart of this slot failed; try again before using it
+                worker.restart()
+            thread = threading.Thread(target=run, daemon=True)
+            thread.start()
+            thread.join(self.timeout)
+            if thread.is_alive() or 'error' in outcome:
+                # Killing the office also unblocks the stuck UNO call
+                logging.error(f"PDF conversion failed on pipe {worker.pipe_name}: {outcome.get('error', 'timed out')}")
+                try:
+                    worker.restart()
+                except PdfConversionError as e:
+                    logging.error(str(e))
+                raise PdfConversionError(
+                    "PDF conversion timed out" if 'error' not in outcome else f"PDF conversion failed: {outcome['error']}"
+                )
+        finally:
+            self._idle.put(worker)
+
+    def _convert_cold(self, src, dst):
+        if not self._cold_slots.acquire(timeout=self.queue_timeout):
+            raise PdfConversionError("All PDF converters are busy, try again shortly")
+        profile_dir = tempfile.mkdtemp(prefix="soffice-cold-")
+        try:
+            subprocess.run([
+                self.binary, '--headless', '--norestore',
+                f"-env:UserInstallation=file://{profile_dir}",
+                '--convert-to', 'pdf', '--outdir', os.path.dirname(dst), src,
+            ], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, timeout=self.timeout, check=True)
+        except FileNotFoundError:
+            raise PdfConversionError("LibreOffice is not installed on the server")
+        except subprocess.TimeoutExpired:
+            raise PdfConversionError("PDF conversion timed out")
+        except subprocess.CalledProcessError as e:
+            raise PdfConversionError(f"PDF conversion failed with exit code {e.returncode}")
+        finally:
+            shutil.rmtree(profile_dir, ignore_errors=True)
+            self._cold_slots.release()
+
+    def convert(self, docx_file):
+        """Convert a DOCX file object to PDF and return the PDF bytes."""
+        with tempfile.TemporaryDirectory(prefix="paper-pdf-") as workdir:
+            src = os.path.join(workdir, "paper.docx")
+            dst = os.path.join(workdir, "paper.pdf")
+            with open(src, "wb") as f:
+                shutil.copyfileobj(docx_file, f)
+
+            started = time.perf_counter()
+            if self.warm:
+                self._convert_warm(src, dst)
+            else:
+                self._convert_cold(src, dst)
+            if not os.path.exists(dst):
+                raise PdfConversionError("PDF conversion produced no output")
+            logging.info(f"Converted paper to PDF in {time.perf_counter() - started:.2f}s")
+            with open(dst, "rb") as f:
+                return f.read()
+
+
+_default_pool = None
+_default_pool_lock = threading.Lock()
+
+def get_pdf_converter():
+    global _default_pool
+    with _default_pool_lock:
+        if _default_pool is None:
+            _default_pool = PdfConverterPool()
+    return _default_pool
+
+
+def warm_pdf_converter():
+    """Called by the WSGI/ASGI entry points, so management commands and tests start no office."""
+    if getattr(settings, 'PDF_CONVERTER_WARM_ON_START', True):
+        get_pdf_converter().warm_up()
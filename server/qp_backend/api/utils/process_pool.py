@@ -0,0 +1,32 @@
+import os
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+import django
+from django.conf import settings
+
+
+def _setup_worker(settings_module, overrides):
+    if settings_module:
+        os.environ.setdefault('DJANGO_SETTINGS_MODULE', settings_module)
+    django.setup()
+    # Values the parent changed at runtime (e.g. override_settings) are not in the settings module
+    for name, value in overrides.items():
+        setattr(settings, name, value)
+
+
+def process_pool(workers, setting_names=()):
+    """ProcessPoolExecutor with spawned workers that set Django up themselves.
+
+    Requests run in a process with daemon threads (ingestion workers, the PDF
+    converter pool) and open database connections; forking it would copy
+    those mid-use, so workers start from a fresh interpreter instead.
+    ``setting_names`` are copied from the parent's current settings.
+    """
+    overrides = {name: getattr(settings, name) for name in setting_names if hasattr(settings, name)}
+    return ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context('spawn'),
+        initializer=_setup_worker,
+        initargs=(os.environ.get('DJANGO_SETTINGS_MODULE'), overrides),
+    )
@@ -0,0 +1,140 @@
+import re
+
+from django.db.models import F
+from django.db.models.functions import Substr
+
+from ..models import QuestionMedia
+from .media_store import image_url
+
+PREVIEW_CHARS = 160
+_WHITESPACE = re.compile(r'\s+')
+
+# Listing field -> column it is read from. Only the requested ones are selected,
+# straight into dicts with .values(), so no Question instances are built
+COLUMNS = {
+    'q_id': 'q_id',
+    'id': 'q_id',
+    'text': 'text',
+    # One character past the limit tells text_preview() whether to add an ellipsis
+    'text_preview': Substr('text', 1, PREVIEW_CHARS + 1),
+    'marks': 'marks',
+    'co': 'co',
+    'bt': 'bt',
+    'difficulty_level': 'difficulty_level',
+    'type': 'type',
+    'tags': 'tags',
+    'unit_id': 'unit_id__unit_id',
+    'unit_name': 'unit_id__unit_name',
+    'course_id': 'course_id_id',
+    'course_name': 'course_id__course_name',
+    'has_image': 'image',
+}
+
+# Listing field -> QuestionMedia columns it needs; read with one extra query when asked for
+MEDIA_FIELDS = {
+    'image_paths': ('image_paths',),
+    'image_urls': ('image_paths',),
+    'thumbnail_urls': ('thumbnails',),
+    'equations': ('equations',),
+    'has_equations': ('equations',),
+}
+
+# Payloads the listings returned before fields= existed
+COURSE_LISTING_FIELDS = [
+    'q_id', 'text', 'course_id', 'course_name', 'unit_id', 'unit_name', 'co', 'bt', 'marks',
+    'difficulty_level', 'type', 'has_image', 'has_equations',
+]
+SELECTION_LISTING_FIELDS = [
+    'id', 'text', 'marks', 'co', 'bt', 'unit_id', 'unit_name',
+    'image_paths', 'image_urls', 'thumbnail_urls', 'equations',
+]
+
+
+class FieldsetError(ValueError):
+    """Raised for a fields= value naming fields a listing does not have."""
+
+
+def requested_fields(value, default):
+    """Field names from a comma-separated string or list, or the listing's default."""
+    if value in (None, '', []):
+        return list(default)
+    names = value.split(',') if isinstance(value, str) else value
+    if not isinstance(names, list):
+        raise FieldsetError("fields must be a comma-separated string or a list")
+    fields = []
+    for name in names:
+        name = str(name).strip()
+        if name and name not in fields:
+            fields.append(name)
+    unknown = [name for name in fields if name not in COLUMNS and name not in MEDIA_FIELDS]
+    if unknown or not fields:
+        available = ', '.join(sorted(set(COLUMNS) | set(MEDIA_FIELDS)))
+        raise FieldsetError(f"Unknown field(s): {', '.join(unknown) or '(none)'}. Available: {available}")
+    return fields
+
+
+def text_preview(text):
+    """Whitespace-collapsed text cut at a word boundary near PREVIEW_CHARS."""
+    truncated = len(text) > PREVIEW_CHARS
+    text = _WHITESPACE.sub(' ', text[:PREVIEW_CHARS]).strip()
+    if not truncated:
+        return text
+    space = text.rfind(' ')
+    if space > PREVIEW_CHARS // 2:
+        text = text[:space]
+    return text.rstrip(' ,;:.') + '…'
+
+
+def project(queryset, fields):
+    """values() queryset reading only the columns behind `fields`.
+
+    q_id and course_id_id are always selected: they key the media lookup and
+    KeysetPagination's cursor.
+    """
+    columns = {}
+    for name in fields:
+        if name in COLUMNS:
+            column = COLUMNS[name]
+            columns[f'_{name}'] = F(column) if isinstance(column, str) else column
+    return queryset.values('q_id', 'course_id_id', **columns)
+
+
+def load_media(q_ids, fields):
+    columns = sorted({column for name in fields for column in MEDIA_FIELDS.get(name, ())})
+    if not columns:
+        return {}
+    media = {}
+    rows = QuestionMedia.objects.filter(question_id__in=q_ids).order_by('pk').values('question_id', *columns)
+    for row in rows:
+        media.setdefault(row['question_id'], row)
+    return media
+
+
+def listing_rows(values, fields, request=None):
+    """Listing dicts with exactly the requested fields, in the requested order.
+
+    Image URLs are made absolute against ``request`` when one is given.
+    """
+    values = list(values)
+    media = load_media([row['q_id'] for row in values], fields)
+    rows = []
+    for value in values:
+        found = media.get(value['q_id'], {})
+        row = {}
+        for name in fields:
+            if name == 'text_preview':
+                row[name] = text_preview(value['_text_preview'] or '')
+            elif name == 'has_image':
+                row[name] = bool(value['_has_image'])
+            elif name in COLUMNS:
+                row[name] = value[f'_{name}']
+            elif name == 'image_urls':
+                row[name] = [image_url(p, request) for p in found.get('image_paths') or []]
+            elif name == 'thumbnail_urls':
+                row[name] = [image_url(p, request) if p else None for p in found.get('thumbnails') or []]
+            elif name == 'has_equations':
+                row[name] = bool(found.get('equations'))
+            else:
+                row[name] = found.get(name) or []
+        rows.append(row)
+    return rows
@@ -0,0 +1,84 @@
+import html
+import re
+
+from django.contrib.postgres.search import SearchHeadline, SearchQuery, SearchRank
+from django.db import connection
+from django.db.models import F, FloatField, Q, Value
+
+from ..models import Question
+
+# Must match the configuration the search_vector trigger uses (migration 0007)
+SEARCH_CONFIG = 'english'
+MAX_QUERY_LENGTH = 200
+
+# Control characters never appear in question text, so they can mark the
+# highlighted words until the snippet has been HTML-escaped
+_START, _STOP = '\x02', '\x03'
+
+
+class SearchQueryError(ValueError):
+    """Raised for an empty or oversized search string."""
+
+
+def search_text(value):
+    text = (value or '').strip() if isinstance(value, str) else ''
+    if not text:
+        raise SearchQueryError("Search text 'q' is required")
+    if len(text) > MAX_QUERY_LENGTH:
+        raise SearchQueryError(f"Search text is limited to {MAX_QUERY_LENGTH} characters")
+    return text
+
+
+def full_text_supported():
+    return connection.vendor == 'postgresql'
+
+
+def search_terms(text):
+    return [term for term in re.findall(r'\w+', text) if term.lower() not in ('or', 'and')]
+
+
+def search_questions(questions, text):
+    """Questions matching `text`, best match first, annotated with `rank`.
+
+    On PostgreSQL this is a websearch-style query against the GIN-indexed
+    search_vector; other backends fall back to requiring every term.
+    """
+    if full_text_supported():
+        query = SearchQuery(text, config=SEARCH_CONFIG, search_type='websearch')
+        return questions.filter(search_vector=query).annotate(
+            rank=SearchRank(F('search_vector'), query),
+        ).order_by('-rank', 'q_id')
+
+    match = Q()
+    for term in search_terms(text):
+        match &= Q(text__icontains=term)
+    return questions.filter(match).annotate(
+        rank=Value(0.0, output_field=FloatField()),
+    ).order_by('q_id')
+
+
+def headlines(questions, text):
+    """HTML-escaped snippet of each question with the matched words in <mark>.
+
+    Only called for one page of results: ts_headline re-parses the whole text,
+    so running it inside the ranked query would cost it for every match.
+    """
+    if full_text_supported():
+        query = SearchQuery(text, config=SEARCH_CONFIG, search_type='websearch')
+        rows = Question.objects.filter(q_id__in=[q.q_id for q in questions]).annotate(
+            headline=SearchHeadline(
+                'text', query, config=SEARCH_CONFIG, start_sel=_START, stop_sel=_STOP,
+                max_words=35, min_words=15, max_fragments=2,
+            ),
+        ).values_list('q_id', 'headline')
+    else:
+        terms = search_terms(text)
+        pattern = re.compile('|'.join(re.escape(t) for t in terms), re.IGNORECASE) if terms else None
+        rows = [
+            (q.q_id, pattern.sub(lambda m: f'{_START}{m.group(0)}{_STOP}', q.text) if pattern else q.text)
+            for q in questions
+        ]
+    return {
+        q_id: html.escape(headline).replace(_START, '<mark>').replace(_STOP, '</mark>')
+        for q_id, headline in rows
+    }
@@ -0,0 +1,100 @@
+from collections import namedtuple
+
+from ..models import Question, QuestionMedia
+
+PARTS = ('A', 'B')
+
+# Plain, picklable snapshot of everything a paper row needs
+QuestionRecord = namedtuple('QuestionRecord', [
+    'q_id', 'text', 'marks', 'co', 'bt', 'unit_number', 'unit_name',
+    'fingerprint', 'equations', 'image_paths', 'thumbnails',
+])
+
+
+class UnknownQuestionsError(Exception):
+    def __init__(self, missing):
+        self.missing = sorted(missing)
+        super().__init__(f"Unknown question ids: {', '.join(map(str, self.missing))}")
+
+
+def _record(question, media):
+    return QuestionRecord(
+        q_id=question.q_id,
+        text=question.text,
+        marks=question.marks,
+        co=question.co,
+        bt=question.bt,
+        unit_number=question.unit_id.unit_id if question.unit_id else None,
+        unit_name=question.unit_id.unit_name if question.unit_id else None,
+        fingerprint=question.fingerprint,
+        equations=list(media.equations or []) if media else [],
+        image_paths=list(media.image_paths or []) if media else [],
+        thumbnails=list(media.thumbnails or []) if media else [],
+    )
+
+
+class PaperRenderContext:
+    """The selected questions of one paper, loaded up front and indexed by q_id.
+
+    ``load`` costs two queries however many questions are selected (questions
+    with their units, then media), and rejects unknown ids before any
+    rendering starts. The context holds only plain data, so it can be cached
+    or sent to another process.
+    """
+
+    def __init__(self, questions, parts):
+        self.questions = questions
+        self.parts = parts
+
+    @classmethod
+    def load(cls, parts):
+        """``parts`` maps 'A'/'B' to ordered lists of question ids."""
+        parts = {part: [int(q_id) for q_id in parts.get(part, [])] for part in PARTS}
+        ids = {q_id for q_ids in parts.values() for q_id in q_ids}
+
+        questions = {q.q_id: q for q in Question.objects.filter(q_id__in=ids).select_related('unit_id')}
+        missing = ids - set(questions)
+        if missing:
+            raise UnknownQuestionsError(missing)
+
+        # Like the old media.first(): the earliest media row of each question
+        media = {}
+        for row in QuestionMedia.objects.filter(question_id__in=ids).order_by('qm_id'):
+            media.setdefault(row.question_id_id, row)
+
+        return cls({q_id: _record(q, media.get(q_id)) for q_id, q in questions.items()}, parts)
+
+    @classmethod
+    def load_many(cls, selections):
+        """One context per ``parts`` mapping, all loaded with the same two queries."""
+        selections = [{part: [int(q_id) for q_id in parts.get(part, [])] for part in PARTS} for parts in selections]
+        combined = cls.load({
+            'A': [q_id for parts in selections for q_id in parts['A'] + parts['B']],
+        })
+        return [
+            cls({q_id: combined.questions[q_id] for q_ids in parts.values() for q_id in q_ids}, parts)
+            for parts in selections
+        ]
+
+    @classmethod
+    def from_selection(cls, selected_questions, questions_data):
+        """Build a context from selection objects and (prefetched) Question instances."""
+        questions = {}
+        for question in questions_data:
+            media = sorted(question.media.all(), key=lambda m: m.qm_id)
+            questions[question.q_id] = _record(question, media[0] if media else None)
+        parts = {
+            part: [s.question.q_id for s in selected_questions if s.part == part]
+            for part in PARTS
+        }
+        missing = {q_id for q_ids in parts.values() for q_id in q_ids} - set(questions)
+        if missing:
+            raise UnknownQuestionsError(missing)
+        return cls(questions, parts)
+
+    def part(self, part):
+        return [self.questions[q_id] for q_id in self.parts[part]]
+
+    @property
+    def total_marks(self):
+        return sum(self.questions[q_id].marks for q_ids in self.parts.values() for q_id in q_ids)
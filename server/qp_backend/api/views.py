@@ -21,9 +21,10 @@ from django.middleware.csrf import get_token, rotate_token
 from django.db.models import Q
 from django.contrib.auth.hashers import make_password
 from django.contrib.sessions.models import Session
+from django.conf import settings
 from django.db import transaction
 from django.urls import reverse
-from django.http import JsonResponse, FileResponse
+from django.http import JsonResponse, FileResponse, HttpResponse, StreamingHttpResponse
 from django.views import View
 from django.shortcuts import get_object_or_404
 
@@ -31,10 +32,13 @@ from rest_framework.authtoken.models import Token
 from rest_framework.pagination import PageNumberPagination
 from rest_framework.parsers import MultiPartParser, FormParser
 from rest_framework.renderers import JSONRenderer
+from rest_framework.negotiation import DefaultContentNegotiation
 
+import io
 import json
 import os
 import logging
+import mimetypes
 from datetime import datetime
 from django.db.models import Count
 from django.utils import timezone
@@ -51,9 +55,34 @@ except ImportError:
 
 from .models import *
 from .serializers import *
-from .parser import upload_questions
+from .parser import upload_questions, ingest_questions
 from .middleware import role_required, class_role_required
 from .utils.paper_generator import QuestionPaperGenerator
+from .utils.render_context import PaperRenderContext, UnknownQuestionsError
+from .utils.paper_templates import get_paper_template, department_heading
+from .utils.paper_cache import get_paper_cache, paper_cache_key
+from .utils.blueprint import assemble_paper, BlueprintError, BlueprintInfeasible
+from .utils.filter_index import get_filter_index, filter_values, FilterIndexError, INDEX_FIELDS
+from .utils.near_duplicates import similar_questions, duplicate_clusters, NearDuplicateError
+from .utils.question_search import search_text, search_questions, headlines, SearchQueryError
+from .utils.paper_history import (
+    PaperRequestError, paper_from_request, save_paper, paper_context, paper_history, serialize_paper,
+)
+from .utils.paper_preview import render_preview
+from .utils.paper_copies import PaperCopies, PaperCopyError, copy_count
+from .utils.paper_batch import PaperBatch, PaperBatchError
+from .utils.pdf_converter import get_pdf_converter, PdfConversionError
+from .utils.ingestion_jobs import spool_upload, enqueue_job, serialize_job
+from .utils.batch_upload import BatchUpload, BatchUploadError
+from .utils.chunked_upload import (
+    UploadError, UploadOffsetMismatch, create_session, write_part,
+    complete_session, abort_session, serialize_session,
+)
+from .utils.media_store import get_media_store, image_url, valid_image_signature
+from .utils.pagination import KeysetPagination
+from .utils.question_fields import (
+    requested_fields, project, listing_rows, FieldsetError, COURSE_LISTING_FIELDS, SELECTION_LISTING_FIELDS
+)
 
 # Filter functions
 def apply_question_filters(params):
@@ -68,6 +97,18 @@ def apply_question_filters(params):
         filters &= Q(marks=params['marks'])
     return filters
 
+def apply_selection_filters(course_id, data):
+    filters = Q(course_id_id=course_id)
+    if data.get('unit_numbers'):
+        filters &= Q(unit_id__unit_id__in=data['unit_numbers'])
+    if data.get('cos'):
+        filters &= Q(co__in=data['cos'])
+    if data.get('bts'):
+        filters &= Q(bt__in=data['bts'])
+    if data.get('marks'):
+        filters &= Q(marks__in=data['marks'])
+    return filters
+
 def apply_department_filters(params):
     filters = Q()
     if 'name' in params:
@@ -90,23 +131,6 @@ def apply_unit_filters(params):
         filters &= Q(unit_name__icontains=params['unit_name'])
     return filters
 
-def generate_question_paper(questions, format='pdf'):
-    # TODO: Implement the actual question paper generation logic
-    # This is a placeholder implementation
-    paper = {
-        'questions': [
-            {
-                'id': q.id,
-                'text': q.text,
-                'marks': q.marks,
-                'unit': q.unit_id.unit_name if q.unit_id else None
-            } for q in questions
-        ],
-        'total_marks': sum(q.marks for q in questions),
-        'format': format
-    }
-    return paper
-
 class CustomPagination(PageNumberPagination):
     page_size = 10
 
@@ -865,10 +889,10 @@ class QuestionListView(APIView):
 
         questions = Question.objects.filter(course_id=course_id).prefetch_related('media').select_related('unit_id')
 
-        pagination_class = CustomPagination
-
-        serializer = QuestionSerializer(questions, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        paginator = KeysetPagination()
+        page = paginator.paginate_queryset(questions, request)
+        serializer = QuestionSerializer(page, many=True)
+        return paginator.get_paginated_response(serializer.data)
 
 
 # Add questions manually (FACULTY)
@@ -886,6 +910,8 @@ class AddQuestionView(APIView):
                 QuestionMedia(question_id=question, **media) for media in media_data
             ]
             QuestionMedia.objects.bulk_create(media_objects)
+            # bulk_create skips QuestionMedia.save(), which keeps the fingerprint in step with the media
+            question.refresh_media_fingerprint()
             return Response({"message": "Question and media added successfully"}, status=status.HTTP_201_CREATED)
         
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
@@ -918,24 +944,30 @@ class FileUploadView(APIView):
                 return Response({"error": "Invalid file format. Please upload a .doc or .docx file"}, 
                              status=status.HTTP_400_BAD_REQUEST)
 
-            # Create temp directory if it doesn't exist
-            os.makedirs("temp", exist_ok=True)
-            os.makedirs("images", exist_ok=True)
-            
-            # Save the file temporarily
-            file_path = f"temp/{file.name}"
-            with open(file_path, "wb") as f:
-                for chunk in file.chunks():
-                    f.write(chunk)
+            # Async mode: persist the upload as a job and return immediately
+            if str(request.data.get('async', '')).lower() in ('1', 'true', 'yes'):
+                course = Course.objects.get(course_id=course_id)
+                job = enqueue_job(course, faculty_profile, spool_upload(file), file.name)
+                return Response({
+                    "message": "Upload accepted for processing",
+                    "job": serialize_job(job),
+                    "status_url": reverse('upload-job-status', args=[job.pk])
+                }, status=status.HTTP_202_ACCEPTED)
+
+            # Save the file under a unique name so concurrent uploads of the same file name don't collide
+            file_path = spool_upload(file)
 
             try:
-                # Process the file using the parser
-                questions = upload_questions(file_path, course_id)
-                if not questions:
+                # Process the file using the batched parser
+                questions, stats = ingest_questions(file_path, course_id)
+                if not questions and not stats.rows_skipped:
                     return Response({"error": "No questions found in the document"}, status=status.HTTP_400_BAD_REQUEST)
                 
                 return Response({
-                    "message": f"Successfully uploaded {len(questions)} questions",
+                    "message": f"Successfully uploaded {stats.rows_inserted} new questions "
+                               f"({stats.rows_updated} updated, {stats.rows_skipped} unchanged, "
+                               f"{stats.rows_collapsed} repeated with different details)",
+                    "stats": stats.as_dict(),
                     "questions": [{
                         "id": q.q_id,
                         "text": q.text,
@@ -962,6 +994,168 @@ class FileUploadView(APIView):
             return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
+# Uploading a ZIP or several question bank files at once (FACULTY)
+class BatchFileUploadView(APIView):
+    permission_classes = [IsAuthenticated]
+    authentication_classes = [TokenAuthentication]
+    parser_classes = [MultiPartParser, FormParser]
+    renderer_classes = [JSONRenderer]
+
+    def post(self, request):
+        try:
+            faculty_profile = request.user.faculty_profile
+            course_id = request.data.get('course_id')
+
+            if not FacultyCourse.objects.filter(faculty_id=faculty_profile, course_id=course_id).exists():
+                return Response({"error": "You do not have permission to upload questions for this course"},
+                                status=status.HTTP_403_FORBIDDEN)
+
+            files = request.FILES.getlist('files') or request.FILES.getlist('file')
+            if not files:
+                return Response({"error": "No files were uploaded"}, status=status.HTTP_400_BAD_REQUEST)
+
+            course = Course.objects.get(course_id=course_id)
+            with BatchUpload() as batch:
+                for file in files:
+                    batch.add_upload(file)
+                if not batch.documents:
+                    return Response({"error": "No .docx documents found in the upload"},
+                                    status=status.HTTP_400_BAD_REQUEST)
+                summary = batch.ingest(course)
+
+            return Response({
+                "message": f"Uploaded {summary['rows_inserted']} questions from {summary['documents']} documents",
+                "summary": summary
+            }, status=status.HTTP_201_CREATED)
+
+        except BatchUploadError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        except Faculty.DoesNotExist:
+            return Response({"error": "Faculty profile not found"}, status=status.HTTP_404_NOT_FOUND)
+        except Course.DoesNotExist:
+            return Response({"error": "Course not found"}, status=status.HTTP_404_NOT_FOUND)
+        except Exception as e:
+            logging.error(f"Error processing batch upload: {str(e)}")
+            return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+# Status of an asynchronous question upload (FACULTY)
+class UploadJobStatusView(APIView):
+    permission_classes = [IsAuthenticated]
+    authentication_classes = [TokenAuthentication]
+
+    def get(self, request, job_id):
+        try:
+            job = IngestionJob.objects.get(pk=job_id)
+            faculty = Faculty.objects.filter(user=request.user).first()
+            if request.user.role != 'admin' and (not faculty or job.faculty_id != faculty.f_id):
+                return Response({"error": "You do not have permission to view this job"},
+                                status=status.HTTP_403_FORBIDDEN)
+            return Response({"job": serialize_job(job)})
+        except IngestionJob.DoesNotExist:
+            return Response({"error": "Upload job not found"}, status=status.HTTP_404_NOT_FOUND)
+
+
+# Resumable chunked uploads (FACULTY). Create a session, PUT the file in parts with an
+# Upload-Offset header, then complete it to queue an ingestion job. A client that loses
+# its connection asks for the session's offset and carries on from there.
+class UploadSessionView(APIView):
+    permission_classes = [IsAuthenticated]
+    authentication_classes = [TokenAuthentication]
+
+    def post(self, request):
+        try:
+            faculty_profile = request.user.faculty_profile
+            course_id = request.data.get('course_id')
+            file_name = request.data.get('file_name', '')
+
+            if not FacultyCourse.objects.filter(faculty_id=faculty_profile, course_id=course_id).exists():
+                return Response({"error": "You do not have permission to upload questions for this course"},
+                                status=status.HTTP_403_FORBIDDEN)
+            if not file_name.endswith(('.doc', '.docx')):
+                return Response({"error": "Invalid file format. Please upload a .doc or .docx file"},
+                                status=status.HTTP_400_BAD_REQUEST)
+
+            session = create_session(
+                Course.objects.get(course_id=course_id),
+                faculty_profile,
+                file_name,
+                int(request.data.get('size', 0)),
+                request.data.get('sha256', ''),
+            )
+            return Response({
+                "upload": serialize_session(session),
+                "part_size": getattr(settings, 'CHUNKED_UPLOAD_PART_SIZE', 8 * 1024 * 1024),
+                "upload_url": reverse('upload-session-detail', args=[session.upload_id]),
+            }, status=status.HTTP_201_CREATED)
+        except (UploadError, ValueError) as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        except Faculty.DoesNotExist:
+            return Response({"error": "Faculty profile not found"}, status=status.HTTP_404_NOT_FOUND)
+        except Course.DoesNotExist:
+            return Response({"error": "Course not found"}, status=status.HTTP_404_NOT_FOUND)
+
+
+class UploadSessionDetailView(APIView):
+    permission_classes = [IsAuthenticated]
+    authentication_classes = [TokenAuthentication]
+
+    @staticmethod
+    def get_session(request, upload_id):
+        faculty = Faculty.objects.filter(user=request.user).first()
+        return UploadSession.objects.get(pk=upload_id, faculty=faculty)
+
+    def get(self, request, upload_id):
+        try:
+            return Response({"upload": serialize_session(self.get_session(request, upload_id))})
+        except UploadSession.DoesNotExist:
+            return Response({"error": "Upload not found"}, status=status.HTTP_404_NOT_FOUND)
+
+    def put(self, request, upload_id):
+        try:
+            session = self.get_session(request, upload_id)
+            offset = int(request.headers.get('Upload-Offset', request.query_params.get('offset', -1)))
+            length = int(request.META.get('CONTENT_LENGTH') or 0)
+            # Read the raw body stream; request.data would buffer the whole part first
+            new_offset = write_part(session, offset, request.stream, length)
+            return Response({"offset": new_offset, "size": session.size})
+        except UploadOffsetMismatch as e:
+            return Response({"error": str(e), "offset": e.expected}, status=status.HTTP_409_CONFLICT)
+        except (UploadError, ValueError) as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        except UploadSession.DoesNotExist:
+            return Response({"error": "Upload not found"}, status=status.HTTP_404_NOT_FOUND)
+
+    def delete(self, request, upload_id):
+        try:
+            session = self.get_session(request, upload_id)
+            if session.status == 'receiving':
+                abort_session(session)
+            return Response(status=status.HTTP_204_NO_CONTENT)
+        except UploadSession.DoesNotExist:
+            return Response({"error": "Upload not found"}, status=status.HTTP_404_NOT_FOUND)
+
+
+class UploadSessionCompleteView(APIView):
+    permission_classes = [IsAuthenticated]
+    authentication_classes = [TokenAuthentication]
+
+    def post(self, request, upload_id):
+        try:
+            session = UploadSessionDetailView.get_session(request, upload_id)
+            session = complete_session(session)
+            return Response({
+                "message": "Upload accepted for processing",
+                "upload": serialize_session(session),
+                "job": serialize_job(session.job),
+                "status_url": reverse('upload-job-status', args=[session.job_id]),
+            }, status=status.HTTP_202_ACCEPTED)
+        except UploadError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        except UploadSession.DoesNotExist:
+            return Response({"error": "Upload not found"}, status=status.HTTP_404_NOT_FOUND)
+
+
 # Based on the filters(appropriate attributes of Question entity like CO, BT, unit_id specified in the indexes)
 # return the questions of the selected course (FACULTY)
 @method_decorator(login_required, name='dispatch')
@@ -1020,70 +1214,239 @@ class ListEntitiesView(APIView):
 
 
 # Question Paper Generation
+PAPER_CONTENT_TYPES = {
+    'docx': 'application/vnd.openxmlformats-officedocument.wordprocessingml.document',
+    'pdf': 'application/pdf',
+}
+
+class PaperContentNegotiation(DefaultContentNegotiation):
+    # ?format=docx|pdf picks the paper's file type here, not an API renderer
+    def filter_renderers(self, renderers, format):
+        if format in PAPER_CONTENT_TYPES:
+            return renderers
+        return super().filter_renderers(renderers, format)
+
+def paper_format(request):
+    return request.data.get('format', request.query_params.get('format', 'docx'))
+
+def paper_file_response(metadata, context, output_format, stream=False):
+    """FileResponse with the rendered paper, served from the paper cache when possible."""
+    # Identical inputs produce an identical paper, so serve it from the cache when we can
+    template = get_paper_template(QuestionPaperGenerator.department_for(metadata))
+    cache = get_paper_cache()
+    cache_key = paper_cache_key(metadata, context, template.heading, fmt=output_format)
+    # Cache entries are opened in the lookup itself: one evicted in the meantime is just a miss
+    output = cache.open(cache_key, ext=output_format)
+    cache_status = 'miss'
+    if output is not None:
+        cache_status = 'hit'
+    elif output_format == 'pdf':
+        # Convert from the cached DOCX when there is one, otherwise render it in memory
+        docx = cache.open(paper_cache_key(metadata, context, template.heading))
+        if docx is None:
+            docx = QuestionPaperGenerator.serialize(QuestionPaperGenerator.render(metadata, context, template))
+        with docx:
+            pdf = get_pdf_converter().convert(docx)
+        if stream:
+            output = io.BytesIO(pdf)
+            cache_status = 'bypass'
+        else:
+            output = cache.put(cache_key, lambda f: f.write(pdf), ext='pdf')
+    elif stream:
+        # Stream mode: serialize in memory and send it without touching the cache directory
+        output = QuestionPaperGenerator.serialize(QuestionPaperGenerator.render(metadata, context, template))
+        cache_status = 'bypass'
+    else:
+        doc = QuestionPaperGenerator.render(metadata, context, template)
+        output = cache.put(cache_key, doc.save)
+
+    # Return the file; FileResponse closes it once the body has been sent
+    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    response = FileResponse(output, content_type=PAPER_CONTENT_TYPES[output_format])
+    response['Content-Disposition'] = f'attachment; filename="question_paper_{timestamp}.{output_format}"'
+    response['X-Paper-Cache'] = cache_status
+    return response
+
 class GeneratePaperView(APIView):
     permission_classes = [IsAuthenticated]
+    content_negotiation_class = PaperContentNegotiation
 
     def post(self, request):
         try:
-            # Create a simple metadata object without saving to database
-            class SimpleMetadata:
-                def __init__(self, data, faculty):
-                    self.course_code = data.get('course_code')
-                    self.course_title = data.get('course_title')
-                    self.date = datetime.strptime(data.get('date'), '%Y-%m-%d')
-                    self.max_marks = data.get('max_marks')
-                    self.duration = data.get('duration')
-                    self.semester = data.get('semester')
-                    self.faculty = faculty
-                    self.is_improvement_cie = data.get('is_improvement_cie', False)
-
-            metadata = SimpleMetadata(request.data, request.user.faculty_profile)
-
-            # Create question selections without saving to database
-            class SimpleQuestionSelection:
-                def __init__(self, question, part):
-                    self.question = question
-                    self.part = part
-
-            selected_questions = []
-            part_a_questions = request.data['selected_questions']['part_a']
-            part_b_questions = request.data['selected_questions']['part_b']
-
-            # Process Part A questions
-            for q_id in part_a_questions:
-                question = Question.objects.get(q_id=q_id)
-                selected_questions.append(SimpleQuestionSelection(question, 'A'))
+            paper = paper_from_request(request.data, request.user.faculty_profile)
 
-            # Process Part B questions
-            for q_id in part_b_questions:
-                question = Question.objects.get(q_id=q_id)
-                selected_questions.append(SimpleQuestionSelection(question, 'B'))
+            # Load every selected question and its media up front; unknown ids fail fast
+            context = PaperRenderContext.load({
+                'A': request.data['selected_questions']['part_a'],
+                'B': request.data['selected_questions']['part_b'],
+            })
 
-            # Get all questions with their media
-            question_ids = [q.question.q_id for q in selected_questions]
-            questions_data = Question.objects.filter(q_id__in=question_ids).prefetch_related('media')
+            output_format = paper_format(request)
+            if output_format not in PAPER_CONTENT_TYPES:
+                return Response({"error": f"Unsupported format: {output_format}"},
+                                status=status.HTTP_400_BAD_REQUEST)
+            stream = request.data.get('delivery', request.query_params.get('delivery')) == 'stream'
+
+            response = paper_file_response(paper, context, output_format, stream)
+            # Keep the paper so it shows up in the history and can be downloaded again
+            save_paper(paper, context)
+            response['X-Paper-Id'] = paper.id
+            return response
+
+        except PaperRequestError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        except PdfConversionError as e:
+            return Response({"error": str(e)}, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+        except UnknownQuestionsError as e:
+            return Response({"error": str(e), "missing_question_ids": e.missing},
+                            status=status.HTTP_400_BAD_REQUEST)
+        except Exception as e:
+            return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+# Papers generated so far (FACULTY sees their own, ADMIN sees all)
+class PaperHistoryView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        try:
+            faculty = None if request.user.role == 'admin' else Faculty.objects.filter(user=request.user).first()
+            if request.user.role != 'admin' and faculty is None:
+                return Response({"error": "Faculty profile not found"}, status=status.HTTP_404_NOT_FOUND)
+
+            papers = paper_history(faculty, request.query_params.get('course_code'))
+            paginator = CustomPagination()
+            page = paginator.paginate_queryset(papers, request)
+            return paginator.get_paginated_response([serialize_paper(p) for p in page])
+        except Exception as e:
+            return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
-            # Create paper directory if it doesn't exist
-            os.makedirs("generated_papers", exist_ok=True)
-            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-            output_path = f"generated_papers/question_paper_{timestamp}.docx"
 
-            # Generate the paper
-            doc = QuestionPaperGenerator.create_paper(metadata, selected_questions, questions_data)
-            doc.save(output_path)
+# Download a past paper again, from the cache or rebuilt from its stored selection
+class PaperDownloadView(APIView):
+    permission_classes = [IsAuthenticated]
+    content_negotiation_class = PaperContentNegotiation
 
-            # Return the file
-            response = FileResponse(
-                open(output_path, 'rb'),
-                content_type='application/vnd.openxmlformats-officedocument.wordprocessingml.document'
+    def get(self, request, paper_id):
+        try:
+            paper = PaperMetadata.objects.select_related('faculty').get(pk=paper_id)
+            if request.user.role != 'admin' and paper.faculty.user_id != request.user.id:
+                return Response({"error": "You do not have permission to download this paper"},
+                                status=status.HTTP_403_FORBIDDEN)
+
+            output_format = paper_format(request)
+            if output_format not in PAPER_CONTENT_TYPES:
+                return Response({"error": f"Unsupported format: {output_format}"},
+                                status=status.HTTP_400_BAD_REQUEST)
+
+            response = paper_file_response(paper, paper_context(paper), output_format)
+            response['X-Paper-Id'] = paper.id
+            return response
+
+        except PaperMetadata.DoesNotExist:
+            return Response({"error": "Paper not found"}, status=status.HTTP_404_NOT_FOUND)
+        except PdfConversionError as e:
+            return Response({"error": str(e)}, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+        except Exception as e:
+            return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+# HTML preview of a paper, built from the same data as the DOCX
+class GeneratePaperPreviewView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        try:
+            paper = paper_from_request(request.data, request.user.faculty_profile)
+            context = PaperRenderContext.load({
+                'A': request.data['selected_questions']['part_a'],
+                'B': request.data['selected_questions']['part_b'],
+            })
+            heading = department_heading(QuestionPaperGenerator.department_for(paper))
+            # Previews are not kept: only generated papers belong in the history
+            response = HttpResponse(render_preview(paper, context, heading, request), content_type='text/html; charset=utf-8')
+            response['X-Paper-Total-Marks'] = context.total_marks
+            return response
+
+        except PaperRequestError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        except UnknownQuestionsError as e:
+            return Response({"error": str(e), "missing_question_ids": e.missing},
+                            status=status.HTTP_400_BAD_REQUEST)
+        except Exception as e:
+            return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+# Several equivalent paper sets from one metadata block, returned as one ZIP
+class GeneratePaperSetsView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        try:
+            metadata = paper_from_request(request.data, request.user.faculty_profile)
+            sets = request.data.get('sets') or []
+            batch = PaperBatch(
+                metadata,
+                [{'A': s.get('part_a', []), 'B': s.get('part_b', [])} for s in sets],
+                labels=[s.get('label') for s in sets],
             )
-            response['Content-Disposition'] = f'attachment; filename="question_paper_{timestamp}.docx"'
+            archive, manifest = batch.build()
+            # Every set is a paper of its own in the history
+            papers = [
+                save_paper(paper_from_request(request.data, request.user.faculty_profile), context)
+                for context in batch.contexts
+            ]
+
+            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+            response = FileResponse(archive, content_type='application/zip')
+            response['Content-Disposition'] = f'attachment; filename="question_papers_{timestamp}.zip"'
+            response['X-Paper-Sets'] = len(manifest['papers'])
+            response['X-Paper-Ids'] = ','.join(str(paper.id) for paper in papers)
             return response
 
+        except (PaperBatchError, PaperRequestError) as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        except UnknownQuestionsError as e:
+            return Response({"error": str(e), "missing_question_ids": e.missing},
+                            status=status.HTTP_400_BAD_REQUEST)
         except Exception as e:
+            logging.error(f"Error generating paper sets: {str(e)}")
             return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
+# One paper, many seats: shuffled copies streamed as a ZIP
+class GeneratePaperCopiesView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        try:
+            copies = copy_count(request.data.get('copies'))
+            seed = int(request.data.get('seed') or 0)
+            paper = paper_from_request(request.data, request.user.faculty_profile)
+            context = PaperRenderContext.load({
+                'A': request.data['selected_questions']['part_a'],
+                'B': request.data['selected_questions']['part_b'],
+            })
+
+            # Render once; every copy reorders the rows of this document
+            doc = QuestionPaperGenerator.render(paper, context)
+            shuffled = PaperCopies(doc, context, seed=seed)
+            save_paper(paper, context)
+
+            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+            response = StreamingHttpResponse(shuffled.stream(copies), content_type='application/zip')
+            response['Content-Disposition'] = f'attachment; filename="question_paper_copies_{timestamp}.zip"'
+            response['X-Paper-Id'] = paper.id
+            return response
+
+        except (PaperCopyError, ValueError) as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        except UnknownQuestionsError as e:
+            return Response({"error": str(e), "missing_question_ids": e.missing},
+                            status=status.HTTP_400_BAD_REQUEST)
+        except Exception as e:
+            logging.error(f"Error generating paper copies: {str(e)}")
+            return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
 # Enhance Scalability and Session Management
 class SessionManagementMixin:
     @staticmethod
@@ -1137,49 +1500,147 @@ class UserListView(APIView):
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
 
+# Content-addressed question images. The URL embeds the SHA-256 of the bytes,
+# so responses never change and clients may cache them indefinitely. <img> tags
+# cannot send a token, so a valid signed link from image_url() is enough.
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def question_image_view(request, digest):
+    params = request.query_params
+    if not (request.user.is_authenticated
+            or valid_image_signature(digest, params.get('expires'), params.get('signature'))):
+        return Response({'error': 'Image link is invalid or has expired'}, status=403)
+
+    path = get_media_store().locate(digest)
+    if not path:
+        return Response({'error': 'Image not found'}, status=404)
+
+    etag = f'"{digest}"'
+    if request.headers.get('If-None-Match') == etag:
+        response = HttpResponse(status=304)
+    else:
+        content_type = mimetypes.guess_type(path)[0] or 'application/octet-stream'
+        response = FileResponse(open(path, 'rb'), content_type=content_type)
+    response['ETag'] = etag
+    response['Cache-Control'] = 'private, max-age=31536000, immutable'
+    return response
+
+def question_data(question, request=None):
+    # Iterate the prefetched media: .first() would issue a query per question
+    media = next(iter(question.media.all()), None)
+    return {
+        "id": question.q_id,
+        "text": question.text,
+        "marks": question.marks,
+        "co": question.co,
+        "bt": question.bt,
+        "unit_id": question.unit_id.unit_id if question.unit_id else None,
+        "unit_name": question.unit_id.unit_name if question.unit_id else None,
+        "image_paths": media.image_paths if media else [],
+        "image_urls": [image_url(p, request) for p in media.image_paths or []] if media else [],
+        "thumbnail_urls": [image_url(p, request) if p else None for p in media.thumbnails] if media else [],
+        "equations": media.equations if media else []
+    }
+
 class FilterQuestionsView(APIView):
     permission_classes = [IsAuthenticated]
 
     def post(self, request, course_id):
         try:
+            fields = requested_fields(
+                request.data.get('fields', request.query_params.get('fields')), SELECTION_LISTING_FIELDS
+            )
+            selected = filter_values(request.data)
 
-            unit_numbers = request.data.get('unit_numbers', [])
-            cos = request.data.get('cos', [])
-            bts = request.data.get('bts', [])
-            marks = request.data.get('marks', [])
-
-            # Base query with course_id filter
-            query = Q(course_id_id=course_id)
-
-            # Add other filters only if they are provided
-            if unit_numbers:
-                query &= Q(unit_id__unit_id__in=unit_numbers)
-            if cos:
-                query &= Q(co__in=cos)
-            if bts:
-                query &= Q(bt__in=bts)
-            if marks:
-                query &= Q(marks__in=marks)
-
-            questions = Question.objects.filter(query).select_related('unit_id').prefetch_related('media')
-
-            response_data = []
-            for question in questions:
-                media = question.media.first()
-                question_data = {
-                    "id": question.q_id,
-                    "text": question.text,
-                    "marks": question.marks,
-                    "co": question.co,
-                    "bt": question.bt,
-                    "unit_id": question.unit_id.unit_id if question.unit_id else None,
-                    "unit_name": question.unit_id.unit_name if question.unit_id else None,
-                    "image_paths": media.image_paths if media else [],
-                    "equations": media.equations if media else []
-                }
-                response_data.append(question_data)
+            # Match against the course's in-memory bitmaps instead of the database
+            index = get_filter_index(course_id)
+            matches = index.match(selected)
+            if set(fields) <= INDEX_FIELDS:
+                questions = index.rows(matches, fields)
+            else:
+                rows = Question.objects.filter(course_id=course_id)
+                if selected:
+                    rows = rows.filter(q_id__in=index.q_ids_for(matches))
+                questions = listing_rows(project(rows.order_by('q_id'), fields), fields, request)
+
+            return Response({
+                "questions": questions,
+                "total": matches.bit_count(),
+                "facets": index.facet_counts(selected),
+            })
+        except (FieldsetError, FilterIndexError) as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        except Course.DoesNotExist:
+            return Response({"error": "Course not found"}, status=status.HTTP_404_NOT_FOUND)
+        except Exception as e:
+            return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+# Ranked full-text search within a course, combinable with the selection filters
+class SearchQuestionsView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request, course_id):
+        try:
+            text = search_text(request.data.get('q'))
+            questions = search_questions(
+                Question.objects.filter(apply_selection_filters(course_id, request.data)),
+                text,
+            ).select_related('unit_id').prefetch_related('media')
+
+            paginator = CustomPagination()
+            page = paginator.paginate_queryset(questions, request)
+            snippets = headlines(page, text)
+            return paginator.get_paginated_response([
+                {**question_data(q, request), "rank": q.rank, "headline": snippets.get(q.q_id, '')}
+                for q in page
+            ])
+        except SearchQueryError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        except Exception as e:
+            return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+# Existing questions that the given texts nearly duplicate, e.g. before an upload
+class SimilarQuestionsView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request, course_id):
+        try:
+            texts = request.data.get('texts', request.data.get('text'))
+            return Response(similar_questions(course_id, texts, request.data.get('threshold')))
+        except NearDuplicateError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        except Course.DoesNotExist:
+            return Response({"error": "Course not found"}, status=status.HTTP_404_NOT_FOUND)
+        except Exception as e:
+            return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+# Clusters of near-duplicate questions across a course's bank
+class DuplicateQuestionsView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, course_id):
+        try:
+            return Response(duplicate_clusters(course_id, request.query_params.get('threshold')))
+        except NearDuplicateError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        except Course.DoesNotExist:
+            return Response({"error": "Course not found"}, status=status.HTTP_404_NOT_FOUND)
+        except Exception as e:
+            return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
-            return Response({"questions": response_data})
+# Pick a paper's questions automatically from a blueprint
+class AssemblePaperView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request, course_id):
+        try:
+            if not Course.objects.filter(course_id=course_id).exists():
+                return Response({"error": "Course not found"}, status=status.HTTP_404_NOT_FOUND)
+            return Response(assemble_paper(course_id, request.data))
+        except BlueprintError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        except BlueprintInfeasible as e:
+            return Response({"error": str(e), "unmet": e.unmet}, status=status.HTTP_422_UNPROCESSABLE_ENTITY)
         except Exception as e:
             return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
@@ -1720,35 +2181,22 @@ def course_questions_view(request, course_id):
 @permission_classes([IsAuthenticated])
 def course_questions_view(request, course_id):
     try:
-        # Get questions for the specific course
-        questions = Question.objects.select_related(
-            'course_id',
-            'unit_id'
-        ).filter(course_id=course_id)
-
-        # Format the response data
-        questions_data = [{
-            'q_id': q.q_id,
-            'text': q.text,
-            'course_id': q.course_id.course_id,
-            'course_name': q.course_id.course_name,
-            'unit_id': q.unit_id.unit_id if q.unit_id else None,
-            'unit_name': q.unit_id.unit_name if q.unit_id else None,
-            'co': q.co,
-            'bt': q.bt,
-            'marks': q.marks,
-            'difficulty_level': q.difficulty_level,
-            'type': q.type,
-            'has_image': bool(q.image),
-            'has_equations': hasattr(q, 'questionmedia') and bool(q.questionmedia.equations)
-        } for q in questions]
+        # One page of questions for the specific course, reading only the requested fields
+        fields = requested_fields(request.query_params.get('fields'), COURSE_LISTING_FIELDS)
+        paginator = KeysetPagination()
+        page = paginator.paginate_queryset(
+            project(Question.objects.filter(course_id=course_id), fields), request
+        )
 
         return Response({
-            'questions': questions_data
+            **paginator.page_info(),
+            'questions': listing_rows(page, fields, request)
         })
 
     except Course.DoesNotExist:
         return Response({'error': f'Course with ID {course_id} not found'}, status=404)
+    except FieldsetError as e:
+        return Response({'error': str(e)}, status=400)
     except Exception as e:
         print(f"Error fetching course questions: {str(e)}")
         return Response({'error': str(e)}, status=400)
@@ -1775,8 +2223,10 @@ def question_view(request, q_id=None):
             except Question.DoesNotExist:
                 return Response({'error': 'Question not found'}, status=404)
         else:
-            questions = Question.objects.all()
+            paginator = KeysetPagination()
+            questions = paginator.paginate_queryset(Question.objects.select_related('unit_id'), request)
             return Response({
+                **paginator.page_info(),
                 'questions': [{
                     'q_id': q.q_id,
                     'text': q.text,
@@ -1,16 +1,21 @@
-"""
-ASGI config for qp_backend project.
-
-It exposes the ASGI callable as a module-level variable named ``application``.
-
-For more information on this file, see
-https://docs.djangoproject.com/en/5.1/howto/deployment/asgi/
-"""
-
-import os
-
-from django.core.asgi import get_asgi_application
-
-os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'qp_backend.settings')
-
-application = get_asgi_application()
+"""
+ASGI config for qp_backend project.
+
+It exposes the ASGI callable as a module-level variable named ``application``.
+
+For more information on this file, see
+https://docs.djangoproject.com/en/5.1/howto/deployment/asgi/
+"""
+
+import os
+
+from django.core.asgi import get_asgi_application
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'qp_backend.settings')
+
+application = get_asgi_application()
+
+# Start the LibreOffice converters now rather than on the first PDF export
+from api.utils.pdf_converter import warm_pdf_converter  # noqa: E402
+
+warm_pdf_converter()
@@ -158,10 +158,64 @@ STATIC_URL = 'static/'
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
+# Question-bank upload jobs (see api/utils/ingestion_jobs.py)
+INGESTION_WORKERS = int(os.getenv('INGESTION_WORKERS', 2))
+INGESTION_POLL_INTERVAL = 5  # seconds between queue polls when idle
+INGESTION_HEARTBEAT_INTERVAL = 30  # seconds between a running job's heartbeats
+INGESTION_JOB_LEASE = 120  # running jobs without a heartbeat for this long are requeued
+INGESTION_PROCESSES = int(os.getenv('INGESTION_PROCESSES', 0)) or None  # None = one per CPU
+BATCH_UPLOAD_MAX_FILES = 200
+BATCH_UPLOAD_MAX_BYTES = 500 * 1024 * 1024
+CHUNKED_UPLOAD_MAX_BYTES = 200 * 1024 * 1024
+CHUNKED_UPLOAD_PART_SIZE = 8 * 1024 * 1024  # suggested to clients
+CHUNKED_UPLOAD_TTL = 24 * 60 * 60  # abandoned sessions are discarded after this
+
+# Content-addressed store for images extracted from uploaded banks
+QUESTION_MEDIA_ROOT = os.path.join('images', 'sha256')
+QUESTION_IMAGE_PRINT_SIZE = (900, 600)  # 3x2 inch box in generated papers at 300 dpi
+QUESTION_THUMBNAIL_SIZE = (240, 160)
+# Image URLs are signed and stay valid for one to two of these periods (seconds)
+QUESTION_IMAGE_URL_TTL = 3600
+
+# Converted equations kept in memory per process, keyed by canonical OMML
+EQUATION_CACHE_SIZE = 4096
+
+# Rendered papers are cached by content hash; least recently used are evicted past the budget
+PAPER_CACHE_DIR = os.path.join('generated_papers', 'cache')
+PAPER_CACHE_MAX_BYTES = 500 * 1024 * 1024
+PAPER_SPOOL_MAX_MEMORY = 16 * 1024 * 1024  # delivery=stream papers larger than this spill to a temp file
+PAPER_BATCH_MAX_SETS = 26
+PAPER_COPIES_MAX = 1000  # shuffled per-seat copies in one request
+PAPER_BATCH_PROCESSES = int(os.getenv('PAPER_BATCH_PROCESSES', 0)) or None  # None = one per CPU
+
+# Blueprint assembly keeps the best selection found within this budget
+BLUEPRINT_TIME_BUDGET = 0.08  # seconds
+BLUEPRINT_MAX_ATTEMPTS = 200
+
+# Questions whose estimated Jaccard similarity (MinHash of 5-character shingles)
+# reaches this are reported as near-duplicates
+NEAR_DUPLICATE_THRESHOLD = 0.5
+
+# Question listings are cursor-paginated on (course_id, q_id); clients may ask for
+# ?page_size= up to the maximum
+QUESTION_PAGE_SIZE = 50
+QUESTION_PAGE_SIZE_MAX = 500
+
+# format=pdf papers are converted by a pool of headless LibreOffice processes per
+# server process, each reached over a named pipe
+SOFFICE_BINARY = 'soffice'
+PDF_CONVERTER_POOL_SIZE = 2
+PDF_CONVERT_TIMEOUT = 30  # seconds per conversion before the converter is restarted
+PDF_QUEUE_TIMEOUT = 60  # seconds a request waits for a free converter
+PDF_CONVERTER_WARM_ON_START = True  # start the pool when the WSGI/ASGI application loads
+
 '''
 STATIC_URL = '/static/'
 STATICFILES_DIRS = [
     os.path.join(BASE_DIR, 'build/static')
 ]
 STATIC_ROOT = os.path.join(BASE_DIR, 'static')
-'''
\ No newline at end of file
+'''
+# Generated papers use "DEPARTMENT OF <course department>" as their heading;
+# map a department name here to print something else
+PAPER_DEPARTMENT_HEADINGS = {}
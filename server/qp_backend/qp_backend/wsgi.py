@@ -1,16 +1,21 @@
-"""
-WSGI config for qp_backend project.
-
-It exposes the WSGI callable as a module-level variable named ``application``.
-
-For more information on this file, see
-https://docs.djangoproject.com/en/5.1/howto/deployment/wsgi/
-"""
-
-import os
-
-from django.core.wsgi import get_wsgi_application
-
-os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'qp_backend.settings')
-
-application = get_wsgi_application()
+"""
+WSGI config for qp_backend project.
+
+It exposes the WSGI callable as a module-level variable named ``application``.
+
+For more information on this file, see
+https://docs.djangoproject.com/en/5.1/howto/deployment/wsgi/
+"""
+
+import os
+
+from django.core.wsgi import get_wsgi_application
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'qp_backend.settings')
+
+application = get_wsgi_application()
+
+# Start the LibreOffice converters now rather than on the first PDF export
+from api.utils.pdf_converter import warm_pdf_converter  # noqa: E402
+
+warm_pdf_converter()